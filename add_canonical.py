@@ -1,6 +1,18 @@
-
+import argparse
 import os
 import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import build_report
+from build_report import phase
+from compress_assets import refresh_sidecars
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Minified pages drop the quotes around plain attribute values (<link rel=canonical href=...>)
+CANONICAL_LINK = re.compile(r'''<link\s+rel=(["']?)canonical\1(?![\w-])[^>]*>''', re.IGNORECASE)
+CANONICAL_HREF = re.compile(r'''\shref=(["']?)([^"'\s>]+)\1''')
 
 def get_canonical_url(rel_path):
     base = "https://railbookingdate.com/"
@@ -16,50 +28,83 @@ def get_canonical_url(rel_path):
         
     return base + rel_path
 
-def add_canonical_tag(file_path, rel_path):
+def apply_canonical(content, rel_path):
+    # Returns (content, action) where action is 'added', 'updated', 'unchanged' or None if no <head> was found
     canonical_url = get_canonical_url(rel_path)
     tag = f'<link rel="canonical" href="{canonical_url}">'
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-        
+
     # Check if exists
-    if '<link rel="canonical"' in content:
+    links = [match.group(0) for match in CANONICAL_LINK.finditer(content)]
+    if links:
+        hrefs = [CANONICAL_HREF.search(link) for link in links]
+        if all(href and href.group(2) == canonical_url for href in hrefs):
+            return content, 'unchanged'
         # Replace existing
-        print(f"Updating canonical for {rel_path}")
-        content = re.sub(r'<link rel="canonical"[^>]*>', tag, content)
-    else:
-        # Insert
+        return CANONICAL_LINK.sub(tag, content), 'updated'
+
+    # Insert
+    # Try to insert after <title> or <head>
+    if '</title>' in content:
+        return content.replace('</title>', f'</title>\n    {tag}'), 'added'
+    elif '<head>' in content:
+        return content.replace('<head>', f'<head>\n    {tag}'), 'added'
+    return content, None
+
+def add_canonical_tag(file_path, rel_path):
+    # Returns the action taken; the file is only rewritten when its content changes
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    content, action = apply_canonical(content, rel_path)
+    if action is None:
+        print(f"Warning: No <head> or </title> found in {rel_path}")
+        return 'skipped'
+    if action == 'unchanged':
+        return action
+    if action == 'added':
         print(f"Adding canonical for {rel_path}")
-        # Try to insert after <title> or <head>
-        if '</title>' in content:
-            content = content.replace('</title>', f'</title>\n    {tag}')
-        elif '<head>' in content:
-            content = content.replace('<head>', f'<head>\n    {tag}')
-        else:
-             print(f"Warning: No <head> or </title> found in {rel_path}")
-             return
-             
+    else:
+        print(f"Updating canonical for {rel_path}")
+
     with open(file_path, 'w', encoding='utf-8') as f:
         f.write(content)
+    refresh_sidecars(file_path, content.encode('utf-8'))
+    return action
 
-def main():
-    base_dir = '/Users/ishwarjoshi/Ishwar Joshi/work/traindays'
-    
+def iter_html_files(base_dir):
     # 1. Root index.html
-    add_canonical_tag(os.path.join(base_dir, 'index.html'), 'index.html')
-    
+    index_path = os.path.join(base_dir, 'index.html')
+    if os.path.exists(index_path):
+        yield index_path
+
     # 2. Pages directory
     pages_dir = os.path.join(base_dir, 'pages')
     if os.path.exists(pages_dir):
         for root, dirs, files in os.walk(pages_dir):
             for file in files:
                 if file.endswith('.html'):
-                    file_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(file_path, base_dir)
-                    add_canonical_tag(file_path, rel_path)
-    
-    print("Canonical tags updated.")
+                    yield os.path.join(root, file)
+
+def main(base_dir=BASE_DIR, workers=None):
+    # File I/O dominates, so threads are enough to overlap it
+    with phase('canonical'), ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(add_canonical_tag, file_path, os.path.relpath(file_path, base_dir))
+            for file_path in iter_html_files(base_dir)
+        ]
+        counts = Counter(future.result() for future in futures)
+    for action, n in counts.items():
+        build_report.count(f"canonical-{action}", n)
+
+    print(f"Canonical tags: {counts['added']} added, {counts['updated']} updated, "
+          f"{counts['unchanged']} unchanged, {counts['skipped']} skipped")
+    return counts
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Add or update <link rel=\"canonical\"> in index.html and pages/")
+    parser.add_argument('base_dir', nargs='?', default=BASE_DIR, help="Site root (default: this script's directory)")
+    parser.add_argument('--workers', type=int, default=None, help="Threads used to process files")
+    build_report.add_arguments(parser)
+    args = parser.parse_args()
+    with build_report.reporting(args.report, args.profile):
+        main(base_dir=args.base_dir, workers=args.workers)
@@ -0,0 +1,308 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Runs each build phase against a synthetic trains.csv in a temporary site root and
+# compares wall time and peak memory with a stored baseline. Every phase runs in its
+# own process so peak RSS is per phase rather than the high-water mark of the run.
+# (name, description); train-pages-incremental needs train-pages to have run first
+PHASES = [
+    ('csv-group', "Parse, sort and group trains.csv by station pair"),
+    ('render', "generate_html for every route, in memory, one process"),
+    ('train-pages', "generate_train_pages.main: full rebuild with sitemap"),
+    ('train-pages-incremental', "generate_train_pages.main --incremental with nothing changed"),
+    ('booking-pages', "generate_booking_pages.main: month pages and calendar data"),
+]
+
+DEFAULT_BASELINE = os.path.join(BASE_DIR, '.build', 'benchmark-baseline.json')
+# A phase regresses when it gets this much slower (or bigger) than the baseline
+DEFAULT_TOLERANCE = 0.25
+
+SYLLABLES = ['ba', 'na', 'ra', 'pur', 'gar', 'hi', 'ko', 'la', 'ma', 'dha', 'van', 'ti', 'nag', 'kal', 'se', 'am']
+SUFFIXES = ['', '', '', ' JN', ' CANTT', ' ROAD', ' CITY', ' TERMINUS']
+
+
+def station_names(count, rng):
+    names = set()
+    while len(names) < count:
+        stem = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        names.add(stem.upper() + rng.choice(SUFFIXES))
+    return sorted(names)
+
+
+def zipf_weights(count, skew):
+    return [1 / (rank + 1) ** skew for rank in range(count)]
+
+
+def sample_routes(stations, routes, skew, rng):
+    # Distinct unordered station pairs; busy stations (low rank) are picked far more often
+    possible = len(stations) * (len(stations) - 1) // 2
+    if routes > possible:
+        raise ValueError(f"{routes} routes requested but {len(stations)} stations only allow {possible}")
+    if routes > possible // 2:
+        # Rejection sampling would stall this close to the limit
+        pairs = [(a, b) for i, a in enumerate(stations) for b in stations[i + 1:]]
+        return rng.sample(pairs, routes)
+
+    weights = zipf_weights(len(stations), skew)
+    pairs = set()
+    while len(pairs) < routes:
+        a, b = rng.choices(stations, weights, k=2)
+        if a != b:
+            pairs.add((min(a, b), max(a, b)))
+    pairs = sorted(pairs)
+    rng.shuffle(pairs)
+    return pairs
+
+
+def generate_trains_csv(path, stations=2000, routes=50000, rows=200000, skew=1.1, seed=1):
+    # Writes a trains.csv shaped like the real one: every route has at least one
+    # train, a few trunk routes carry most of them, and about half of the trains
+    # run in the reverse direction of their pair
+    if rows < routes:
+        raise ValueError(f"{rows} rows cannot cover {routes} routes")
+    rng = random.Random(seed)
+    pairs = sample_routes(station_names(stations, rng), routes, skew, rng)
+    assignment = list(range(routes)) + rng.choices(range(routes), zipf_weights(routes, skew), k=rows - routes)
+    rng.shuffle(assignment)
+
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Train Number', 'Train Name', 'Starting Station', 'Ending Station'])
+        for i, route in enumerate(assignment):
+            source, destination = pairs[route]
+            if rng.random() < 0.5:
+                source, destination = destination, source
+            name = f"{source.split()[0].title()} {destination.split()[0].title()} {rng.choice(['Express', 'Mail', 'Superfast', 'Passenger'])}"
+            writer.writerow([str(10000 + i), name, source, destination])
+    return rows
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # Render workers are child processes; the largest of them counts as the peak too
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def written_since(site_dir, start_ns):
+    # (html pages, bytes) of the files created or rewritten since start_ns
+    pages = 0
+    size = 0
+    for root, _, files in os.walk(site_dir):
+        for name in files:
+            stat = os.stat(os.path.join(root, name))
+            if stat.st_mtime_ns >= start_ns:
+                size += stat.st_size
+                if name.endswith('.html'):
+                    pages += 1
+    return pages, size
+
+
+def run_phase(name, site_dir, workers):
+    # Executed in the child process; returns (pages, bytes written)
+    import generate_booking_pages
+    import generate_train_pages
+
+    csv_file = os.path.join(site_dir, 'trains.csv')
+    if name == 'csv-group':
+        routes = sum(1 for _ in generate_train_pages.iter_route_groups(csv_file))
+        return routes, 0
+    if name == 'render':
+        pages = 0
+        size = 0
+        for s1, s2, trains in generate_train_pages.iter_route_groups(csv_file):
+            size += len(generate_train_pages.generate_html(s1, s2, trains).encode('utf-8'))
+            pages += 1
+        return pages, size
+    if name == 'train-pages':
+        generate_train_pages.main(base_dir=site_dir, workers=workers)
+    elif name == 'train-pages-incremental':
+        generate_train_pages.main(base_dir=site_dir, incremental=True, workers=workers)
+    elif name == 'booking-pages':
+        generate_booking_pages.main(base_dir=site_dir)
+    else:
+        raise ValueError(f"Unknown phase: {name}")
+    return None
+
+
+def phase_child(name, site_dir, workers, result_path):
+    start_ns = time.time_ns()
+    start = time.perf_counter()
+    counted = run_phase(name, site_dir, workers)
+    seconds = time.perf_counter() - start
+    pages, size = counted if counted is not None else written_since(site_dir, start_ns)
+    result = {
+        'seconds': round(seconds, 3),
+        'peak_rss_mb': peak_rss_mb(),
+        'pages': pages,
+        'pages_per_sec': round(pages / seconds, 1) if seconds else None,
+        'bytes_written': size,
+    }
+    with open(result_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+
+
+def measure(name, site_dir, workers, verbose=False):
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        result_path = f.name
+    try:
+        command = [sys.executable, os.path.abspath(__file__), '--phase', name,
+                   '--site-dir', site_dir, '--result', result_path]
+        if workers:
+            command += ['--workers', str(workers)]
+        # The generators print a line per page, which would dominate large runs
+        subprocess.run(command, check=True, cwd=BASE_DIR,
+                       stdout=None if verbose else subprocess.DEVNULL)
+        with open(result_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    finally:
+        os.remove(result_path)
+
+
+def compare(results, baseline, tolerance):
+    # Returns the regressed phase names; prints a delta line per phase
+    if baseline.get('dataset') != results['dataset']:
+        print("Baseline was recorded with a different dataset, not comparing")
+        return []
+    regressions = []
+    for name, current in results['phases'].items():
+        previous = baseline['phases'].get(name)
+        if not previous:
+            continue
+        deltas = []
+        regressed = False
+        for key in ('seconds', 'peak_rss_mb'):
+            if previous.get(key) and current.get(key) is not None:
+                ratio = current[key] / previous[key]
+                deltas.append(f"{key} {ratio - 1:+.0%}")
+                regressed = regressed or ratio > 1 + tolerance
+        print(f"  {name:<26} {', '.join(deltas)}{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def print_results(results):
+    print(f"{'phase':<26} {'seconds':>9} {'peak MB':>9} {'pages':>9} {'pages/s':>9} {'MB written':>11}")
+    for name, r in results['phases'].items():
+        rss = '-' if r['peak_rss_mb'] is None else f"{r['peak_rss_mb']:.1f}"
+        rate = '-' if r['pages_per_sec'] is None else f"{r['pages_per_sec']:.1f}"
+        print(f"{name:<26} {r['seconds']:>9.3f} {rss:>9} {r['pages']:>9} {rate:>9} {r['bytes_written'] / 1e6:>11.2f}")
+
+
+def main(phases, dataset, csv_path=None, workers=None, baseline_path=DEFAULT_BASELINE,
+         save_baseline=False, tolerance=DEFAULT_TOLERANCE, output=None, keep=None, verbose=False):
+    site_dir = keep or tempfile.mkdtemp(prefix='traindays-bench-')
+    os.makedirs(site_dir, exist_ok=True)
+    csv_file = os.path.join(site_dir, 'trains.csv')
+
+    start = time.perf_counter()
+    if csv_path:
+        with open(csv_path, 'rb') as src, open(csv_file, 'wb') as dst:
+            dst.write(src.read())
+        dataset = {'csv': os.path.basename(csv_path), 'bytes': os.path.getsize(csv_path)}
+    else:
+        generate_trains_csv(csv_file, **dataset)
+    print(f"Dataset {dataset} ready in {time.perf_counter() - start:.1f}s ({os.path.getsize(csv_file) / 1e6:.1f} MB)")
+
+    results = {
+        'dataset': dataset,
+        'workers': workers or os.cpu_count(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'phases': {},
+    }
+    try:
+        for name in phases:
+            print(f"Running {name}...")
+            results['phases'][name] = measure(name, site_dir, workers, verbose)
+    finally:
+        if not keep:
+            shutil.rmtree(site_dir, ignore_errors=True)
+
+    print_results(results)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {output}")
+
+    regressions = []
+    if save_baseline:
+        os.makedirs(os.path.dirname(baseline_path) or '.', exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {baseline_path}")
+    elif os.path.exists(baseline_path):
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"Compared with baseline {baseline_path} (tolerance {tolerance:.0%}):")
+        regressions = compare(results, baseline, tolerance)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the page generators on a synthetic trains.csv")
+    parser.add_argument('--phases', default=','.join(name for name, _ in PHASES),
+                        help="Comma separated phases: " + "; ".join(f"{name} ({desc})" for name, desc in PHASES))
+    parser.add_argument('--stations', type=int, default=2000, help="Distinct stations in the synthetic network")
+    parser.add_argument('--routes', type=int, default=50000, help="Distinct station pairs (one page each)")
+    parser.add_argument('--rows', type=int, default=200000, help="Trains in the CSV (up to ~1M)")
+    parser.add_argument('--skew', type=float, default=1.1,
+                        help="Zipf exponent for station popularity and trains per route")
+    parser.add_argument('--seed', type=int, default=1, help="Random seed, so datasets are reproducible")
+    parser.add_argument('--csv', help="Benchmark an existing trains.csv instead of a synthetic one")
+    parser.add_argument('--write-csv', metavar='PATH', help="Only write the synthetic CSV to PATH and exit")
+    parser.add_argument('--workers', type=int, default=None, help="Render worker processes (default: CPU cores)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline results file")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown before a phase counts as a regression (0.25 = 25%%)")
+    parser.add_argument('--output', help="Also write the results as JSON to this file")
+    parser.add_argument('--keep', metavar='DIR', help="Build into DIR and keep it instead of a temp dir")
+    parser.add_argument('--verbose', action='store_true', help="Show the generators' output")
+    # Internal: run a single phase in this process (used by the parent run)
+    parser.add_argument('--phase', help=argparse.SUPPRESS)
+    parser.add_argument('--site-dir', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phase:
+        phase_child(args.phase, args.site_dir, args.workers, args.result)
+        sys.exit(0)
+
+    dataset = {'stations': args.stations, 'routes': args.routes, 'rows': args.rows,
+               'skew': args.skew, 'seed': args.seed}
+    if args.write_csv:
+        generate_trains_csv(args.write_csv, **dataset)
+        print(f"Wrote {args.rows} trains to {args.write_csv}")
+        sys.exit(0)
+
+    phases = [name.strip() for name in args.phases.split(',') if name.strip()]
+    unknown = [name for name in phases if name not in dict(PHASES)]
+    if unknown:
+        parser.error(f"Unknown phases: {', '.join(unknown)}")
+    regressions = main(phases, dataset, csv_path=args.csv, workers=args.workers, baseline_path=args.baseline,
+                       save_baseline=args.save_baseline, tolerance=args.tolerance, output=args.output,
+                       keep=args.keep, verbose=args.verbose)
+    if regressions:
+        print(f"Regressed: {', '.join(regressions)}")
+        sys.exit(1)
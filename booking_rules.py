@@ -0,0 +1,139 @@
+import argparse
+import csv
+import datetime
+import json
+import sys
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# One row per rule era. A rule applies to bookings made on or after `effective`
+# (IRCTC changes apply from a booking date, not a journey date), until the next
+# row takes over. Times are IST.
+BookingRule = namedtuple('BookingRule', [
+    'effective', 'arp_days', 'tatkal_days', 'general_time', 'ac_tatkal_time', 'sl_tatkal_time',
+])
+
+BOOKING_RULES = [
+    BookingRule(datetime.date(2015, 4, 1), 120, 1, '08:00', '10:00', '11:00'),
+    # ARP cut from 120 to 60 days for bookings from 1 Nov 2024
+    BookingRule(datetime.date(2024, 11, 1), 60, 1, '08:00', '10:00', '11:00'),
+]
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def rule_for(date, rules=BOOKING_RULES):
+    # The rule in force on a given booking date
+    current = rules[0]
+    for rule in rules:
+        if rule.effective <= date:
+            current = rule
+    return current
+
+
+def _eras(rules, field):
+    # (start_day, end_day, offset_days) per era as days since 1970-01-01
+    days = [rule.effective.toordinal() - _EPOCH_ORDINAL for rule in rules]
+    ends = days[1:] + [2 ** 40]
+    return [(start, end, getattr(rule, field)) for start, end, rule in zip(days, ends, rules)]
+
+
+def _opening_days_numpy(journey_days, eras):
+    # A journey opens at journey - offset under whichever era that date falls in.
+    # Across a rule change both eras can claim it (it stays open from the earlier
+    # date), or neither can (it opens the day the new rule takes effect).
+    opening = np.full(journey_days.shape, np.iinfo(np.int64).max, dtype=np.int64)
+    for start, end, offset in eras:
+        candidate = journey_days - offset
+        valid = (candidate >= start) & (candidate < end)
+        opening = np.where(valid, np.minimum(opening, candidate), opening)
+    unresolved = opening == np.iinfo(np.int64).max
+    if unresolved.any():
+        for start, end, offset in eras:
+            gap = unresolved & (journey_days - offset < start) & (journey_days >= start)
+            opening = np.where(gap, start, opening)
+            unresolved &= ~gap
+    return opening
+
+
+def _opening_days_python(journey_days, eras):
+    opening = []
+    for day in journey_days:
+        candidates = [day - offset for start, end, offset in eras if start <= day - offset < end]
+        if candidates:
+            opening.append(min(candidates))
+        else:
+            opening.append(next(start for start, end, offset in eras if day - offset < start <= day))
+    return opening
+
+
+def booking_windows(start, end, rules=BOOKING_RULES):
+    # Opening dates for every journey date in [start, end). Returns a dict of
+    # parallel arrays: journey, general, tatkal (datetime64[D] with NumPy, else lists of dates).
+    # Journeys before the first rule has no opening date; both paths raise ValueError for them.
+    rules = sorted(rules, key=lambda rule: rule.effective)
+    if start < end and start < rules[0].effective:
+        raise ValueError(f"journey date {start.isoformat()} is before the first booking rule "
+                         f"({rules[0].effective.isoformat()})")
+    first = start.toordinal() - _EPOCH_ORDINAL
+    last = end.toordinal() - _EPOCH_ORDINAL
+
+    if np is not None:
+        journey_days = np.arange(first, last, dtype=np.int64)
+        general = _opening_days_numpy(journey_days, _eras(rules, 'arp_days'))
+        tatkal = _opening_days_numpy(journey_days, _eras(rules, 'tatkal_days'))
+        return {
+            'journey': journey_days.astype('datetime64[D]'),
+            'general': general.astype('datetime64[D]'),
+            'tatkal': tatkal.astype('datetime64[D]'),
+        }
+
+    journey_days = range(first, last)
+    general = _opening_days_python(journey_days, _eras(rules, 'arp_days'))
+    tatkal = _opening_days_python(journey_days, _eras(rules, 'tatkal_days'))
+
+    def to_dates(days):
+        return [datetime.date.fromordinal(day + _EPOCH_ORDINAL) for day in days]
+    return {'journey': to_dates(journey_days), 'general': to_dates(general), 'tatkal': to_dates(tatkal)}
+
+
+def as_dates(values):
+    # datetime64[D] array or list of dates -> list of datetime.date
+    if np is not None and isinstance(values, np.ndarray):
+        return values.astype(object).tolist()
+    return list(values)
+
+
+def _parse_date(text):
+    return datetime.date.fromisoformat(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print IRCTC booking opening dates for a range of journey dates")
+    parser.add_argument('start', type=_parse_date, help="First journey date (YYYY-MM-DD)")
+    parser.add_argument('end', type=_parse_date, help="Last journey date, inclusive (YYYY-MM-DD)")
+    parser.add_argument('--format', choices=['csv', 'json'], default='csv')
+    args = parser.parse_args(argv)
+
+    try:
+        windows = booking_windows(args.start, args.end + datetime.timedelta(days=1))
+    except ValueError as e:
+        parser.error(str(e))
+    rows = zip(*(as_dates(windows[key]) for key in ('journey', 'general', 'tatkal')))
+    if args.format == 'json':
+        json.dump([{'journey': j.isoformat(), 'general': g.isoformat(), 'tatkal': t.isoformat()}
+                   for j, g, t in rows], sys.stdout, indent=1)
+        sys.stdout.write('\n')
+    else:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(['journey', 'general', 'tatkal'])
+        for j, g, t in rows:
+            writer.writerow([j.isoformat(), g.isoformat(), t.isoformat()])
+
+
+if __name__ == "__main__":
+    main()
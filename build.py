@@ -0,0 +1,251 @@
+import argparse
+import functools
+import glob
+import os
+import sys
+import time
+
+import build_diff
+import build_report
+import generate_train_pages
+from build_report import phase, record_page
+from add_canonical import apply_canonical
+from compress_assets import compress_file, is_fresh, iter_targets, remove_orphan_sidecars, write_sidecars
+from connections import ConnectionIndex
+from critical_css import apply_critical_css
+from fingerprint import rewrite_asset_references, write_fingerprinted_assets
+from generate_booking_pages import FIRST_MONTH, LAST_MONTH, iter_months, render_month_page, write_calendar_data
+from generate_booking_pages import PAGE_DIR as BOOKING_PAGE_DIR
+from minify_html import minify_document, minify_document_scripts
+from partials import apply_analytics_partial
+from precache import write_precache_manifest
+from sitemap import content_digest
+from station_search import StationSearchIndex
+from train_numbers import TrainNumberIndex
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Hand-written pages that go through the document stages but are not generated
+STATIC_DOCUMENTS = ['index.html', 'pages/*.html', 'pages/blogs/*.html']
+
+# Assets that only need the compress stage
+ASSET_PATTERNS = ['css/*.css', 'js/*.js']
+
+
+def canonical_stage(html, rel_path):
+    html, action = apply_canonical(html, rel_path)
+    if action is None:
+        print(f"Warning: No <head> or </title> found in {rel_path}")
+    return html
+
+
+def fingerprint_stage(html, rel_path, base_dir):
+    return rewrite_asset_references(html, rel_path, base_dir)
+
+
+def critical_stage(html, rel_path, base_dir):
+    return apply_critical_css(html, rel_path, base_dir)
+
+
+# Document stages, applied in the order given on the command line
+STAGES = {
+    'analytics': apply_analytics_partial,
+    'canonical': canonical_stage,
+    'fingerprint': fingerprint_stage,
+    'critical': critical_stage,
+    'minify': minify_document,
+    'minify-scripts': minify_document_scripts,
+}
+# Stages that read the site's css/js, and are also given the site root being built
+SITE_STAGES = ['fingerprint', 'critical']
+# Hand-written pages are rewritten in place and stay the editable source, so only
+# generated pages are minified
+GENERATED_ONLY_STAGES = ['minify', 'minify-scripts']
+# 'compress' runs on the final bytes as they are written rather than on the document;
+# 'precache' hashes the finished output for the service worker
+WRITE_STAGES = ['compress', 'precache']
+DEFAULT_STAGES = ['analytics', 'canonical', 'fingerprint', 'critical', 'minify', 'compress', 'precache']
+
+
+def run_stages(stage_names, base_dir, html, rel_path):
+    for name in stage_names:
+        if name in SITE_STAGES:
+            html = STAGES[name](html, rel_path, base_dir)
+        else:
+            html = STAGES[name](html, rel_path)
+    return html
+
+
+def write_document(path, html, previous, compress, changes=None, rel_path=None):
+    # Writes path only when html differs from what is on disk; returns (changed, encoded bytes).
+    # With changes (a build_diff.BuildDiff) the document is only compared under rel_path.
+    data = html.encode('utf-8')
+    if changes is not None:
+        return changes.compare(rel_path, path, data) != 'unchanged', data
+    changed = previous is None or html != previous
+    if changed:
+        with open(path, 'wb') as f:
+            f.write(data)
+    if compress and (changed or not is_fresh(path, path + '.gz')):
+        write_sidecars(path, data)
+    return changed, data
+
+
+def read_document(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def stage_transforms(stages, base_dir=BASE_DIR):
+    # (transform for generated pages, transform for hand-written pages, transform_key)
+    # for pages of the site at base_dir
+    unknown = [name for name in stages if name not in STAGES and name not in WRITE_STAGES]
+    if unknown:
+        raise ValueError(f"Unknown build stages: {', '.join(unknown)}")
+    doc_stages = tuple(name for name in stages if name in STAGES)
+    # partial of a module-level function so it can be shipped to render worker processes
+    transform = functools.partial(run_stages, doc_stages, base_dir)
+    static_transform = functools.partial(run_stages, tuple(name for name in doc_stages if name not in GENERATED_ONLY_STAGES),
+                                         base_dir)
+    return transform, static_transform, ','.join(doc_stages)
+
+
+def standalone_stages(text, base_dir=BASE_DIR):
+    # (transform, transform_key, compress) for a generator run on its own with --stages
+    # text; None means this build's stages, so its hashes and manifests line up with
+    # build.py's and either can run incrementally after the other
+    stages = DEFAULT_STAGES if text is None else [name.strip() for name in text.split(',') if name.strip()]
+    transform, _, transform_key = stage_transforms(stages, base_dir)
+    return (transform if transform_key else None), transform_key, 'compress' in stages
+
+
+def add_stage_argument(parser):
+    parser.add_argument('--stages', default=None,
+                        help="Comma separated build stages, as for build.py (default: build.py's, so an "
+                             "incremental run can reuse the pages of a build.py build); '' writes raw pages")
+
+
+def iter_static_documents(base_dir):
+    for pattern in STATIC_DOCUMENTS:
+        for path in sorted(glob.glob(os.path.join(base_dir, pattern))):
+            yield os.path.relpath(path, base_dir).replace(os.sep, '/')
+
+
+def build_static_documents(base_dir, static_transform, compress, digests, changes=None, rel_paths=None):
+    # Hand-written pages: each file is read once, and written back only if a stage changed it.
+    # rel_paths limits the run to those pages (default: all of STATIC_DOCUMENTS).
+    written = 0
+    processed = 0
+    for rel_path in rel_paths if rel_paths is not None else iter_static_documents(base_dir):
+        path = os.path.join(base_dir, rel_path)
+        start = time.perf_counter()
+        with phase('static'):
+            content = read_document(path)
+            html = static_transform(content, rel_path)
+        rendered = time.perf_counter()
+        with phase('write'):
+            changed, data = write_document(path, html, content, compress, changes, rel_path)
+        record_page('static', rel_path, len(data), rendered - start, time.perf_counter() - rendered)
+        digests[rel_path] = content_digest(data)
+        written += changed
+        processed += 1
+    print(f"Static pages: {processed} processed, {written} {'would change' if changes is not None else 'written'}")
+
+
+def build_booking_pages(base_dir, transform, compress, digests, changes=None):
+    # Booking calendar pages, rendered in memory, and the month data behind the home page calendar
+    if changes is None:
+        os.makedirs(os.path.join(base_dir, BOOKING_PAGE_DIR), exist_ok=True)
+    for year, month in iter_months(FIRST_MONTH, LAST_MONTH):
+        start = time.perf_counter()
+        with phase('render'):
+            filename, html = render_month_page(year, month, base_dir)
+            rel_path = f"{BOOKING_PAGE_DIR}/{filename}"
+            html = transform(html, rel_path)
+        rendered = time.perf_counter()
+        path = os.path.join(base_dir, rel_path)
+        with phase('write'):
+            changed, data = write_document(path, html, read_document(path), compress, changes, rel_path)
+        record_page('booking', rel_path, len(data), rendered - start, time.perf_counter() - rendered)
+        digests[rel_path] = content_digest(data)
+        if changed and changes is None:
+            print(f"Generated {path}")
+    with phase('calendar-data'):
+        write_calendar_data(base_dir, changes=changes)
+
+
+def compress_assets(base_dir):
+    with phase('compress-assets'):
+        for path in iter_targets(base_dir, ASSET_PATTERNS):
+            compress_file(path)
+        # Pages get their sidecars as they are written, but one that was deleted
+        # (a booking month out of range, a removed blog) leaves them behind
+        removed = remove_orphan_sidecars(base_dir)
+    if removed:
+        print(f"Removed {removed} orphaned sidecars")
+
+
+def build(base_dir=BASE_DIR, stages=DEFAULT_STAGES, incremental=False, workers=None, compact=False, changes=None):
+    # changes: a build_diff.BuildDiff to run dry, recording what would change instead of writing
+    transform, static_transform, transform_key = stage_transforms(stages, base_dir)
+    compress = 'compress' in stages
+    digests = {}
+
+    # Hashed css/js copies first, so every page below links to names that exist
+    # (in a dry run pages still link the hashed names, which only depend on the sources)
+    if 'fingerprint' in stages and changes is None:
+        with phase('fingerprint-assets'):
+            write_fingerprinted_assets(base_dir)
+
+    # 1. Hand-written pages
+    build_static_documents(base_dir, static_transform, compress, digests, changes)
+
+    # 2. Booking calendar pages and calendar data
+    build_booking_pages(base_dir, transform, compress, digests, changes)
+
+    # 3. Train route pages (nav/footer come from partials), the one-change connection and
+    # per-train pages and the station search data built from the same route stream, and
+    # the sitemap; stages run inside the render workers
+    indexes = [ConnectionIndex(base_dir, transform, transform_key, compress, digests, changes, workers=workers),
+               TrainNumberIndex(base_dir, transform, transform_key, compress, digests, changes, workers=workers),
+               StationSearchIndex(base_dir, changes)]
+    generate_train_pages.main(base_dir=base_dir, incremental=incremental, workers=workers, compact=compact,
+                              transform=transform, transform_key=transform_key, compress=compress,
+                              page_digests=digests, changes=changes, indexes=indexes)
+
+    # 4. Static assets only need sidecars
+    if compress and changes is None:
+        compress_assets(base_dir)
+
+    # 5. Service worker precache manifest over everything written above
+    if 'precache' in stages:
+        with phase('precache'):
+            write_precache_manifest(base_dir, digests, changes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the whole site in one pass: render, canonical, fingerprint, critical css, minify, compress")
+    parser.add_argument('--base-dir', default=BASE_DIR, help="Site root containing trains.csv")
+    parser.add_argument('--stages', default=','.join(DEFAULT_STAGES),
+                        help=f"Comma separated stages to run (available: {', '.join(list(STAGES) + WRITE_STAGES)})")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only re-render routes whose CSV rows, template or stages changed")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes used to render route pages (default: number of CPU cores)")
+    parser.add_argument('--compact', action='store_true',
+                        help="Emit compact JSON-LD and unindented train rows")
+    build_report.add_arguments(parser)
+    build_diff.add_arguments(parser)
+    args = parser.parse_args()
+    changes = build_diff.BuildDiff() if args.dry_run else None
+    with build_report.reporting(args.report, args.profile):
+        build(base_dir=args.base_dir, stages=[s.strip() for s in args.stages.split(',') if s.strip()],
+              incremental=args.incremental, workers=args.workers, compact=args.compact, changes=changes)
+    if changes is not None:
+        changes.print_summary()
+        if args.diff_json:
+            changes.write(args.diff_json)
+        if args.exit_code and changes.has_changes():
+            sys.exit(1)
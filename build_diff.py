@@ -0,0 +1,76 @@
+import json
+import os
+
+from sitemap import content_digest, file_digest
+
+# Dry runs render every output in memory and compare it with the file on disk by
+# content hash instead of writing it. The result says which pages a CSV or template
+# change touches, so a deploy (and its CDN purge) can be skipped when nothing did.
+
+STATUS_MARKS = {'added': '+', 'changed': '~', 'removed': '-'}
+
+
+def compare_output(path, data):
+    # (status, bytes on disk) of writing data to path: 'added', 'changed' or 'unchanged'
+    if not os.path.exists(path):
+        return 'added', 0
+    if os.path.getsize(path) == len(data) and file_digest(path) == content_digest(data):
+        return 'unchanged', len(data)
+    return 'changed', os.path.getsize(path)
+
+
+class BuildDiff:
+    def __init__(self):
+        self.entries = {}   # rel_path -> (status, old bytes, new bytes)
+
+    def add(self, rel_path, status, old_size, new_size):
+        self.entries[rel_path] = (status, old_size, new_size)
+
+    def compare(self, rel_path, path, data):
+        status, old_size = compare_output(path, data)
+        self.add(rel_path, status, old_size, len(data))
+        return status
+
+    def removed(self, rel_path, path):
+        self.add(rel_path, 'removed', os.path.getsize(path), 0)
+
+    def counts(self):
+        counts = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
+        for status, _, _ in self.entries.values():
+            counts[status] += 1
+        return counts
+
+    def has_changes(self):
+        return any(status != 'unchanged' for status, _, _ in self.entries.values())
+
+    def to_dict(self):
+        changes = [{'path': rel_path, 'status': status, 'old_bytes': old_size, 'new_bytes': new_size,
+                    'delta': new_size - old_size}
+                   for rel_path, (status, old_size, new_size) in sorted(self.entries.items())
+                   if status != 'unchanged']
+        return {
+            'counts': self.counts(),
+            'bytes_delta': sum(change['delta'] for change in changes),
+            'changes': changes,
+        }
+
+    def print_summary(self):
+        report = self.to_dict()
+        for change in report['changes']:
+            print(f"{STATUS_MARKS[change['status']]} {change['path']} ({change['delta']:+d} bytes)")
+        counts = report['counts']
+        print(f"Dry run: {counts['added']} added, {counts['changed']} changed, {counts['removed']} removed, "
+              f"{counts['unchanged']} unchanged ({report['bytes_delta']:+d} bytes)")
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        print(f"Wrote {path}")
+
+
+def add_arguments(parser):
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Render in memory and list the pages that would be added, changed or removed, without writing")
+    parser.add_argument('--diff-json', metavar='PATH', help="With --dry-run, also write the change list as JSON")
+    parser.add_argument('--exit-code', action='store_true',
+                        help="With --dry-run, exit with status 1 when anything would change")
@@ -0,0 +1,146 @@
+import contextlib
+import cProfile
+import heapq
+import json
+import os
+import time
+
+# Build instrumentation shared by the generators. Phases are timed exclusively: time
+# spent in a nested phase (csv-parse inside render, say) is only counted once, under
+# the inner phase, so the phases of a run add up to its wall time. Pages rendered in
+# worker processes report their own render/write seconds, which are CPU time summed
+# over the workers rather than wall time. Recording is always on; it is a couple of
+# perf_counter calls per phase, and the report is only written when asked for.
+
+# Pages kept in the report's slowest list
+SLOWEST_PAGES = 20
+
+
+class BuildReport:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started = time.time()
+        self.start = time.perf_counter()
+        self.phases = {}    # name -> [seconds, calls]
+        self.pages = {}     # page type -> [count, bytes, render seconds, write seconds]
+        self.counters = {}
+        self.slowest = []   # min-heap of (seconds, page type, name, bytes)
+        self.stack = []     # [name, start, seconds spent in nested phases]
+
+    def enter(self, name):
+        self.stack.append([name, time.perf_counter(), 0.0])
+
+    def exit(self):
+        name, start, nested = self.stack.pop()
+        elapsed = time.perf_counter() - start
+        entry = self.phases.setdefault(name, [0.0, 0])
+        entry[0] += elapsed - nested
+        entry[1] += 1
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+    def page(self, page_type, name, size, render_seconds=0.0, write_seconds=0.0):
+        entry = self.pages.setdefault(page_type, [0, 0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += size
+        entry[2] += render_seconds
+        entry[3] += write_seconds
+        item = (render_seconds + write_seconds, page_type, name, size)
+        if len(self.slowest) < SLOWEST_PAGES:
+            heapq.heappush(self.slowest, item)
+        elif item > self.slowest[0]:
+            heapq.heapreplace(self.slowest, item)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def to_dict(self):
+        return {
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'total_seconds': round(time.perf_counter() - self.start, 3),
+            'phases': {name: {'seconds': round(seconds, 3), 'calls': calls}
+                       for name, (seconds, calls) in sorted(self.phases.items(), key=lambda kv: -kv[1][0])},
+            'pages': {page_type: {'count': count, 'bytes': size,
+                                  'render_seconds': round(render, 3), 'write_seconds': round(write, 3)}
+                      for page_type, (count, size, render, write) in sorted(self.pages.items())},
+            'counters': dict(sorted(self.counters.items())),
+            'slowest_pages': [{'type': page_type, 'name': name, 'seconds': round(seconds, 4), 'bytes': size}
+                              for seconds, page_type, name, size in sorted(self.slowest, reverse=True)],
+        }
+
+
+# The report of the current run; the generators record into it directly
+REPORT = BuildReport()
+
+
+@contextlib.contextmanager
+def phase(name):
+    REPORT.enter(name)
+    try:
+        yield
+    finally:
+        REPORT.exit()
+
+
+def timed(name, iterable):
+    # Iterates iterable, counting the time spent producing each item under phase name
+    it = iter(iterable)
+    while True:
+        with phase(name):
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+        yield item
+
+
+def record_page(page_type, name, size, render_seconds=0.0, write_seconds=0.0):
+    REPORT.page(page_type, name, size, render_seconds, write_seconds)
+
+
+def count(name, n=1):
+    REPORT.count(name, n)
+
+
+def write_report(path):
+    report = REPORT.to_dict()
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def print_summary(report):
+    print(f"Build took {report['total_seconds']:.2f}s")
+    for name, entry in report['phases'].items():
+        print(f"  {name:<20} {entry['seconds']:>9.3f}s  ({entry['calls']} calls)")
+    for page_type, entry in report['pages'].items():
+        print(f"  {page_type:<20} {entry['count']:>9} pages  {entry['bytes'] / 1e6:.2f} MB")
+
+
+def add_arguments(parser):
+    parser.add_argument('--report', metavar='PATH', help="Write a JSON build report (phase times, page counts, slowest pages)")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="Write a cProfile dump of the main process (view with python -m pstats PATH)")
+
+
+@contextlib.contextmanager
+def reporting(report_path=None, profile_path=None):
+    # Wraps a generator's __main__ run: starts a fresh report, optionally under cProfile
+    REPORT.reset()
+    profiler = cProfile.Profile() if profile_path else None
+    if profiler:
+        profiler.enable()
+    try:
+        yield REPORT
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+            print(f"Wrote profile to {profile_path}")
+        if report_path:
+            print_summary(write_report(report_path))
+            print(f"Wrote build report to {report_path}")
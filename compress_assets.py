@@ -0,0 +1,126 @@
+import argparse
+import glob
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Generator outputs and static assets that get precompressed sidecars: every page
+# directory build.py writes to, so orphan cleanup covers them all as well.
+# .htaccess serves name.br / name.gz in place of name when the browser accepts it.
+COMPRESS_PATTERNS = [
+    'index.html',
+    'pages/*.html',
+    'pages/blogs/*.html',
+    'pages/trains/*.html',
+    'pages/bookingdate/*.html',
+    'pages/connections/*.html',
+    'pages/train-numbers/*.html',
+    'css/*.css',
+    'js/*.js',
+]
+
+
+def gzip_bytes(data):
+    # mtime=0 so identical input always produces identical .gz bytes
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def brotli_bytes(data):
+    return brotli.compress(data, quality=11, mode=brotli.MODE_TEXT)
+
+
+def _write_sidecar(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_sidecars(path, data):
+    # Compress an in-memory document next to its output file. Returns the sidecars written.
+    written = []
+    _write_sidecar(path + '.gz', gzip_bytes(data))
+    written.append(path + '.gz')
+    if brotli is not None:
+        _write_sidecar(path + '.br', brotli_bytes(data))
+        written.append(path + '.br')
+    return written
+
+
+def refresh_sidecars(path, data):
+    # For scripts that rewrite a page outside a build: sidecars that exist are rewritten
+    # (or removed, a .br without brotli installed), so .htaccess never serves an older
+    # compressed copy. Pages without sidecars stay without.
+    existing = [path + ext for ext in ('.gz', '.br') if os.path.exists(path + ext)]
+    if not existing:
+        return []
+    written = write_sidecars(path, data)
+    for sidecar in existing:
+        if sidecar not in written:
+            os.remove(sidecar)
+    return written
+
+
+def is_fresh(path, sidecar):
+    return os.path.exists(sidecar) and os.path.getmtime(sidecar) >= os.path.getmtime(path)
+
+
+def compress_file(path, force=False):
+    sidecars = [path + '.gz']
+    if brotli is not None:
+        sidecars.append(path + '.br')
+    if not force and all(is_fresh(path, sidecar) for sidecar in sidecars):
+        return False
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    write_sidecars(path, data)
+    return True
+
+
+def iter_targets(base_dir, patterns=COMPRESS_PATTERNS):
+    for pattern in patterns:
+        for path in sorted(glob.glob(os.path.join(base_dir, pattern))):
+            if os.path.isfile(path):
+                yield path
+
+
+def remove_orphan_sidecars(base_dir, patterns=COMPRESS_PATTERNS):
+    # Sidecars whose source page was deleted (e.g. a route that left trains.csv)
+    removed = 0
+    for pattern in patterns:
+        for ext in ('.gz', '.br'):
+            for sidecar in glob.glob(os.path.join(base_dir, pattern + ext)):
+                if not os.path.exists(sidecar[:-len(ext)]):
+                    os.remove(sidecar)
+                    removed += 1
+    return removed
+
+
+def main(base_dir=BASE_DIR, force=False):
+    if brotli is None:
+        print("Warning: brotli module not installed, only writing .gz sidecars (pip install brotli)")
+
+    compressed = 0
+    skipped = 0
+    for path in iter_targets(base_dir):
+        if compress_file(path, force):
+            compressed += 1
+        else:
+            skipped += 1
+    removed = remove_orphan_sidecars(base_dir)
+    print(f"Compressed {compressed} files, {skipped} already up to date, {removed} orphaned sidecars removed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write precompressed .gz/.br sidecars for generated pages and assets")
+    parser.add_argument('--base-dir', default=BASE_DIR, help="Site root")
+    parser.add_argument('--force', action='store_true', help="Recompress even if sidecars are up to date")
+    args = parser.parse_args()
+    main(base_dir=args.base_dir, force=args.force)
@@ -0,0 +1,482 @@
+import argparse
+import hashlib
+import heapq
+import json
+import math
+import os
+import posixpath
+import time
+from collections import Counter
+from html import escape
+
+import build_report
+from build_diff import compare_output
+from build_report import phase, record_page, timed
+from compress_assets import is_fresh, write_sidecars
+from fingerprint import asset_href, write_fingerprinted_assets
+from generate_train_pages import PAGE_DIR as ROUTE_PAGE_DIR
+from generate_train_pages import iter_route_groups, render_train_rows, route_filename, run_render_jobs, slugify
+from partials import partials_digest, render_partial
+from sitemap import write_if_changed
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Journeys with one change of train. Stations are interned to small integer IDs and
+# every route group adds an undirected edge to an adjacency index, the same way route
+# pages merge both directions. One-transfer connections come from joining the edges
+# A-B and B-C on the interchange B through that index, so the work is proportional
+# to the two-hop paths that exist rather than to every pair of stations.
+PAGE_DIR = 'pages/connections'
+DATA_PATH = 'data/connections.json'
+MANIFEST_NAME = 'connection-pages-manifest.json'
+
+# Bump whenever generate_connection_html output changes
+TEMPLATE_VERSION = '1'
+
+# Pages written, strongest connections first; hubs make the two-hop pairs of a full
+# network run into the millions, most of them with a single awkward combination.
+# The count follows the size of the network, so a small CSV does not get thousands
+# of connection pages next to a few hundred routes.
+MAX_CONNECTION_PAGES = 5000
+CONNECTION_PAGES_PER_ROUTE = 0.5
+# Interchanges listed on a page, and trains shown for each leg
+MAX_INTERCHANGES = 5
+MAX_LEG_TRAINS = 10
+
+
+def connection_filename(s1, s2):
+    return f"connections-between-{slugify(s1)}-{slugify(s2)}.html"
+
+
+def connection_hash(s1, s2, legs, variant):
+    h = hashlib.sha1()
+    h.update(f"{TEMPLATE_VERSION}\x1f{variant}\x1f{s1}\x1f{s2}".encode('utf-8'))
+    for b, first, second in legs:
+        h.update(f"\x1d{b}".encode('utf-8'))
+        for train in first + second:
+            h.update(f"\x1e{train.number}\x1f{train.name}\x1f{train.source}\x1f{train.destination}".encode('utf-8'))
+    return h.hexdigest()
+
+
+def load_manifest(manifest_path):
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('template_version') != TEMPLATE_VERSION:
+        return {}
+    return manifest.get('pages', {})
+
+
+def save_manifest(manifest_path, pages):
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'template_version': TEMPLATE_VERSION, 'pages': pages}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+class StationGraph:
+    def __init__(self):
+        self.ids = {}        # station name -> id
+        self.names = []      # id -> station name
+        self.adjacency = []  # id -> {neighbour id: trains between the two}
+        self.legs = {}       # (lower id, higher id) -> first MAX_LEG_TRAINS trains of the route
+
+    def intern(self, name):
+        station_id = self.ids.get(name)
+        if station_id is None:
+            station_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.adjacency.append({})
+        return station_id
+
+    def add_route(self, s1, s2, trains):
+        # One consolidated route group from iter_route_groups; a route never visits itself
+        if s1 == s2:
+            return
+        a, b = self.intern(s1), self.intern(s2)
+        self.adjacency[a][b] = self.adjacency[b][a] = len(trains)
+        self.legs[(min(a, b), max(a, b))] = trains[:MAX_LEG_TRAINS]
+
+    def leg(self, a, b):
+        return self.legs[(min(a, b), max(a, b))]
+
+    def one_transfer(self):
+        # Yields (score, a, c) once per station pair a < c that has no direct route but is
+        # joined through at least one interchange b. Each interchange counts the trains on
+        # its weaker leg towards score.
+        adjacency = self.adjacency
+        for a, neighbours in enumerate(adjacency):
+            scores = Counter()
+            for b, trains_ab in neighbours.items():
+                # adjacency[b] is the hash table of the join on b
+                if trains_ab == 1:
+                    # Most routes have a single train, so the weaker leg is always this one
+                    # and Counter.update counts the whole neighbour list in C
+                    scores.update(adjacency[b].keys())
+                else:
+                    for c, trains_bc in adjacency[b].items():
+                        scores[c] += min(trains_ab, trains_bc)
+            # Pairs are produced from their lower id; a direct route already has a page
+            for c, score in scores.items():
+                if c > a and c not in neighbours:
+                    yield score, a, c
+
+    def interchanges(self, a, c):
+        # [(strength, b), ...] for a pair found by one_transfer
+        adjacency = self.adjacency
+        return [(min(adjacency[a][b], adjacency[b][c]), b) for b in adjacency[a].keys() & adjacency[c].keys()]
+
+
+class ConnectionIndex:
+    # Route group observer for generate_train_pages.main: collects the station graph while
+    # the routes stream past, then finish() writes the connection pages and data. A page
+    # is only re-rendered when its hash (legs, stages, stylesheet and partials) moved.
+    # max_pages=None caps the pages at CONNECTION_PAGES_PER_ROUTE of the routes seen.
+    def __init__(self, base_dir=BASE_DIR, transform=None, transform_key='', compress=False, digests=None,
+                 changes=None, max_pages=None, workers=None):
+        self.base_dir = base_dir
+        self.transform = transform
+        self.transform_key = transform_key
+        self.compress = compress
+        self.digests = digests if digests is not None else {}
+        self.changes = changes
+        self.max_pages = max_pages
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.graph = StationGraph()
+        self.routes = 0
+
+    def add_route(self, s1, s2, filename, trains):
+        self.graph.add_route(s1, s2, trains)
+        self.routes += 1
+
+    def finish(self):
+        graph = self.graph
+        max_pages = self.max_pages
+        if max_pages is None:
+            max_pages = min(MAX_CONNECTION_PAGES, math.ceil(self.routes * CONNECTION_PAGES_PER_ROUTE))
+        with phase('connections-join'):
+            # Only the score is kept per pair; ties go to the higher ids, which follow CSV
+            # order, so the selection is stable
+            best = heapq.nlargest(max_pages, graph.one_transfer())
+        connections = []
+        for score, a, c in best:
+            s1, s2 = sorted((graph.names[a], graph.names[c]))
+            options = sorted(graph.interchanges(a, c), key=lambda option: (-option[0], graph.names[option[1]]))
+            connections.append((s1, s2, [graph.names[b] for _, b in options[:MAX_INTERCHANGES]]))
+        connections.sort()
+        build_report.count('stations', len(graph.names))
+        build_report.count('connections', len(connections))
+
+        output_dir = os.path.join(self.base_dir, PAGE_DIR)
+        manifest_path = os.path.join(self.base_dir, '.build', MANIFEST_NAME)
+        previous = load_manifest(manifest_path)
+        if self.changes is None:
+            os.makedirs(output_dir, exist_ok=True)
+        variant = (f"transform={self.transform_key};assets={asset_href('css/navigation.css', PAGE_DIR, self.base_dir)};"
+                   f"partials={partials_digest(PAGE_DIR)}")
+        pages = {}
+        options = {'transform': self.transform, 'compress': self.compress, 'dry_run': self.changes is not None,
+                   'base_dir': self.base_dir}
+
+        def pending_jobs():
+            for s1, s2, interchanges in connections:
+                filename = connection_filename(s1, s2)
+                rel_path = f"{PAGE_DIR}/{filename}"
+                path = os.path.join(output_dir, filename)
+                legs = [(b, graph.leg(graph.ids[s1], graph.ids[b]), graph.leg(graph.ids[b], graph.ids[s2]))
+                        for b in interchanges]
+                digest = pages[filename] = connection_hash(s1, s2, legs, variant)
+                # Like route pages, the input hash doubles as the sitemap digest
+                self.digests[rel_path] = digest
+                if previous.get(filename) == digest and os.path.exists(path):
+                    if self.changes is not None:
+                        size = os.path.getsize(path)
+                        self.changes.add(rel_path, 'unchanged', size, size)
+                    continue
+                yield (output_dir, s1, s2, legs, options)
+
+        rendered = 0
+        written = 0
+        # Rendered in the route page worker pool; with workers this is the time spent waiting on them
+        results = run_render_jobs(pending_jobs(), self.workers, render=render_connection)
+        for filename, (size, render_seconds, write_seconds), change in timed('connections-render', results):
+            rel_path = f"{PAGE_DIR}/{filename}"
+            if self.changes is not None:
+                self.changes.add(rel_path, change[0], change[1], size)
+                written += change[0] != 'unchanged'
+            else:
+                written += change
+            record_page('connection', rel_path, size, render_seconds, write_seconds)
+            rendered += 1
+        self.remove_stale(output_dir, pages)
+        if self.changes is None:
+            save_manifest(manifest_path, pages)
+
+        with phase('connections-data'):
+            self.write_data(connections)
+        print(f"Connections: {len(graph.names)} stations, {len(connections)} one-change pages, {rendered} rendered, "
+              f"{written} {'would change' if self.changes is not None else 'written'}")
+        return connections
+
+    def remove_stale(self, output_dir, filenames):
+        if not os.path.isdir(output_dir):
+            return
+        for filename in sorted(os.listdir(output_dir)):
+            if not filename.endswith('.html') or filename in filenames:
+                continue
+            path = os.path.join(output_dir, filename)
+            if self.changes is not None:
+                self.changes.removed(f"{PAGE_DIR}/{filename}", path)
+                continue
+            os.remove(path)
+            for sidecar in (path + '.gz', path + '.br'):
+                if os.path.exists(sidecar):
+                    os.remove(sidecar)
+
+    def write_data(self, connections):
+        # Station names are listed once and referenced by position
+        stations = sorted({name for s1, s2, interchanges in connections for name in (s1, s2, *interchanges)})
+        ids = {name: i for i, name in enumerate(stations)}
+        data = {
+            'stations': stations,
+            'connections': [[ids[s1], ids[s2], [ids[b] for b in interchanges], connection_filename(s1, s2)]
+                            for s1, s2, interchanges in connections],
+        }
+        text = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        path = os.path.join(self.base_dir, DATA_PATH)
+        if self.changes is not None:
+            self.changes.compare(DATA_PATH, path, text)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_if_changed(path, text)
+
+
+def write_connection_page(path, data, compress):
+    # Returns True if the page changed on disk
+    changed = write_if_changed(path, data)
+    if compress and (changed or not is_fresh(path, path + '.gz')):
+        write_sidecars(path, data)
+    return changed
+
+
+def render_connection(job):
+    # Worker side of ConnectionIndex.finish, like generate_train_pages.render_route.
+    # Returns (filename, (bytes, render seconds, write seconds), change): change is
+    # whether the page was written, or for a dry run (status, bytes on disk).
+    output_dir, s1, s2, legs, options = job
+    filename = connection_filename(s1, s2)
+    path = os.path.join(output_dir, filename)
+    start = time.perf_counter()
+    html = generate_connection_html(s1, s2, legs, options['base_dir'])
+    if options['transform'] is not None:
+        html = options['transform'](html, f"{PAGE_DIR}/{filename}")
+    data = html.encode('utf-8')
+    rendered = time.perf_counter()
+    if options['dry_run']:
+        change = compare_output(path, data)
+    else:
+        change = write_connection_page(path, data, options['compress'])
+    return filename, (len(data), rendered - start, time.perf_counter() - rendered), change
+
+
+def render_leg(s1, s2, trains):
+    # Links to the full route page; the pair is sorted the way route pages are named
+    route_href = posixpath.relpath(f"{ROUTE_PAGE_DIR}/{route_filename(*sorted((s1, s2)))}", PAGE_DIR)
+    return f"""                <h3>{escape(s1)} to {escape(s2)}</h3>
+                <table>
+                    <thead>
+                        <tr>
+                            <th>No.</th>
+                            <th>Train Name</th>
+                            <th>Starting Station</th>
+                            <th>Ending Station</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+{render_train_rows(trains)}                    </tbody>
+                </table>
+                <p><a href="{route_href}" class="route-link">All trains between {escape(s1)} and {escape(s2)}</a></p>
+"""
+
+
+def generate_connection_html(source, destination, legs, base_dir=BASE_DIR):
+    # legs: [(interchange, trains source-interchange, trains interchange-destination)]
+    title = f"Trains from {source} to {destination} with one change | Connecting trains"
+    description = f"No direct train between {source} and {destination}? See connecting trains with one change, via {', '.join(b for b, _, _ in legs)}. Calculate your IRCTC booking date for each leg."
+    keywords = f"connecting trains {source} to {destination}, {source} to {destination} via, trains between {source} and {destination} with one change, IRCTC booking date calculator"
+
+    sections = ''.join(f"""
+        <section class="train-list-section">
+            <h2>Change at {escape(b)}</h2>
+{render_leg(source, b, first)}{render_leg(b, destination, second)}        </section>
+""" for b, first, second in legs)
+
+    source, destination = escape(source), escape(destination)
+    title, description, keywords = escape(title), escape(description), escape(keywords)
+
+    return f"""<!DOCTYPE html>
+<html lang="en-IN">
+
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+{render_partial('analytics', PAGE_DIR)}
+    <title>{title}</title>
+    <meta name="description" content="{description}">
+    <meta name="keywords" content="{keywords}">
+
+    <link rel="icon" type="image/png" sizes="96x96" href="../../favicon-96x96.png">
+    <link rel="icon" type="image/x-icon" sizes="any" href="../../favicon.ico">
+    <link rel="apple-touch-icon" href="../../apple-touch-icon.png">
+
+    <meta name="theme-color" content="#ff6b00">
+
+    <link rel="stylesheet" href="{asset_href('css/navigation.css', PAGE_DIR, base_dir)}">
+
+    <style>
+        :root {{
+            --bg-app: #fef7ed;
+            --bg-card: #ffffff;
+            --text-primary: #1a365d;
+            --text-tertiary: #718096;
+            --primary: #ff6b00;
+            --border-light: #fed7aa;
+            --font-heading: 'DM Sans', system-ui, -apple-system, sans-serif;
+            --font-body: 'Plus Jakarta Sans', system-ui, -apple-system, sans-serif;
+        }}
+
+        [data-theme="dark"] {{
+            --bg-app: #0f1729;
+            --bg-card: #1a2744;
+            --text-primary: #f7fafc;
+            --text-tertiary: #a0aec0;
+            --primary: #ff8533;
+            --border-light: #3d4f6f;
+        }}
+
+        body {{
+            background-color: var(--bg-app);
+            color: var(--text-primary);
+            font-family: var(--font-body);
+            line-height: 1.6;
+            margin: 0;
+        }}
+
+        .app-container {{
+            max-width: 800px;
+            margin: 0 auto;
+            padding: 2rem 1rem;
+        }}
+
+        .app-header {{
+            text-align: center;
+            margin-bottom: 2rem;
+        }}
+
+        .app-header h1 {{
+            font-family: var(--font-heading);
+            font-size: 2rem;
+            margin-bottom: 0.5rem;
+        }}
+
+        .train-list-section {{
+            background: var(--bg-card);
+            border-radius: 16px;
+            padding: 1.5rem;
+            border: 1px solid var(--border-light);
+            box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
+            margin-bottom: 2rem;
+            overflow-x: auto;
+        }}
+
+        .train-list-section h2 {{
+            color: var(--primary);
+            font-family: var(--font-heading);
+            margin-top: 0;
+        }}
+
+        table {{
+            width: 100%;
+            border-collapse: collapse;
+            text-align: left;
+        }}
+
+        th, td {{
+            padding: 12px;
+            border-bottom: 1px solid var(--border-light);
+        }}
+
+        th {{
+            color: var(--primary);
+            font-family: var(--font-heading);
+        }}
+
+        .route-link {{
+            color: var(--primary);
+            font-weight: 600;
+        }}
+
+        .disclaimer {{
+            font-size: 0.85rem;
+            color: var(--text-tertiary);
+            text-align: center;
+        }}
+
+        @media (max-width: 600px) {{
+            .app-header h1 {{ font-size: 1.5rem; }}
+        }}
+    </style>
+    <script>
+        (function () {{ var t = localStorage.getItem('theme'); if (t === 'dark') document.documentElement.setAttribute('data-theme', 'dark') }})();
+    </script>
+</head>
+
+<body>
+    <div class="app-container">
+{render_partial('nav', PAGE_DIR)}
+
+        <header class="app-header">
+            <h1>Trains from {source} to {destination} with one change</h1>
+            <p>There is no direct train between <strong>{source}</strong> and <strong>{destination}</strong>. These interchanges have trains on both legs of the journey.</p>
+        </header>
+{sections}
+        <p class="disclaimer">Note: Connections are worked out from train start and end stations only. Check timings, intermediate stops and availability on the official Indian Railways / IRCTC portal before planning your trip.</p>
+
+{render_partial('footer', PAGE_DIR)}
+    </div>
+</body>
+</html>
+"""
+
+
+def main(base_dir=BASE_DIR, max_pages=None, workers=None, transform=None, transform_key='', compress=False):
+    # Standalone run: reads the route groups itself instead of riding along a route build
+    index = ConnectionIndex(base_dir, transform, transform_key, compress, max_pages=max_pages, workers=workers)
+    for s1, s2, trains in iter_route_groups(os.path.join(base_dir, 'trains.csv')):
+        index.add_route(s1, s2, route_filename(s1, s2), trains)
+    index.finish()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate one-change connection pages and data from trains.csv")
+    parser.add_argument('--base-dir', default=BASE_DIR, help="Site root containing trains.csv")
+    parser.add_argument('--max-pages', type=int, default=None,
+                        help=f"Connection pages to write, strongest first (default: {CONNECTION_PAGES_PER_ROUTE:g} "
+                             f"per route, at most {MAX_CONNECTION_PAGES})")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes used to render pages (default: number of CPU cores)")
+    # Imported here: build builds on this module
+    import build
+    build.add_stage_argument(parser)
+    build_report.add_arguments(parser)
+    args = parser.parse_args()
+    try:
+        transform, transform_key, compress = build.standalone_stages(args.stages, args.base_dir)
+    except ValueError as e:
+        parser.error(str(e))
+    with build_report.reporting(args.report, args.profile):
+        write_fingerprinted_assets(args.base_dir)
+        main(base_dir=args.base_dir, max_pages=args.max_pages, workers=args.workers,
+             transform=transform, transform_key=transform_key, compress=compress)
@@ -0,0 +1,175 @@
+import fnmatch
+import functools
+import os
+import posixpath
+import re
+
+from fingerprint import source_name
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Render-blocking stylesheets are replaced by the rules the page needs above the
+# fold, inlined, plus an async load of the full files. The fold ends at the first
+# marker after <body>; markup past it is what the async sheets arrive in time for.
+# (template, rel_path glob, fold marker)
+CRITICAL_TEMPLATES = [
+    ('route', 'pages/trains/*.html', '<tbody'),
+    ('booking', 'pages/bookingdate/*.html', '<tbody'),
+    ('blog', 'pages/blogs/*.html', '<section'),
+]
+# index.html needs no entry: it already inlines its styles and links no stylesheet
+
+# Fold size when a page lacks its template's marker
+FOLD_BYTES = 8192
+
+CRITICAL_STYLE = re.compile(r'[ \t]*<style data-critical>.*?</style>\n?', re.DOTALL)
+ASYNC_LINK = re.compile(
+    r'<link rel="preload" href="(?P<href>[^"]+)" as="style" onload="[^"]*">'
+    r'<noscript><link rel="stylesheet" href="(?P=href)"></noscript>')
+STYLESHEET_LINK = re.compile(r'(?P<indent>[ \t]*)<link rel="stylesheet" href="(?P<href>[^":]+\.css)"\s*/?>\n?')
+
+COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+PSEUDO = re.compile(r'::?[\w-]+(\([^()]*\))?')
+ATTRIBUTE = re.compile(r'\[[^\]]*\]')
+SIMPLE_SELECTOR = re.compile(r'([.#]?)(-?[_a-zA-Z][\w-]*)')
+TAG = re.compile(r'<([a-zA-Z][\w-]*)')
+CLASS_ATTR = re.compile(r'\bclass="([^"]*)"')
+ID_ATTR = re.compile(r'\bid="([^"]*)"')
+
+
+def template_for(rel_path):
+    for name, pattern, marker in CRITICAL_TEMPLATES:
+        if fnmatch.fnmatch(rel_path, pattern):
+            return name, marker
+    return None, None
+
+
+def parse_blocks(css):
+    # Top-level (prelude, body) pairs; body is None for statements such as @import
+    blocks = []
+    depth = 0
+    start = 0
+    body_start = 0
+    quote = None
+    for i, char in enumerate(css):
+        if quote:
+            if char == quote and css[i - 1] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '{':
+            if depth == 0:
+                prelude = css[start:i]
+                body_start = i + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                blocks.append((prelude.strip(), css[body_start:i]))
+                start = i + 1
+        elif char == ';' and depth == 0:
+            blocks.append((css[start:i].strip(), None))
+            start = i + 1
+    return blocks
+
+
+def selector_tokens(selector):
+    # {(prefix, name)} a selector needs on the page: '' tag, '.' class, '#' id
+    selector = ATTRIBUTE.sub('', PSEUDO.sub('', selector))
+    return {(prefix, name.lower() if not prefix else name) for prefix, name in SIMPLE_SELECTOR.findall(selector)}
+
+
+def selector_used(selector, used):
+    # Conservative: every tag, class and id in the selector must appear in the fold.
+    # Selectors without any (*, :root, [data-theme]) always apply.
+    return selector_tokens(selector) <= used
+
+
+def page_tokens(html):
+    used = {('', tag.lower()) for tag in TAG.findall(html)}
+    for value in CLASS_ATTR.findall(html):
+        used.update(('.', name) for name in value.split())
+    used.update(('#', value) for value in ID_ATTR.findall(html))
+    return frozenset(used)
+
+
+def critical_rules(css, used):
+    out = []
+    for prelude, body in parse_blocks(css):
+        if body is None:
+            continue
+        if prelude.startswith(('@media', '@supports')):
+            inner = critical_rules(body, used)
+            if inner:
+                out.append(f"{prelude}{{{inner}}}")
+        elif prelude.startswith('@font-face'):
+            out.append(f"{prelude}{{{' '.join(body.split())}}}")
+        elif prelude.startswith('@'):
+            # @keyframes and the like arrive with the full sheet
+            continue
+        elif any(selector_used(selector, used) for selector in prelude.split(',')):
+            out.append(f"{' '.join(prelude.split())}{{{' '.join(body.split())}}}")
+    return ''.join(out)
+
+
+@functools.lru_cache(maxsize=None)
+def _read_css(path, mtime_ns):
+    with open(path, 'r', encoding='utf-8') as f:
+        return COMMENT.sub('', f.read())
+
+
+@functools.lru_cache(maxsize=256)
+def _critical_css(sheets, used):
+    # sheets: ((path, mtime_ns), ...); pages of one template mostly share a token set
+    return ''.join(critical_rules(_read_css(path, mtime_ns), used) for path, mtime_ns in sheets)
+
+
+def fold_html(html, marker):
+    body = html.find('<body')
+    end = html.find(marker, body) if marker and body >= 0 else -1
+    if end < 0:
+        end = max(body, 0) + FOLD_BYTES
+    return html[:end]
+
+
+def async_stylesheet(indent, href):
+    return (f'{indent}<link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+            f'<noscript><link rel="stylesheet" href="{href}"></noscript>\n')
+
+
+def apply_critical_css(html, rel_path, base_dir=BASE_DIR):
+    # Idempotent: a page this already ran on is first put back to plain <link>s,
+    # so critical rules are recomputed whenever the page or its stylesheets change
+    template, marker = template_for(rel_path)
+    if template is None:
+        return html
+
+    html = CRITICAL_STYLE.sub('', html)
+    html = ASYNC_LINK.sub(lambda m: f'<link rel="stylesheet" href="{m.group("href")}">', html)
+
+    page_dir = posixpath.dirname(rel_path)
+    links = []
+    for match in STYLESHEET_LINK.finditer(html):
+        target = posixpath.normpath(posixpath.join(page_dir, match.group('href')))
+        path = os.path.join(base_dir, target)
+        if not os.path.exists(path):
+            # A hashed copy not written yet (dry run) has the same content as its source
+            path = os.path.join(base_dir, source_name(target))
+        if os.path.exists(path):
+            links.append((match, path))
+    if not links:
+        return html
+
+    sheets = tuple((path, os.stat(path).st_mtime_ns) for _, path in links)
+    css = _critical_css(sheets, page_tokens(fold_html(html, marker)))
+    parts = []
+    pos = 0
+    for i, (match, _) in enumerate(links):
+        parts.append(html[pos:match.start()])
+        indent = match.group('indent')
+        if i == 0:
+            parts.append(f'{indent}<style data-critical>{css}</style>\n')
+        parts.append(async_stylesheet(indent, match.group('href')))
+        pos = match.end()
+    parts.append(html[pos:])
+    return ''.join(parts)
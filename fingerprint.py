@@ -0,0 +1,166 @@
+import argparse
+import functools
+import glob
+import json
+import os
+import posixpath
+import re
+import shutil
+import time
+
+from sitemap import file_digest
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Stylesheets and scripts are served under content-hashed names (styles.<hash>.css)
+# that .htaccess marks immutable for a year, so repeat visits never revalidate them.
+# The plain files stay the editable sources; the hashed copies are build output.
+FINGERPRINT_PATTERNS = ['css/*.css', 'js/*.js']
+HASH_LENGTH = 10
+
+# Pages cached before a deploy (the service worker keeps route pages for 30 days) still
+# link the old hashed names, so a replaced copy is kept for RETAIN_DAYS after it stopped
+# being current, and the last copy of each source is kept until a newer one is replaced.
+# When each copy was replaced is recorded in .build/RETIRED_NAME.
+RETAIN_DAYS = 30
+RETIRED_NAME = 'fingerprint-retired.json'
+
+FINGERPRINTED = re.compile(r'^(?P<stem>.+)\.[0-9a-f]{%d}(?P<ext>\.(?:css|js))$' % HASH_LENGTH)
+ASSET_REFERENCE = re.compile(r'''(?P<attr>\b(?:href|src)=)(?P<quote>["'])(?P<url>[^"'?#:]+\.(?:css|js))(?P=quote)''')
+
+
+def source_name(rel_path):
+    # 'css/styles.0123456789.css' -> 'css/styles.css'; plain names are returned as is
+    match = FINGERPRINTED.match(rel_path)
+    if match:
+        return match.group('stem') + match.group('ext')
+    return rel_path
+
+
+def iter_sources(base_dir, patterns=FINGERPRINT_PATTERNS):
+    for pattern in patterns:
+        for path in sorted(glob.glob(os.path.join(base_dir, pattern))):
+            rel_path = os.path.relpath(path, base_dir).replace(os.sep, '/')
+            if not FINGERPRINTED.match(rel_path):
+                yield rel_path
+
+
+@functools.lru_cache(maxsize=None)
+def _hashed_name(path, rel_path, mtime_ns, size):
+    # Keyed on mtime and size so an edited source is hashed again
+    stem, ext = posixpath.splitext(rel_path)
+    return f"{stem}.{file_digest(path)[:HASH_LENGTH]}{ext}"
+
+
+def fingerprinted_name(rel_path, base_dir=BASE_DIR):
+    path = os.path.join(base_dir, rel_path)
+    stat = os.stat(path)
+    return _hashed_name(path, rel_path, stat.st_mtime_ns, stat.st_size)
+
+
+def asset_href(rel_path, page_dir, base_dir=BASE_DIR):
+    # Link to an asset from a page in page_dir ('' for the site root), by its hashed name
+    if os.path.exists(os.path.join(base_dir, rel_path)):
+        rel_path = fingerprinted_name(rel_path, base_dir)
+    return posixpath.relpath(rel_path, page_dir or '.')
+
+
+def rewrite_asset_references(html, rel_path, base_dir=BASE_DIR):
+    # Points every href/src at a local css/js file to its current hashed name. References
+    # that are already hashed are matched through their source, so a stale hash is updated.
+    page_dir = posixpath.dirname(rel_path)
+
+    def replace(match):
+        url = match.group('url')
+        if url.startswith('//'):
+            return match.group(0)
+        if url.startswith('/'):
+            target = url.lstrip('/')
+        else:
+            target = posixpath.normpath(posixpath.join(page_dir, url))
+        source = source_name(target)
+        if not os.path.exists(os.path.join(base_dir, source)):
+            return match.group(0)
+        if url.startswith('/'):
+            new_url = '/' + fingerprinted_name(source, base_dir)
+        else:
+            new_url = asset_href(source, page_dir, base_dir)
+        return f"{match.group('attr')}{match.group('quote')}{new_url}{match.group('quote')}"
+
+    return ASSET_REFERENCE.sub(replace, html)
+
+
+def is_current(rel_path, base_dir=BASE_DIR):
+    # False for a hashed copy of an older version of its source
+    match = FINGERPRINTED.match(rel_path)
+    if not match:
+        return True
+    source = source_name(rel_path)
+    if not os.path.exists(os.path.join(base_dir, source)):
+        return True
+    return fingerprinted_name(source, base_dir) == rel_path
+
+
+def load_retired(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_fingerprinted_assets(base_dir=BASE_DIR, patterns=FINGERPRINT_PATTERNS, now=None):
+    # Writes a hashed copy of every source and removes copies of older versions
+    # (with their .gz/.br sidecars) once they are past RETAIN_DAYS and no longer the
+    # previous generation. Returns {source: hashed name}.
+    now = time.time() if now is None else now
+    mapping = {}
+    written = 0
+    for rel_path in iter_sources(base_dir, patterns):
+        hashed = fingerprinted_name(rel_path, base_dir)
+        mapping[rel_path] = hashed
+        target = os.path.join(base_dir, hashed)
+        if not os.path.exists(target):
+            shutil.copyfile(os.path.join(base_dir, rel_path), target)
+            written += 1
+
+    current = set(mapping.values())
+    retired_path = os.path.join(base_dir, '.build', RETIRED_NAME)
+    previous = load_retired(retired_path)
+    # Older copies by source, with the time each stopped being current (first seen now)
+    retired = {}
+    older = {}
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(base_dir, pattern)):
+            rel_path = os.path.relpath(path, base_dir).replace(os.sep, '/')
+            if FINGERPRINTED.match(rel_path) and rel_path not in current:
+                retired[rel_path] = previous.get(rel_path, now)
+                older.setdefault(source_name(rel_path), []).append((retired[rel_path], os.path.getmtime(path), rel_path))
+
+    kept = 0
+    removed = 0
+    for copies in older.values():
+        copies.sort(reverse=True)
+        for i, (retired_at, _, rel_path) in enumerate(copies):
+            if i == 0 or now - retired_at < RETAIN_DAYS * 86400:
+                kept += 1
+                continue
+            path = os.path.join(base_dir, rel_path)
+            for stale in (path, path + '.gz', path + '.br'):
+                if os.path.exists(stale):
+                    os.remove(stale)
+            del retired[rel_path]
+            removed += 1
+
+    if retired != previous:
+        os.makedirs(os.path.dirname(retired_path), exist_ok=True)
+        with open(retired_path, 'w', encoding='utf-8') as f:
+            json.dump(retired, f, indent=1, sort_keys=True)
+    print(f"Fingerprinted assets: {len(mapping)} current, {written} written, {kept} older kept, {removed} stale removed")
+    return mapping
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write content-hashed copies of css/js assets")
+    parser.add_argument('--base-dir', default=BASE_DIR, help="Site root")
+    args = parser.parse_args()
+    write_fingerprinted_assets(args.base_dir)
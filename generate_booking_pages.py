@@ -1,18 +1,79 @@
+import argparse
 import datetime
+import glob
+import json
 import os
+import time
 
 import urllib.parse
 
-def get_booking_date(journey_date, days_before):
-    return journey_date - datetime.timedelta(days=days_before)
-
-def get_google_cal_link(date_obj, hour, title, details):
+import build_report
+from build_report import phase, record_page
+from booking_rules import as_dates, booking_windows, rule_for
+from compress_assets import refresh_sidecars
+from fingerprint import asset_href, write_fingerprinted_assets
+from minify_html import minify_html
+from partials import render_partial
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Output directory relative to the site root; partials resolve their links against it
+PAGE_DIR = 'pages/bookingdate'
+
+# Per-month data for the home page calendar in js/app.js, relative to the site root
+CALENDAR_DATA_DIR = 'data/calendar'
+CALENDAR_INDEX = 'index.json'
+# Months of calendar data written from the current month onwards. Months past the
+# last entry in HOLIDAYS are still written, with no holidays, and the build warns.
+CALENDAR_MONTHS = 12
+
+# (date, name, long weekend) - shown on the home page calendar
+HOLIDAYS = [
+    ('2026-03-04', 'Holi Holiday', False),
+    ('2026-03-05', 'Holi Holiday', False),
+    ('2026-03-06', 'Holi Holiday', False),
+    ('2026-03-07', 'Holi Holiday', False),
+    ('2026-03-21', 'Id-ul-Fitr', False),
+    ('2026-03-26', 'Ram Navami', True),
+    ('2026-03-31', 'Mahavir Jayanti', False),
+    ('2026-04-03', 'Good Friday', True),
+    ('2026-05-01', 'Budha Purnima', True),
+    ('2026-05-27', 'Id-ul-Zuha (Bakrid)', False),
+    ('2026-06-26', 'Muharram', True),
+    ('2026-08-15', 'Independence Day', False),
+    ('2026-08-26', 'Milad-un-Nabi', False),
+    ('2026-08-28', 'Raksha Bandhan', True),
+    ('2026-09-04', 'Janmashtami', True),
+    ('2026-09-14', 'Ganesh Chaturthi', True),
+    ('2026-10-02', 'Mahatma Gandhi Birthday', True),
+    ('2026-10-19', 'Dussehra Holiday', True),
+    ('2026-10-20', 'Dussehra Holiday', True),
+    ('2026-10-21', 'Dussehra Holiday', True),
+    ('2026-10-22', 'Dussehra Holiday', True),
+    ('2026-10-23', 'Dussehra Holiday', True),
+    ('2026-10-24', 'Dussehra Holiday', True),
+    ('2026-11-09', 'Diwali Holiday', True),
+    ('2026-11-10', 'Diwali Holiday', True),
+    ('2026-11-11', 'Diwali Holiday', True),
+    ('2026-11-12', 'Diwali Holiday', True),
+    ('2026-11-13', 'Diwali Holiday', True),
+    ('2026-11-14', 'Diwali Holiday', True),
+    ('2026-11-24', 'Guru Nanak Birthday', False),
+    ('2026-12-25', 'Christmas', True),
+]
+
+def parse_time(text):
+    hour, minute = text.split(':')
+    return int(hour), int(minute)
+
+def get_google_cal_link(date_obj, ist_time, title, details):
     # IRCTC times are IST (UTC+5:30)
     # 8 AM IST = 02:30 UTC
     # 10 AM IST = 04:30 UTC
     # 11 AM IST = 05:30 UTC
     
-    start_time = datetime.datetime(date_obj.year, date_obj.month, date_obj.day, hour, 0)
+    hour, minute = parse_time(ist_time)
+    start_time = datetime.datetime(date_obj.year, date_obj.month, date_obj.day, hour, minute)
     # Convert IST to UTC for the link format (subtract 5.5 hours)
     utc_start = start_time - datetime.timedelta(hours=5, minutes=30)
     utc_end = utc_start + datetime.timedelta(minutes=30)
@@ -29,14 +90,43 @@ def get_google_cal_link(date_obj, hour, title, details):
     }
     return base_url + "&" + urllib.parse.urlencode(params)
 
-def generate_month_page(year, month, output_dir):
+def time_label(text):
+    # '08:00' -> '8:00 AM'
+    hour, minute = parse_time(text)
+    return f"{(hour - 1) % 12 + 1}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+def hour_label(text):
+    # '10:00' -> '10 AM', keeping minutes only when they are not zero
+    label = time_label(text)
+    return label.replace(':00 ', ' ')
+
+def month_filename(year, month):
+    month_slug = datetime.date(year, month, 1).strftime('%B').lower()
+    # 2026 pages were published before multi-year support and keep their URLs
+    if year == LEGACY_YEAR:
+        return f"{month_slug}-booking-date.html"
+    return f"{month_slug}-{year}-booking-date.html"
+
+def month_bounds(year, month):
+    start_date = datetime.date(year, month, 1)
+    if month == 12:
+        end_date = datetime.date(year + 1, 1, 1)
+    else:
+        end_date = datetime.date(year, month + 1, 1)
+    return start_date, end_date
+
+def render_month_page(year, month, base_dir=BASE_DIR):
     month_name = datetime.date(year, month, 1).strftime('%B')
-    month_slug = month_name.lower()
-    filename = f"{month_slug}-booking-date.html"
-    filepath = os.path.join(output_dir, filename)
-    
-    title = f"{month_name} 2026 Train Ticket Booking Dates - IRCTC Calendar"
-    description = f"Check IRCTC train ticket booking dates for {month_name} 2026. Find when general reservation (60 days ARP) and Tatkal booking opens for your travel date."
+    filename = month_filename(year, month)
+    start_date, end_date = month_bounds(year, month)
+    # Opening dates for the whole month come from the rule engine in one batch
+    windows = booking_windows(start_date, end_date)
+    journeys, general, tatkal = (as_dates(windows[key]) for key in ('journey', 'general', 'tatkal'))
+    # Header copy follows the rule in force when the month's first journey date opened
+    header_rule = rule_for(general[0])
+
+    title = f"{month_name} {year} Train Ticket Booking Dates - IRCTC Calendar"
+    description = f"Check IRCTC train ticket booking dates for {month_name} {year}. Find when general reservation ({header_rule.arp_days} days ARP) and Tatkal booking opens for your travel date."
     
     html_content = f"""<!DOCTYPE html>
 <html lang="en-IN">
@@ -52,218 +142,16 @@ def generate_month_page(year, month, output_dir):
     <link rel="shortcut icon" href="../../favicon.ico">
     <meta name="theme-color" content="#ff6b00">
 
-    <link rel="stylesheet" href="../../css/navigation.css">
-    
-    <style>
-        :root {{
-            --bg-app: #f8fafc;
-            --bg-card: #ffffff;
-            --text-primary: #102a43;
-            --text-secondary: #486581;
-            --primary: #f97316;
-            --primary-dark: #ea580c;
-            --border-light: #e2e8f0;
-            --shadow-card: 0 14px 30px rgba(15, 23, 42, 0.08);
-            --font-heading: 'DM Sans', system-ui, -apple-system, sans-serif;
-            --font-body: 'Plus Jakarta Sans', system-ui, -apple-system, sans-serif;
-        }}
-
-        [data-theme="dark"] {{
-            --bg-app: #0b1220;
-            --bg-card: #121c2e;
-            --text-primary: #f8fafc;
-            --text-secondary: #cbd5e1;
-            --border-light: #243249;
-        }}
-
-        body {{
-            margin: 0;
-            font-family: var(--font-body);
-            color: var(--text-primary);
-            background: var(--bg-app);
-            line-height: 1.5;
-            min-height: 100vh;
-        }}
-
-        .app-container {{
-            max-width: 1000px;
-            margin: 0 auto;
-            padding: 2rem 1rem;
-        }}
-
-        header {{
-            text-align: center;
-            margin-bottom: 2rem;
-        }}
-
-        .main-nav {{
-            display: flex;
-            justify-content: center;
-            flex-wrap: wrap;
-            gap: 1rem;
-            margin-bottom: 1.5rem;
-        }}
-
-        .main-nav a {{
-            text-decoration: none;
-            color: var(--text-secondary);
-            font-weight: 600;
-            font-size: 0.9rem;
-        }}
-
-        .main-nav a:hover {{
-            color: var(--primary);
-        }}
-
-        h1 {{
-            font-family: var(--font-heading);
-            font-size: clamp(1.5rem, 4vw, 2.2rem);
-            color: var(--primary);
-            margin-bottom: 0.5rem;
-            letter-spacing: -0.02em;
-        }}
-
-        .subtitle {{
-            color: var(--text-secondary);
-            font-size: 1.1rem;
-        }}
-
-        .card {{
-            background: var(--bg-card);
-            border-radius: 20px;
-            padding: 1.5rem;
-            box-shadow: var(--shadow-card);
-            border: 1px solid var(--border-light);
-            overflow-x: auto;
-        }}
-
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 1rem;
-            font-size: 0.95rem;
-            min-width: 600px;
-        }}
-
-        th, td {{
-            padding: 14px;
-            text-align: left;
-            border-bottom: 1px solid var(--border-light);
-        }}
-
-        th {{
-            background: var(--bg-app);
-            color: var(--text-secondary);
-            font-weight: 700;
-            text-transform: uppercase;
-            font-size: 0.75rem;
-            letter-spacing: 0.05em;
-        }}
-
-        tr:last-child td {{
-            border-bottom: none;
-        }}
-
-        tr:hover {{
-            background: #fff7ed;
-        }}
-
-        .book-btn {{
-            display: inline-block;
-            padding: 8px 16px;
-            background: var(--primary);
-            color: white;
-            text-decoration: none;
-            border-radius: 8px;
-            font-weight: 700;
-            font-size: 0.85rem;
-            transition: all 0.2s;
-            text-align: center;
-        }}
-
-        .book-btn:hover {{
-            background: var(--primary-dark);
-            transform: translateY(-1px);
-            box-shadow: 0 4px 12px rgba(249, 115, 22, 0.2);
-        }}
-
-        .cal-link {{
-            display: inline-flex;
-            align-items: center;
-            gap: 4px;
-            font-size: 0.7rem;
-            color: var(--primary);
-            text-decoration: none;
-            font-weight: 600;
-            margin-top: 2px;
-            padding: 2px 6px;
-            border-radius: 4px;
-            background: var(--primary-soft);
-            border: 1px solid transparent;
-            transition: all 0.2s;
-        }}
-
-        .cal-link:hover {{
-            background: white;
-            border-color: var(--primary);
-            box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-        }}
-
-        .date-tag {{
-            font-weight: 700;
-            color: var(--text-primary);
-        }}
-
-        .time-tag {{
-            font-size: 0.8rem;
-            color: var(--text-secondary);
-            display: block;
-            margin-top: 2px;
-        }}
-
-        .seo-string {{
-            font-size: 0.8rem;
-            color: var(--text-tertiary);
-            display: block;
-            margin-top: 4px;
-            font-style: italic;
-        }}
-
-        footer {{
-            text-align: center;
-            margin-top: 4rem;
-            color: var(--text-tertiary);
-            font-size: 0.9rem;
-            padding-bottom: 2rem;
-        }}
-        
-        @media (max-width: 600px) {{
-            .app-container {{
-                padding: 1rem 0.5rem;
-            }}
-            .card {{
-                padding: 1rem;
-                border-radius: 12px;
-            }}
-            th, td {{
-                padding: 10px 8px;
-            }}
-        }}
-    </style>
+    <link rel="stylesheet" href="{asset_href('css/navigation.css', PAGE_DIR, base_dir)}">
+    <link rel="stylesheet" href="{asset_href('css/booking.css', PAGE_DIR, base_dir)}">
 </head>
 
 <body>
     <div class="app-container">
         <header>
-            <nav class="main-nav">
-                <a href="../../index.html">Calculator</a>
-                <a href="../tatkal.html">Tatkal Dates</a>
-                <a href="../news.html">Rail News</a>
-                <a href="../faq.html">FAQ</a>
-                <a href="../helpline.html">Helpline</a>
-            </nav>
-            <h1>{month_name} 2026 Train Booking Calendar</h1>
-            <p class="subtitle">Complete list of IRCTC booking opening dates for journey dates in {month_name} 2026</p>
+{render_partial('nav', PAGE_DIR)}
+            <h1>{month_name} {year} Train Booking Calendar</h1>
+            <p class="subtitle">Complete list of IRCTC booking opening dates for journey dates in {month_name} {year}</p>
         </header>
 
         <main class="card">
@@ -271,36 +159,31 @@ def generate_month_page(year, month, output_dir):
                 <thead>
                     <tr>
                         <th>Journey Date</th>
-                        <th>General Booking (60 Days)</th>
-                        <th>AC Tatkal (10 AM)</th>
-                        <th>Sleeper Tatkal (11 AM)</th>
+                        <th>General Booking ({header_rule.arp_days} Days)</th>
+                        <th>AC Tatkal ({hour_label(header_rule.ac_tatkal_time)})</th>
+                        <th>Sleeper Tatkal ({hour_label(header_rule.sl_tatkal_time)})</th>
                         <th>Action</th>
                     </tr>
                 </thead>
                 <tbody>"""
 
-    # Generate dates for the month
-    start_date = datetime.date(year, month, 1)
-    if month == 12:
-        end_date = datetime.date(year + 1, 1, 1)
-    else:
-        end_date = datetime.date(year, month + 1, 1)
-    
-    curr = start_date
-    while curr < end_date:
-        gen_date = get_booking_date(curr, 60)
-        tatkal_date = get_booking_date(curr, 1)
-        
+    for curr, gen_date, tatkal_date in zip(journeys, general, tatkal):
+        gen_rule = rule_for(gen_date)
+        tatkal_rule = rule_for(tatkal_date)
+
         journey_str = curr.strftime('%d %B %Y (%a)')
         search_string = curr.strftime('%d %B').lower() + " booking date"
         gen_str = gen_date.strftime('%d %B %Y')
         tat_str = tatkal_date.strftime('%d %B %Y')
+        gen_time = time_label(gen_rule.general_time)
+        ac_time = time_label(tatkal_rule.ac_tatkal_time)
+        sl_time = time_label(tatkal_rule.sl_tatkal_time)
         
         # Calendar links
         details = f"Booking opens for journey date {journey_str}. Book now at https://www.irctc.co.in/nget/train-search"
-        gen_cal = get_google_cal_link(gen_date, 8, f"IRCTC Booking: {journey_str} (General)", details)
-        ac_cal = get_google_cal_link(tatkal_date, 10, f"IRCTC AC Tatkal: {journey_str}", details)
-        sl_cal = get_google_cal_link(tatkal_date, 11, f"IRCTC SL Tatkal: {journey_str}", details)
+        gen_cal = get_google_cal_link(gen_date, gen_rule.general_time, f"IRCTC Booking: {journey_str} (General)", details)
+        ac_cal = get_google_cal_link(tatkal_date, tatkal_rule.ac_tatkal_time, f"IRCTC AC Tatkal: {journey_str}", details)
+        sl_cal = get_google_cal_link(tatkal_date, tatkal_rule.sl_tatkal_time, f"IRCTC SL Tatkal: {journey_str}", details)
         
         html_content += f"""
                     <tr>
@@ -310,42 +193,162 @@ def generate_month_page(year, month, output_dir):
                         </td>
                         <td>
                             <span class="date-tag">{gen_str}</span>
-                            <span class="time-tag">8:00 AM IST</span>
+                            <span class="time-tag">{gen_time} IST</span>
                             <a href="{gen_cal}" target="_blank" class="cal-link">Set Reminder</a>
                         </td>
                         <td>
                             <span class="date-tag">{tat_str}</span>
-                            <span class="time-tag">10:00 AM IST</span>
+                            <span class="time-tag">{ac_time} IST</span>
                             <a href="{ac_cal}" target="_blank" class="cal-link">Set Reminder</a>
                         </td>
                         <td>
                             <span class="date-tag">{tat_str}</span>
-                            <span class="time-tag">11:00 AM IST</span>
+                            <span class="time-tag">{sl_time} IST</span>
                             <a href="{sl_cal}" target="_blank" class="cal-link">Set Reminder</a>
                         </td>
                         <td>
                             <a href="https://www.irctc.co.in/nget/train-search" class="book-btn" target="_blank">Book Now</a>
                         </td>
                     </tr>"""
-        curr += datetime.timedelta(days=1)
 
     html_content += f"""
                 </tbody>
             </table>
         </main>
 
-        <footer>
-            <p>&copy; 2026 RailBookingDate - Accurate IRCTC Booking Calendars</p>
-        </footer>
+{render_partial('footer', PAGE_DIR)}
     </div>
 </body>
 </html>"""
+    return filename, html_content
+
+def generate_month_page(year, month, output_dir, minify=False, base_dir=BASE_DIR):
+    start = time.perf_counter()
+    with phase('render'):
+        filename, html_content = render_month_page(year, month, base_dir)
+        if minify:
+            html_content = minify_html(html_content)
+    filepath = os.path.join(output_dir, filename)
 
-    with open(filepath, 'w') as f:
-        f.write(html_content)
+    rendered = time.perf_counter()
+    data = html_content.encode('utf-8')
+    with phase('write'):
+        with open(filepath, 'wb') as f:
+            f.write(data)
+        refresh_sidecars(filepath, data)
+    record_page('booking', filename, len(data), rendered - start, time.perf_counter() - rendered)
     print(f"Generated {filepath}")
 
-# Generate pages for April to Dec 2026
-output_dir = "/Users/joshi/Ishwar Joshi/work/traindays/pages/bookingdate"
-for month in range(4, 13):
-    generate_month_page(2026, month, output_dir)
+# Default range: April to Dec 2026
+FIRST_MONTH = (2026, 4)
+LAST_MONTH = (2026, 12)
+LEGACY_YEAR = 2026
+
+def iter_months(first=FIRST_MONTH, last=LAST_MONTH):
+    year, month = first
+    while (year, month) <= last:
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+def parse_month(text):
+    year, month = text.split('-')
+    return int(year), int(month)
+
+def calendar_range(today=None, months=CALENDAR_MONTHS):
+    # (first, last) months of calendar data, starting from today's month
+    today = today or datetime.date.today()
+    index = today.year * 12 + today.month - 1 + months - 1
+    return (today.year, today.month), (index // 12, index % 12 + 1)
+
+
+def holidays_until():
+    # (year, month) of the last entry in HOLIDAYS
+    last = max(datetime.date.fromisoformat(date) for date, _, _ in HOLIDAYS)
+    return last.year, last.month
+
+def calendar_month_data(year, month):
+    # Compact form of one month: opening dates are stored as days before the
+    # journey date, so the browser only subtracts instead of applying the rules
+    start_date, end_date = month_bounds(year, month)
+    windows = booking_windows(start_date, end_date)
+    journeys, general, tatkal = (as_dates(windows[key]) for key in ('journey', 'general', 'tatkal'))
+    holidays = {datetime.date.fromisoformat(date): (name, long_weekend) for date, name, long_weekend in HOLIDAYS}
+    return {
+        'y': year,
+        'm': month,
+        # Weekday of the 1st with Sunday = 0, as Date.getDay() returns it
+        'first': (start_date.weekday() + 1) % 7,
+        'general': [(journey - opening).days for journey, opening in zip(journeys, general)],
+        'tatkal': [(journey - opening).days for journey, opening in zip(journeys, tatkal)],
+        'holidays': [[journey.day, *holidays[journey]] for journey in journeys if journey in holidays],
+    }
+
+def write_json(path, data, changes=None, rel_path=None):
+    # Writes compact JSON only when it differs from what is on disk; returns True if written.
+    # With changes (a build_diff.BuildDiff) it is only compared under rel_path.
+    text = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+    if changes is not None:
+        changes.compare(rel_path, path, text.encode('utf-8'))
+        return False
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == text:
+                return False
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return True
+
+def write_calendar_data(base_dir=BASE_DIR, first=None, last=None, changes=None):
+    # One YYYY-MM.json per month plus an index of the months available
+    if first is None or last is None:
+        first, last = calendar_range()
+    output_dir = os.path.join(base_dir, CALENDAR_DATA_DIR)
+    if changes is None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    covered = holidays_until()
+    if last > covered:
+        print(f"Warning: HOLIDAYS ends at {covered[0]}-{covered[1]:02d}; calendar data after it has no holidays")
+
+    keys = []
+    written = 0
+    for year, month in iter_months(first, last):
+        key = f"{year}-{month:02d}"
+        keys.append(key)
+        written += write_json(os.path.join(output_dir, f"{key}.json"), calendar_month_data(year, month),
+                              changes, f"{CALENDAR_DATA_DIR}/{key}.json")
+    written += write_json(os.path.join(output_dir, CALENDAR_INDEX), {'months': keys},
+                          changes, f"{CALENDAR_DATA_DIR}/{CALENDAR_INDEX}")
+
+    # Months that fell out of the range are no longer listed, so drop their files
+    for path in glob.glob(os.path.join(output_dir, '*-*.json')):
+        if os.path.basename(path)[:-len('.json')] not in keys:
+            if changes is not None:
+                changes.removed(f"{CALENDAR_DATA_DIR}/{os.path.basename(path)}", path)
+            else:
+                os.remove(path)
+    print(f"Calendar data: {len(keys)} months ({keys[0]} to {keys[-1]}), {written} files written")
+    return keys
+
+def main(base_dir=BASE_DIR, first=FIRST_MONTH, last=LAST_MONTH, minify=False):
+    output_dir = os.path.join(base_dir, PAGE_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+    for year, month in iter_months(first, last):
+        generate_month_page(year, month, output_dir, minify, base_dir)
+    with phase('calendar-data'):
+        write_calendar_data(base_dir)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate IRCTC booking calendar pages, one per journey month",
+                                     epilog=f"Home page calendar data covers {CALENDAR_MONTHS} months from the "
+                                            f"current one; months after the last entry in HOLIDAYS show no holidays.")
+    parser.add_argument('--base-dir', default=BASE_DIR, help="Site root")
+    parser.add_argument('--from', dest='first', type=parse_month, default=FIRST_MONTH, help="First month (YYYY-MM)")
+    parser.add_argument('--to', dest='last', type=parse_month, default=LAST_MONTH, help="Last month (YYYY-MM)")
+    parser.add_argument('--minify', action='store_true',
+                        help="Collapse whitespace and drop comments")
+    build_report.add_arguments(parser)
+    args = parser.parse_args()
+    with build_report.reporting(args.report, args.profile):
+        write_fingerprinted_assets(args.base_dir)
+        main(base_dir=args.base_dir, first=args.first, last=args.last, minify=args.minify)
@@ -1,59 +1,113 @@
+import argparse
 import csv
+import hashlib
+import heapq
+import json
 import os
 import re
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from html import escape
+from itertools import groupby
+from operator import itemgetter
+
+import build_diff
+import build_report
+from build_diff import compare_output
+from build_report import phase, record_page, timed
+from compress_assets import write_sidecars
+from fingerprint import asset_href, write_fingerprinted_assets
+from partials import find_partial_offsets, partials_digest, render_partial, splice_partials
+from sitemap import content_digest, iter_site_pages, page_url, write_sitemaps
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Bump whenever generate_html output changes so incremental builds re-render every route
+TEMPLATE_VERSION = '5'
+MANIFEST_NAME = 'train-pages-manifest.json'
+# Output directory relative to the site root; partials resolve their links against it
+PAGE_DIR = 'pages/trains'
+
+# Rows held in memory before the CSV sort spills a sorted run to disk
+DEFAULT_SORT_BUFFER_MB = 64
+
+# Trains are kept as tuples rather than per-row dicts to keep big routes cheap
+Train = namedtuple('Train', ['number', 'name', 'source', 'destination'])
+
 
 def slugify(text):
     return re.sub(r'[\s_]+', '-', text.lower().strip())
 
-def generate_html(source, destination, trains):
+ROW_TEMPLATE = """                    <tr>
+                        <td><strong>{number}</strong></td>
+                        <td>{name}</td>
+                        <td>{source}</td>
+                        <td>{destination}</td>
+                    </tr>
+"""
+COMPACT_ROW_TEMPLATE = "<tr><td><strong>{number}</strong></td><td>{name}</td><td>{source}</td><td>{destination}</td></tr>\n"
+
+
+def build_route_json_ld(source, destination, description, trains, compact=False):
+    data = {
+        "@context": "https://schema.org",
+        "@type": "ItemList",
+        "name": f"Trains between {source} and {destination}",
+        "description": description,
+        "itemListElement": [
+            {
+                "@type": "ListItem",
+                "position": i + 1,
+                "item": {
+                    "@type": "Service",
+                    "name": f"{train.name} ({train.number})",
+                    "description": f"Train from {source} to {destination}"
+                }
+            }
+            for i, train in enumerate(trains)
+        ]
+    }
+    if compact:
+        text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    else:
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+    # A train name containing "</script>" must not close the tag early
+    return text.replace('</', '<\\/')
+
+
+def render_train_rows(trains, compact=False):
+    row = COMPACT_ROW_TEMPLATE if compact else ROW_TEMPLATE
+    return ''.join([
+        row.format(number=escape(train.number), name=escape(train.name),
+                   source=escape(train.source), destination=escape(train.destination))
+        for train in trains
+    ])
+
+
+def generate_html(source, destination, trains, compact=False, base_dir=BASE_DIR):
     # Dynamic SEO content
     title = f"Trains between {source} and {destination} | Trains from {source} to {destination}"
     description = f"List of trains between {source} and {destination}. Get train numbers, names, and schedules. Calculate your booking date for IRCTC 60 days advance reservation."
     keywords = f"trains between {source} and {destination}, trains from {source} to {destination}, {source} to {destination} trains, IRCTC booking date calculator, Indian Railways"
 
     # JSON-LD Structured Data for SEO
-    json_ld = f"""
-    {{
-      "@context": "https://schema.org",
-      "@type": "ItemList",
-      "name": "Trains between {source} and {destination}",
-      "description": "{description}",
-      "itemListElement": [
-"""
-    for i, train in enumerate(trains):
-        json_ld += f"""        {{
-          "@type": "ListItem",
-          "position": {i+1},
-          "item": {{
-            "@type": "Service",
-            "name": "{train['name']} ({train['number']})",
-            "description": "Train from {source} to {destination}"
-          }}
-        }}{',' if i < len(trains) - 1 else ''}
-"""
-    json_ld += """      ]
-    }
-    """
+    json_ld = build_route_json_ld(source, destination, description, trains, compact)
 
-    html_template = f"""<!DOCTYPE html>
+    # Everything below is HTML, so escape the CSV-provided text once up front
+    source, destination = escape(source), escape(destination)
+    title, description, keywords = escape(title), escape(description), escape(keywords)
+
+    head = f"""<!DOCTYPE html>
 <html lang="en-IN">
 
 <head>
-    <!-- Google tag (gtag.js) -->
-    <script async src="https://www.googletagmanager.com/gtag/js?id=G-NL4NTX1D6V"></script>
-    <script>
-        window.dataLayer = window.dataLayer || [];
-        function gtag() {{ dataLayer.push(arguments); }}
-        gtag('js', new Date());
-        gtag('config', 'G-NL4NTX1D6V');
-    </script>
-    
-    <!-- Google Adsense -->
-    <script async src="https://pagead2.googlesyndication.com/pagead/js/adsbygoogle.js?client=ca-pub-5018644317959743"
-     crossorigin="anonymous"></script>
-
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
+{render_partial('analytics', PAGE_DIR)}
     <title>{title}</title>
     <meta name="description" content="{description}">
     <meta name="keywords" content="{keywords}">
@@ -68,6 +122,8 @@ def generate_html(source, destination, trains):
 
     <meta name="theme-color" content="#ff6b00">
 
+    <link rel="stylesheet" href="{asset_href('css/navigation.css', PAGE_DIR, base_dir)}">
+
     <script type="application/ld+json">
     {json_ld}
     </script>
@@ -178,30 +234,6 @@ def generate_html(source, destination, trains):
             margin-top: 0;
         }}
 
-        .nav-links {{
-            display: flex;
-            justify-content: center;
-            gap: 1.5rem;
-            margin: 2rem 0;
-            flex-wrap: wrap;
-        }}
-
-        .nav-links a {{
-            color: var(--text-secondary);
-            text-decoration: none;
-            font-weight: 600;
-            font-size: 0.9rem;
-            padding: 0.5rem 1rem;
-            border: 1px solid var(--border-light);
-            border-radius: 99px;
-            background: var(--bg-card);
-        }}
-
-        .nav-links a:hover, .nav-links a.active {{
-            border-color: var(--primary);
-            color: var(--primary);
-        }}
-
         .site-footer {{
             margin-top: 4rem;
             text-align: center;
@@ -246,12 +278,7 @@ def generate_html(source, destination, trains):
             Back to Calculator
         </a>
 
-        <nav class="nav-links">
-            <a href="../../index.html">Calculator</a>
-            <a href="../faq.html">FAQs</a>
-            <a href="../helpline.html">Helpline</a>
-            <a href="../tatkal.html">Tatkal Dates</a>
-        </nav>
+{render_partial('nav', PAGE_DIR)}
 
         <header class="app-header">
             <h1>Trains between {source} and {destination}</h1>
@@ -277,16 +304,7 @@ def generate_html(source, destination, trains):
                 </thead>
                 <tbody>
 """
-    for train in trains:
-        html_template += f"""                    <tr>
-                        <td><strong>{train['number']}</strong></td>
-                        <td>{train['name']}</td>
-                        <td>{train['source']}</td>
-                        <td>{train['destination']}</td>
-                    </tr>
-"""
-    
-    html_template += f"""                </tbody>
+    tail = f"""                </tbody>
             </table>
         </main>
 
@@ -305,27 +323,151 @@ def generate_html(source, destination, trains):
 
         <p class="disclaimer">Note: Train schedules and availability are subject to change. Please verify on the official Indian Railways / IRCTC portal before planning your trip.</p>
 
-        <footer class="site-footer">
-            <p>&copy; 2026 RailBookingDate - Created by Ishwar Joshi | <a href="../disclaimer.html" style="color: var(--primary); text-decoration: none;">Disclaimer</a> | <a href="../privacy-policy.html" style="color: var(--primary); text-decoration: none;">Privacy</a></p>
-        </footer>
+{render_partial('footer', PAGE_DIR)}
     </div>
 </body>
 </html>
 """
-    return html_template
+    return ''.join([head, render_train_rows(trains, compact), tail])
 
-def main():
-    base_dir = '/Users/ishwarjoshi/Ishwar Joshi/work/traindays'
-    csv_file = os.path.join(base_dir, 'trains.csv')
-    output_dir = os.path.join(base_dir, 'pages/trains')
-    
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        
-    train_groups = {}
-    
-    print(f"Reading CSV from: {csv_file}")
-    with open(csv_file, mode='r', encoding='utf-8') as f:
+def route_filename(s1, s2):
+    return f"train-between-{slugify(s1)}-{slugify(s2)}.html"
+
+
+def route_hash(s1, s2, trains, variant=''):
+    # Hash of everything that feeds generate_html for one consolidated station pair.
+    # variant covers render options (compact output, post-render stages) that change the bytes.
+    h = hashlib.sha1()
+    h.update(f"{TEMPLATE_VERSION}\x1f{variant}\x1f{s1}\x1f{s2}".encode('utf-8'))
+    for train in trains:
+        h.update(f"\x1e{train.number}\x1f{train.name}\x1f{train.source}\x1f{train.destination}".encode('utf-8'))
+    return h.hexdigest()
+
+
+def load_manifest(manifest_path):
+    # routes: filename -> route hash, offsets: filename -> partial byte offsets,
+    # partials: digest of the partials the stored pages were written with,
+    # transform: the stages they went through (transform_key)
+    empty = {'routes': {}, 'offsets': {}, 'partials': None, 'transform': None}
+    if manifest_path is None or not os.path.exists(manifest_path):
+        return empty
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    # A template change invalidates every stored hash
+    if manifest.get('template_version') != TEMPLATE_VERSION:
+        return empty
+    return {
+        'routes': manifest.get('routes', {}),
+        'offsets': manifest.get('offsets', {}),
+        'partials': manifest.get('partials'),
+        'transform': manifest.get('transform'),
+    }
+
+
+def save_manifest(manifest_path, routes, offsets, transform_key=''):
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = manifest_path + '.tmp'
+    manifest = {
+        'template_version': TEMPLATE_VERSION,
+        'partials': partials_digest(PAGE_DIR),
+        'transform': transform_key,
+        'routes': routes,
+        'offsets': offsets,
+    }
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def write_page(filepath, data, compress):
+    with open(filepath, 'wb') as f:
+        f.write(data)
+    if compress:
+        write_sidecars(filepath, data)
+
+
+def render_route(job):
+    # Returns (filename, partial offsets in the written page, (bytes, render seconds, write seconds), change).
+    # Timings are taken here rather than with build_report phases, since this runs in worker processes.
+    # change is None, or for a dry run (status, bytes on disk) from comparing instead of writing.
+    output_dir, s1, s2, trains, options = job
+    filename = route_filename(s1, s2)
+    filepath = os.path.join(output_dir, filename)
+
+    print(f"Generating {filepath} with {len(trains)} trains...")
+    start = time.perf_counter()
+    html_content = generate_html(s1, s2, trains, options['compact'], options['base_dir'])
+    # Post-render stages (canonical, minify, ...) run here so each page is written exactly once
+    if options['transform'] is not None:
+        html_content = options['transform'](html_content, f"{PAGE_DIR}/{filename}")
+
+    data = html_content.encode('utf-8')
+    rendered = time.perf_counter()
+    change = None
+    if options['dry_run']:
+        change = compare_output(filepath, data)
+    else:
+        write_page(filepath, data, options['compress'])
+    return filename, find_partial_offsets(data), (len(data), rendered - start, time.perf_counter() - rendered), change
+
+
+def resplice_pages(output_dir, page_offsets, compress=False, changes=None):
+    # Splices the current nav/footer/analytics partials into already rendered pages at
+    # their recorded offsets. Returns the new offsets for every page that still exists.
+    # Only for pages written without a transform, whose partials are byte for byte
+    # render_partial output. With changes (a build_diff.BuildDiff) pages are only compared, not written.
+    new_offsets = {}
+    spliced = 0
+    for filename, offsets in page_offsets.items():
+        filepath = os.path.join(output_dir, filename)
+        if not os.path.exists(filepath):
+            continue
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        new_data, new_offsets[filename] = splice_partials(data, offsets, PAGE_DIR)
+        if changes is not None:
+            changes.add(f"{PAGE_DIR}/{filename}", 'unchanged' if new_data == data else 'changed', len(data), len(new_data))
+        elif new_data != data:
+            write_page(filepath, new_data, compress)
+            spliced += 1
+    print(f"Re-spliced partials into {spliced} of {len(page_offsets)} pages")
+    return new_offsets
+
+
+def render_batch(render, batch):
+    return [render(job) for job in batch]
+
+
+def run_render_jobs(jobs, workers, batch_size=32, render=render_route):
+    # Yields render(job) results in job order; workers=1 renders in-process.
+    # Jobs are pulled lazily and only a few batches are in flight at once, so
+    # the caller's route stream is never materialised. render must be a module
+    # level function (connections and train numbers pass their own) so it pickles.
+    if workers <= 1:
+        for job in jobs:
+            yield render(job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        batch = []
+        for job in jobs:
+            batch.append(job)
+            if len(batch) < batch_size:
+                continue
+            pending.append(executor.submit(render_batch, render, batch))
+            batch = []
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        if batch:
+            pending.append(executor.submit(render_batch, render, batch))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def iter_train_rows(csv_file):
+    # Yields (s1, s2, number, name, source, destination) with the pair sorted so reverse routes share a page
+    with open(csv_file, mode='r', encoding='utf-8', newline='') as f:
         reader = csv.DictReader(f)
         # Handle potential variations in CSV headers
         # Expected: train number, train name, starting station, ending station
@@ -341,91 +483,246 @@ def main():
         for row in reader:
             src = row[src_key].strip().upper()
             dest = row[dest_key].strip().upper()
-            train = {
-                'number': row[num_key].strip(),
-                'name': row[name_key].strip(),
-                'source': src,
-                'destination': dest
-            }
-            
-            key = (src, dest)
-            if key not in train_groups:
-                train_groups[key] = []
-            train_groups[key].append(train)
-            
-    for (src, dest), trains in train_groups.items():
-        # Using sorted stations for the filename to group reverse routes
-        stations = sorted([src, dest])
-        # We check if we already generated a page for this sorted pair
-        filename = f"train-between-{slugify(stations[0])}-{slugify(stations[1])}.html"
-        filepath = os.path.join(output_dir, filename)
-        
-        # If the page already exists, we append to it (or rather, we re-generate with the full list)
-        # But wait, it's better to just group them BEFORE the loop.
-        pass
-
-    # Better grouping logic:
-    consolidated_groups = {}
-    for (src, dest), trains in train_groups.items():
-        key = tuple(sorted([src, dest]))
-        if key not in consolidated_groups:
-            consolidated_groups[key] = []
-        consolidated_groups[key].extend(trains)
-
-    # Delete existing pages to ensure a clean state
-    if os.path.exists(output_dir):
-        import shutil
-        shutil.rmtree(output_dir)
-    os.makedirs(output_dir)
-
-    sitemap_entries = [
-        ("https://railbookingdate.com/", "1.0", "daily"),
-        ("https://railbookingdate.com/pages/tatkal.html", "0.8", "weekly"),
-        ("https://railbookingdate.com/pages/news.html", "0.8", "daily"),
-        ("https://railbookingdate.com/pages/faq.html", "0.7", "monthly"),
-        ("https://railbookingdate.com/pages/ewallet.html", "0.7", "monthly"),
-        ("https://railbookingdate.com/pages/helpline.html", "0.7", "monthly"),
-        ("https://railbookingdate.com/pages/videos.html", "0.6", "weekly"),
-        ("https://railbookingdate.com/pages/disclaimer.html", "0.5", "monthly"),
-        ("https://railbookingdate.com/pages/privacy-policy.html", "0.5", "monthly"),
-        ("https://railbookingdate.com/pages/about-us.html", "0.5", "monthly"),
-        ("https://railbookingdate.com/pages/contact-us.html", "0.5", "monthly"),
-    ]
-
-    for (s1, s2), trains in consolidated_groups.items():
-        filename = f"train-between-{slugify(s1)}-{slugify(s2)}.html"
-        filepath = os.path.join(output_dir, filename)
-        
-        print(f"Generating {filepath} with {len(trains)} trains...")
-        html_content = generate_html(s1, s2, trains)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        sitemap_entries.append((f"https://railbookingdate.com/pages/trains/{filename}", "0.6", "weekly"))
-
-    # Generate sitemap.xml
-    sitemap_path = os.path.join(base_dir, 'sitemap.xml')
-    print(f"Generating sitemap at: {sitemap_path}")
-    
-    from datetime import datetime
-    today = datetime.now().strftime('%Y-%m-%d')
-    
-    xml_content = '<?xml version="1.0" encoding="UTF-8"?>\n'
-    xml_content += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-    
-    for loc, priority, freq in sitemap_entries:
-        xml_content += f'    <url>\n'
-        xml_content += f'        <loc>{loc}</loc>\n'
-        xml_content += f'        <lastmod>{today}</lastmod>\n'
-        xml_content += f'        <changefreq>{freq}</changefreq>\n'
-        xml_content += f'        <priority>{priority}</priority>\n'
-        xml_content += f'    </url>\n'
-    
-    xml_content += '</urlset>'
-    
-    with open(sitemap_path, 'w', encoding='utf-8') as f:
-        f.write(xml_content)
+            s1, s2 = (src, dest) if src <= dest else (dest, src)
+            yield (s1, s2, row[num_key].strip(), row[name_key].strip(), src, dest)
+
+
+def _spill_run(rows, tmp_dir, index):
+    rows.sort()
+    path = os.path.join(tmp_dir, f"run-{index}.csv")
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerows(rows)
+    return path
+
+
+def _read_run(path):
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.reader(f):
+            # seq was written as text; restore it so merge order matches the in-memory sort
+            yield (row[0], row[1], int(row[2])) + tuple(row[3:])
+
+
+def iter_route_groups(csv_file, sort_buffer_mb=DEFAULT_SORT_BUFFER_MB):
+    # Streams (s1, s2, trains) one station pair at a time, sorted by pair.
+    # Rows are sorted in memory while they fit in the buffer; beyond that sorted
+    # runs are spilled to disk and k-way merged, so peak memory is the buffer
+    # plus the largest single route.
+    budget = sort_buffer_mb * 1024 * 1024
+    rows = []
+    used = 0
+    runs = []
+    with tempfile.TemporaryDirectory(prefix='train-sort-') as tmp_dir:
+        with phase('csv-parse'):
+            for seq, (s1, s2, number, name, src, dest) in enumerate(iter_train_rows(csv_file)):
+                # seq keeps trains in CSV order within a route
+                rows.append((s1, s2, seq, number, name, src, dest))
+                # Rough in-memory footprint of a 7-tuple of short strings
+                used += 400 + len(s1) + len(s2) + len(name)
+                if used >= budget:
+                    with phase('group'):
+                        runs.append(_spill_run(rows, tmp_dir, len(runs)))
+                    rows = []
+                    used = 0
+
+        with phase('group'):
+            rows.sort()
+        if runs:
+            print(f"Merging {len(runs) + 1} sorted runs")
+            merged = heapq.merge(*(_read_run(path) for path in runs), iter(rows))
+        else:
+            merged = iter(rows)
+
+        groups = ((s1, s2, [Train(*row[3:]) for row in group])
+                  for (s1, s2), group in groupby(merged, key=itemgetter(0, 1)))
+        yield from timed('group', groups)
+
+
+def main(base_dir=BASE_DIR, incremental=False, workers=None, sort_buffer_mb=DEFAULT_SORT_BUFFER_MB,
+         compact=False, compress_sitemap=True, transform=None, transform_key='', compress=False,
+         page_digests=None, changes=None, indexes=()):
+    # changes: a build_diff.BuildDiff for a dry run, which renders and compares every
+    # page against the one on disk but writes nothing (no pages, manifest or sitemap).
+    # indexes: objects built from the same route stream; each gets add_route(s1, s2,
+    # filename, trains) for every route, unchanged ones included, then finish() once
+    # the routes are rendered and before the sitemap lists the pages they wrote.
+    if workers is None:
+        workers = os.cpu_count() or 1
+    csv_file = os.path.join(base_dir, 'trains.csv')
+    output_dir = os.path.join(base_dir, 'pages/trains')
+    manifest_path = os.path.join(base_dir, '.build', MANIFEST_NAME)
+
+    print(f"Reading CSV from: {csv_file}")
+
+    if incremental:
+        # Only re-render routes whose inputs changed since the last build
+        manifest = load_manifest(manifest_path)
+        if manifest['transform'] is not None and manifest['transform'] != transform_key:
+            # The stages are part of every route hash, so nothing would be skipped
+            print(f"Warning: pages were built with stages '{manifest['transform']}' but this run uses "
+                  f"'{transform_key}'; every route will be re-rendered")
+        if changes is None:
+            os.makedirs(output_dir, exist_ok=True)
+    elif changes is not None:
+        manifest = load_manifest(None)
+    else:
+        # Delete existing pages to ensure a clean state
+        manifest = load_manifest(None)
+        if os.path.exists(output_dir):
+            shutil.rmtree(output_dir)
+        os.makedirs(output_dir)
+
+    previous_routes = manifest['routes']
+    routes = {}
+    offsets = {}
+    options = {'compact': compact, 'transform': transform, 'compress': compress, 'dry_run': changes is not None,
+               'base_dir': base_dir}
+    # Hashed asset names are part of the page, so a css change re-renders every route
+    variant = f"compact={int(compact)};transform={transform_key};assets={asset_href('css/navigation.css', PAGE_DIR, base_dir)}"
+    if transform is not None:
+        # Stages rewrite the partials along with the rest of the page (minified, critical
+        # CSS picked for their classes), so raw partials cannot be spliced into the output;
+        # a partial change re-renders every route instead, as a full build would
+        variant += f";partials={partials_digest(PAGE_DIR)}"
+
+    def pending_jobs():
+        for s1, s2, trains in iter_route_groups(csv_file, sort_buffer_mb):
+            filename = route_filename(s1, s2)
+            with phase('index'):
+                for index in indexes:
+                    index.add_route(s1, s2, filename, trains)
+            with phase('hash'):
+                digest = route_hash(s1, s2, trains, variant)
+            routes[filename] = digest
+
+            if previous_routes.get(filename) == digest and os.path.exists(os.path.join(output_dir, filename)):
+                continue
+            yield (output_dir, s1, s2, trains, options)
+
+    rendered = 0
+    # With workers the render phase is the time spent waiting on them
+    for filename, page_offsets, (size, render_seconds, write_seconds), change in timed('render', run_render_jobs(pending_jobs(), workers)):
+        offsets[filename] = page_offsets
+        record_page('route', filename, size, render_seconds, write_seconds)
+        if change is not None:
+            changes.add(f"{PAGE_DIR}/{filename}", change[0], change[1], size)
+        rendered += 1
+    build_report.count('routes', len(routes))
+    build_report.count('routes-unchanged', len(routes) - rendered)
+
+    # Pages that were not re-rendered keep their offsets, and only need the
+    # partials spliced in again when the nav/footer/analytics markup changed.
+    # That only happens without a transform: with one the partials are in the variant.
+    unchanged = {filename: manifest['offsets'].get(filename, {}) for filename in routes if filename not in offsets}
+    if unchanged and manifest['partials'] != partials_digest(PAGE_DIR):
+        with phase('resplice'):
+            offsets.update(resplice_pages(output_dir, unchanged, compress, changes))
+    else:
+        offsets.update(unchanged)
+        if changes is not None:
+            for filename in unchanged:
+                size = os.path.getsize(os.path.join(output_dir, filename))
+                changes.add(f"{PAGE_DIR}/{filename}", 'unchanged', size, size)
+
+    for index in indexes:
+        index.finish()
+
+    if changes is not None:
+        # A full build deletes the whole directory first, an incremental one the pages of
+        # routes that left the CSV; either way whatever is not a current route goes
+        if os.path.isdir(output_dir):
+            for filename in sorted(os.listdir(output_dir)):
+                if filename.endswith('.html') and filename not in routes:
+                    changes.removed(f"{PAGE_DIR}/{filename}", os.path.join(output_dir, filename))
+        print(f"Dry run: {rendered} routes rendered in memory, nothing written")
+        return
+
+    if incremental:
+        # Remove pages for routes that disappeared from the CSV
+        removed = 0
+        for filename in set(previous_routes) - set(routes):
+            filepath = os.path.join(output_dir, filename)
+            if os.path.exists(filepath):
+                print(f"Removing {filepath}")
+                os.remove(filepath)
+                for sidecar in (filepath + '.gz', filepath + '.br'):
+                    if os.path.exists(sidecar):
+                        os.remove(sidecar)
+                removed += 1
+        print(f"Incremental build: {rendered} rendered, {len(routes) - rendered} unchanged, {removed} removed")
+
+    with phase('manifest'):
+        save_manifest(manifest_path, routes, offsets, transform_key)
+
+    # Route pages are deterministic renders of their inputs, so the route hash
+    # doubles as the content digest that drives <lastmod>. Re-spliced partials are
+    # not in it without a transform, so the partials digest is added here.
+    partials = partials_digest(PAGE_DIR)
+
+    def sitemap_entries():
+        yield from iter_site_pages(base_dir, page_digests)
+        for filename in sorted(routes):
+            digest = content_digest(f"{routes[filename]}\x1f{partials}".encode('utf-8'))
+            yield page_url(f"pages/trains/{filename}"), "0.6", "weekly", digest
+
+    with phase('sitemap'):
+        write_sitemaps(base_dir, sitemap_entries(), compress=compress_sitemap)
+
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Generate train route pages and the sitemap from trains.csv")
+    parser.add_argument('--base-dir', default=BASE_DIR, help="Site root containing trains.csv")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only re-render routes whose CSV rows or template changed")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes used to render pages (default: number of CPU cores)")
+    parser.add_argument('--sort-buffer-mb', type=float, default=DEFAULT_SORT_BUFFER_MB,
+                        help="Memory used to sort CSV rows before spilling sorted runs to disk")
+    parser.add_argument('--compact', action='store_true',
+                        help="Emit compact JSON-LD and unindented train rows")
+    parser.add_argument('--no-gzip-sitemap', dest='compress_sitemap', action='store_false',
+                        help="Write plain sitemap-N.xml shards instead of .xml.gz")
+    parser.add_argument('--minify', action='store_true',
+                        help="Shorthand for --stages minify: collapse whitespace, drop comments and minify inline CSS/JSON-LD")
+    parser.add_argument('--connections', action='store_true',
+                        help="Also write the one-change connection pages and data")
+    parser.add_argument('--train-numbers', action='store_true',
+                        help="Also write the per-train pages and the train number lookup shards")
+    parser.add_argument('--search-index', action='store_true',
+                        help="Also write the sharded station search index")
+    # Imported here: build (like the indexes below) builds on this module
+    import build
+    build.add_stage_argument(parser)
+    build_report.add_arguments(parser)
+    build_diff.add_arguments(parser)
+    args = parser.parse_args()
+    changes = build_diff.BuildDiff() if args.dry_run else None
+    try:
+        transform, transform_key, compress = build.standalone_stages('minify' if args.minify else args.stages,
+                                                                     args.base_dir)
+    except ValueError as e:
+        parser.error(str(e))
+    with build_report.reporting(args.report, args.profile):
+        if changes is None:
+            write_fingerprinted_assets(args.base_dir)
+        indexes = []
+        if args.connections:
+            from connections import ConnectionIndex
+            indexes.append(ConnectionIndex(args.base_dir, transform, transform_key, compress, changes=changes,
+                                           workers=args.workers))
+        if args.train_numbers:
+            from train_numbers import TrainNumberIndex
+            indexes.append(TrainNumberIndex(args.base_dir, transform, transform_key, compress, changes=changes,
+                                            workers=args.workers))
+        if args.search_index:
+            from station_search import StationSearchIndex
+            indexes.append(StationSearchIndex(args.base_dir, changes))
+        main(base_dir=args.base_dir, incremental=args.incremental, workers=args.workers,
+             sort_buffer_mb=args.sort_buffer_mb, compact=args.compact, compress_sitemap=args.compress_sitemap,
+             transform=transform, transform_key=transform_key, compress=compress,
+             changes=changes, indexes=indexes)
+    if changes is not None:
+        changes.print_summary()
+        if args.diff_json:
+            changes.write(args.diff_json)
+        if args.exit_code and changes.has_changes():
+            sys.exit(1)
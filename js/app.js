@@ -276,114 +276,39 @@ function startCountdowns() {
 }
 
 // ==========================================
-// Optimized 90-Day Calendar Generation
-// Uses DocumentFragment for batch DOM updates
+// Booking Calendar (precomputed month data)
+// Month files are written at build time by generate_booking_pages.py;
+// only the months scrolled into view are fetched and rendered
 // ==========================================
 
-// Holiday Data for 2026
-const HOLIDAYS_2026 = [
-    { date: '2026-03-04', name: 'Holi Holiday' },
-    { date: '2026-03-05', name: 'Holi Holiday' },
-    { date: '2026-03-06', name: 'Holi Holiday' },
-    { date: '2026-03-07', name: 'Holi Holiday' },
-    { date: '2026-03-21', name: 'Id-ul-Fitr' },
-    { date: '2026-03-26', name: 'Ram Navami', type: 'long-weekend' },
-    { date: '2026-03-31', name: 'Mahavir Jayanti' },
-    { date: '2026-04-03', name: 'Good Friday', type: 'long-weekend' },
-    { date: '2026-05-01', name: 'Budha Purnima', type: 'long-weekend' },
-    { date: '2026-05-27', name: 'Id-ul-Zuha (Bakrid)' },
-    { date: '2026-06-26', name: 'Muharram', type: 'long-weekend' },
-    { date: '2026-08-15', name: 'Independence Day' },
-    { date: '2026-08-26', name: 'Milad-un-Nabi' },
-    { date: '2026-08-28', name: 'Raksha Bandhan', type: 'long-weekend' },
-    { date: '2026-09-04', name: 'Janmashtami', type: 'long-weekend' },
-    { date: '2026-09-14', name: 'Ganesh Chaturthi', type: 'long-weekend' },
-    { date: '2026-10-02', name: 'Mahatma Gandhi Birthday', type: 'long-weekend' },
-    { date: '2026-10-19', name: 'Dussehra Holiday', type: 'long-weekend' },
-    { date: '2026-10-20', name: 'Dussehra Holiday', type: 'long-weekend' },
-    { date: '2026-10-21', name: 'Dussehra Holiday', type: 'long-weekend' },
-    { date: '2026-10-22', name: 'Dussehra Holiday', type: 'long-weekend' },
-    { date: '2026-10-23', name: 'Dussehra Holiday', type: 'long-weekend' },
-    { date: '2026-10-24', name: 'Dussehra Holiday', type: 'long-weekend' },
-    { date: '2026-11-09', name: 'Diwali Holiday', type: 'long-weekend' },
-    { date: '2026-11-10', name: 'Diwali Holiday', type: 'long-weekend' },
-    { date: '2026-11-11', name: 'Diwali Holiday', type: 'long-weekend' },
-    { date: '2026-11-12', name: 'Diwali Holiday', type: 'long-weekend' },
-    { date: '2026-11-13', name: 'Diwali Holiday', type: 'long-weekend' },
-    { date: '2026-11-14', name: 'Diwali Holiday', type: 'long-weekend' },
-    { date: '2026-11-24', name: 'Guru Nanak Birthday' },
-    { date: '2026-12-25', name: 'Christmas', type: 'long-weekend' }
-];
-
-function generate2026Calendar() {
-    const elements = getElements();
-    const container = elements.calendarContainer;
-    const today = getIndianDate();
-    const todayTime = today.getTime();
-
-    // Set min date for travel input
-    const todayFormatted = today.getFullYear() + '-' +
-        String(today.getMonth() + 1).padStart(2, '0') + '-' +
-        String(today.getDate()).padStart(2, '0');
-    elements.travelDateInput.setAttribute('min', todayFormatted);
-
-    const sixtyDaysTime = todayTime + (BOOKING_CONFIG.ADVANCE_DAYS * 86400000);
+const CALENDAR_DATA_URL = 'data/calendar/';
+const MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December'];
+const DAY_HEADERS = ['S', 'M', 'T', 'W', 'T', 'F', 'S'];
 
-    // Start from current month
-    const startTime = new Date(today.getFullYear(), today.getMonth(), 1).getTime();
-    const endTime = new Date('2026-12-31T23:59:59+05:30').getTime();
+// 'YYYY-MM' -> Promise of the month data, shared by repeat requests
+const calendarMonthCache = new Map();
 
-    // Update booking info card
-    const sixtyDaysLater = new Date(sixtyDaysTime);
-    const day = sixtyDaysLater.getDate();
-    const month = sixtyDaysLater.toLocaleDateString('en-IN', { month: 'long', timeZone: 'Asia/Kolkata' });
-    const weekday = sixtyDaysLater.toLocaleDateString('en-IN', { weekday: 'long', timeZone: 'Asia/Kolkata' });
-    elements.bookingInfo.innerHTML = `You can book tickets for travel up to <span class="highlight">${day} ${month}</span> (${weekday})`;
-
-    // Group dates by month
-    const months = [];
-    let currentTime = startTime;
-
-    while (currentTime <= endTime) {
-        const currentDate = new Date(currentTime);
-        const monthKey = currentDate.getFullYear() * 12 + currentDate.getMonth();
-
-        let monthData = months.find(m => m.key === monthKey);
-        if (!monthData) {
-            monthData = {
-                key: monthKey,
-                name: currentDate.toLocaleDateString('en-IN', {
-                    month: 'long',
-                    year: 'numeric',
-                    timeZone: 'Asia/Kolkata'
-                }),
-                days: []
-            };
-            months.push(monthData);
+function fetchCalendarJson(name) {
+    return fetch(CALENDAR_DATA_URL + name).then(response => {
+        if (!response.ok) {
+            throw new Error(`Calendar data ${name}: HTTP ${response.status}`);
         }
+        return response.json();
+    });
+}
 
-        // Check for holiday
-        const dateString = currentDate.getFullYear() + '-' +
-            String(currentDate.getMonth() + 1).padStart(2, '0') + '-' +
-            String(currentDate.getDate()).padStart(2, '0');
-
-        const holiday = HOLIDAYS_2026.find(h => h.date === dateString);
-
-        monthData.days.push({
-            date: currentDate.getDate(),
-            time: currentTime,
-            dayOfWeek: currentDate.getDay(),
-            holiday: holiday
-        });
-
-        currentTime += 86400000;
+function loadCalendarMonth(key) {
+    if (!calendarMonthCache.has(key)) {
+        const request = fetchCalendarJson(`${key}.json`);
+        // Let a failed month be retried on the next request
+        request.catch(() => calendarMonthCache.delete(key));
+        calendarMonthCache.set(key, request);
     }
+    return calendarMonthCache.get(key);
+}
 
-    // Build DOM using DocumentFragment for better performance
-    const fragment = document.createDocumentFragment();
-    const dayHeaders = ['S', 'M', 'T', 'W', 'T', 'F', 'S'];
-
-    // Ensure tooltip element exists
+function getCalendarTooltip() {
     let tooltip = document.getElementById('calendar-tooltip');
     if (!tooltip) {
         tooltip = document.createElement('div');
@@ -391,159 +316,242 @@ function generate2026Calendar() {
         tooltip.className = 'calendar-tooltip';
         document.body.appendChild(tooltip);
     }
+    return tooltip;
+}
 
-    const showTooltip = (e, text, type) => {
-        tooltip.innerHTML = text;
-        tooltip.className = `calendar-tooltip tooltip-${type} show`;
-
-        // Position logic
-        const rect = e.target.getBoundingClientRect();
-        const tooltipRect = tooltip.getBoundingClientRect();
-
-        let top = rect.top - tooltipRect.height - 10 + window.scrollY;
-        let left = rect.left + (rect.width / 2) - (tooltipRect.width / 2) + window.scrollX;
+function showCalendarTooltip(cell, text, type) {
+    const tooltip = getCalendarTooltip();
+    tooltip.innerHTML = text;
+    tooltip.className = `calendar-tooltip tooltip-${type} show`;
 
-        // Prevent going off-screen
-        if (left < 10) left = 10;
-        if (left + tooltipRect.width > window.innerWidth - 10) {
-            left = window.innerWidth - tooltipRect.width - 10;
-        }
+    // Position logic
+    const rect = cell.getBoundingClientRect();
+    const tooltipRect = tooltip.getBoundingClientRect();
 
-        tooltip.style.top = `${top}px`;
-        tooltip.style.left = `${left}px`;
-    };
+    let top = rect.top - tooltipRect.height - 10 + window.scrollY;
+    let left = rect.left + (rect.width / 2) - (tooltipRect.width / 2) + window.scrollX;
 
-    const hideTooltip = () => {
-        tooltip.classList.remove('show');
-    };
+    // Prevent going off-screen
+    if (left < 10) left = 10;
+    if (left + tooltipRect.width > window.innerWidth - 10) {
+        left = window.innerWidth - tooltipRect.width - 10;
+    }
 
-    months.forEach((monthData, monthIndex) => {
-        const monthDiv = document.createElement('div');
-        monthDiv.className = 'month-section';
+    tooltip.style.top = `${top}px`;
+    tooltip.style.left = `${left}px`;
+}
 
-        const monthHeader = document.createElement('h3');
-        monthHeader.className = 'month-header';
-        monthHeader.textContent = monthData.name;
-        monthDiv.appendChild(monthHeader);
+function hideCalendarTooltip() {
+    getCalendarTooltip().classList.remove('show');
+}
 
-        const calendarGrid = document.createElement('div');
-        calendarGrid.className = 'calendar-grid';
+function calendarTooltipText(dayData, touch) {
+    let tooltipText = '';
 
-        // Day headers
-        for (let i = 0; i < 7; i++) {
-            const headerCell = document.createElement('div');
-            headerCell.className = 'day-header';
-            headerCell.textContent = dayHeaders[i];
-            calendarGrid.appendChild(headerCell);
+    // Add holiday info first if present
+    if (dayData.holiday) {
+        if (touch) {
+            tooltipText += `<div style="margin-bottom:4px; font-weight:700; color:#eab308;">🎉 ${dayData.holiday.name}</div>`;
+        } else {
+            const typeLabel = dayData.holiday.longWeekend ? 'Long Weekend' : 'Holiday';
+            const labelColor = dayData.holiday.longWeekend ? '#ec4899' : '#eab308';
+            tooltipText += `<div style="margin-bottom:4px; font-weight:700; color:${labelColor}; text-shadow: 0 1px 2px rgba(0,0,0,0.5);">🎉 ${dayData.holiday.name} (${typeLabel})</div>`;
         }
+    }
 
-        // Empty cells for first week
-        const firstDayOfWeek = monthData.days[0].dayOfWeek;
-        for (let i = 0; i < firstDayOfWeek; i++) {
-            const emptyCell = document.createElement('div');
-            emptyCell.className = 'day-cell empty';
-            calendarGrid.appendChild(emptyCell);
+    if (dayData.status === 'past') {
+        return tooltipText + '<strong>Travel Date Passed 🕰️</strong>';
+    }
+    if (dayData.status === 'open') {
+        tooltipText += '<strong>Booking is Open ✅</strong>';
+        if (!touch) {
+            tooltipText += `<br><span style="font-size:0.85em; opacity:0.9">Booking opened on ${formatDateForDisplay(dayData.opening)}</span>`;
         }
+        return tooltipText;
+    }
+    if (touch) {
+        return tooltipText + `Booking opens on:<br><strong>${formatDateForDisplay(dayData.opening)}</strong>`;
+    }
+    return tooltipText + `Booking opens on:<br><strong>${formatDateLong(dayData.opening)}</strong> 📅` +
+        `<br><span style="font-size:0.85em; opacity:0.9">Tatkal opens on ${formatDateForDisplay(dayData.tatkal)}</span>`;
+}
 
-        // Day cells
-        monthData.days.forEach(dayData => {
-            const dayDiv = document.createElement('div');
-            dayDiv.className = 'day-cell';
-
-            // Holiday styling
-            if (dayData.holiday) {
-                dayDiv.className += ' holiday-date';
-                if (dayData.holiday.type === 'long-weekend') {
-                    dayDiv.className += ' long-weekend-date';
-                }
-            }
+function renderCalendarMonth(monthDiv, data, todayTime) {
+    const calendarGrid = document.createElement('div');
+    calendarGrid.className = 'calendar-grid';
+    const fragment = document.createDocumentFragment();
 
-            const dayNumber = document.createElement('span');
-            dayNumber.className = 'day-number';
-            dayNumber.textContent = dayData.date;
-            dayDiv.appendChild(dayNumber);
-
-            // Determine status
-            let status = 'future';
-
-            if (dayData.time < todayTime) {
-                dayDiv.className += ' pass-date';
-                status = 'past';
-            } else if (dayData.time <= sixtyDaysTime) {
-                dayDiv.className += ' next-60-days';
-                if (dayData.time === todayTime) dayDiv.className += ' today';
-                status = 'open';
-            }
+    // Day headers
+    for (let i = 0; i < 7; i++) {
+        const headerCell = document.createElement('div');
+        headerCell.className = 'day-header';
+        headerCell.textContent = DAY_HEADERS[i];
+        fragment.appendChild(headerCell);
+    }
 
-            // Bind tooltip events
-            dayDiv.addEventListener('mouseenter', (e) => {
-                let tooltipText = '';
+    // Empty cells for first week
+    for (let i = 0; i < data.first; i++) {
+        const emptyCell = document.createElement('div');
+        emptyCell.className = 'day-cell empty';
+        fragment.appendChild(emptyCell);
+    }
 
-                // Add holiday info first if present
-                if (dayData.holiday) {
-                    const typeLabel = dayData.holiday.type === 'long-weekend' ? 'Long Weekend' : 'Holiday';
-                    const labelColor = dayData.holiday.type === 'long-weekend' ? '#ec4899' : '#eab308';
-                    tooltipText += `<div style="margin-bottom:4px; font-weight:700; color:${labelColor}; text-shadow: 0 1px 2px rgba(0,0,0,0.5);">🎉 ${dayData.holiday.name} (${typeLabel})</div>`;
-                }
+    const holidays = new Map(data.holidays.map(([day, name, longWeekend]) => [day, { name, longWeekend }]));
+    const daysInMonth = data.general.length;
+    const days = [];
+
+    // Day cells; opening dates are stored as days before the journey date
+    for (let date = 1; date <= daysInMonth; date++) {
+        const time = new Date(data.y, data.m - 1, date).getTime();
+        const opening = new Date(data.y, data.m - 1, date - data.general[date - 1]);
+        const dayData = {
+            status: 'future',
+            opening: opening,
+            tatkal: new Date(data.y, data.m - 1, date - data.tatkal[date - 1]),
+            holiday: holidays.get(date)
+        };
 
-                if (status === 'past') {
-                    tooltipText += '<strong>Travel Date Passed 🕰️</strong>';
-                    showTooltip(e, tooltipText, 'past');
-                } else if (status === 'open') {
-                    const bookedDate = new Date(dayData.time - (BOOKING_CONFIG.ADVANCE_DAYS * 86400000));
-                    tooltipText += `<strong>Booking is Open ✅</strong><br><span style="font-size:0.85em; opacity:0.9">Booking opened on ${formatDateForDisplay(bookedDate)}</span>`;
-                    showTooltip(e, tooltipText, 'open');
-                } else {
-                    // Calculate open date
-                    const bookingDate = new Date(dayData.time - (BOOKING_CONFIG.ADVANCE_DAYS * 86400000));
-                    tooltipText += `Booking opens on:<br><strong>${formatDateLong(bookingDate)}</strong> 📅`;
-                    showTooltip(e, tooltipText, 'future');
-                }
-            });
+        let className = 'day-cell';
+        if (dayData.holiday) {
+            className += ' holiday-date';
+            if (dayData.holiday.longWeekend) {
+                className += ' long-weekend-date';
+            }
+        }
+        if (time < todayTime) {
+            className += ' pass-date';
+            dayData.status = 'past';
+        } else if (opening.getTime() <= todayTime) {
+            className += ' next-60-days';
+            if (time === todayTime) className += ' today';
+            dayData.status = 'open';
+        }
+        days[date] = dayData;
 
-            dayDiv.addEventListener('mouseleave', hideTooltip);
+        const dayDiv = document.createElement('div');
+        dayDiv.className = className;
+        dayDiv.dataset.day = date;
 
-            // Touch support for mobile tooltips
-            dayDiv.addEventListener('touchstart', (e) => {
-                // ... mobile logic same as mouseenter ...
-                let tooltipText = '';
-                if (dayData.holiday) {
-                    tooltipText += `<div style="margin-bottom:4px; font-weight:700; color:#eab308;">🎉 ${dayData.holiday.name}</div>`;
-                }
+        const dayNumber = document.createElement('span');
+        dayNumber.className = 'day-number';
+        dayNumber.textContent = date;
+        dayDiv.appendChild(dayNumber);
+        fragment.appendChild(dayDiv);
+    }
 
-                if (status === 'past') {
-                    tooltipText += '<strong>Travel Date Passed 🕰️</strong>';
-                    showTooltip(e, tooltipText, 'past');
-                } else if (status === 'open') {
-                    tooltipText += '<strong>Booking is Open ✅</strong>';
-                    showTooltip(e, tooltipText, 'open');
-                } else {
-                    const bookingDate = new Date(dayData.time - (BOOKING_CONFIG.ADVANCE_DAYS * 86400000));
-                    tooltipText += `Booking opens on:<br><strong>${formatDateForDisplay(bookingDate)}</strong>`;
-                    showTooltip(e, tooltipText, 'future');
-                }
-                setTimeout(hideTooltip, 3000);
-            }, { passive: true });
+    // Fill remaining cells
+    const remainingCells = (7 - ((data.first + daysInMonth) % 7)) % 7;
+    for (let i = 0; i < remainingCells; i++) {
+        const emptyCell = document.createElement('div');
+        emptyCell.className = 'day-cell empty';
+        fragment.appendChild(emptyCell);
+    }
 
-            calendarGrid.appendChild(dayDiv);
+    calendarGrid.appendChild(fragment);
+
+    // One set of delegated listeners per month instead of three per day
+    const cellFor = (e) => e.target.closest('.day-cell[data-day]');
+    calendarGrid.addEventListener('mouseover', (e) => {
+        const cell = cellFor(e);
+        if (!cell || cell.contains(e.relatedTarget)) return;
+        const dayData = days[cell.dataset.day];
+        showCalendarTooltip(cell, calendarTooltipText(dayData, false), dayData.status);
+    });
+    calendarGrid.addEventListener('mouseout', (e) => {
+        const cell = cellFor(e);
+        if (!cell || cell.contains(e.relatedTarget)) return;
+        hideCalendarTooltip();
+    });
+    // Touch support for mobile tooltips
+    calendarGrid.addEventListener('touchstart', (e) => {
+        const cell = cellFor(e);
+        if (!cell) return;
+        const dayData = days[cell.dataset.day];
+        showCalendarTooltip(cell, calendarTooltipText(dayData, true), dayData.status);
+        setTimeout(hideCalendarTooltip, 3000);
+    }, { passive: true });
+
+    monthDiv.appendChild(calendarGrid);
+}
+
+function fillCalendarMonth(monthDiv, todayTime) {
+    loadCalendarMonth(monthDiv.dataset.month)
+        .then(data => {
+            renderCalendarMonth(monthDiv, data, todayTime);
+            monthDiv.classList.remove('loading');
+        })
+        .catch(error => {
+            console.log('[Calendar] Month failed to load:', error);
+            monthDiv.classList.remove('loading');
+            const message = document.createElement('p');
+            message.className = 'month-error';
+            message.textContent = 'Could not load this month. Check your connection and reload.';
+            monthDiv.appendChild(message);
         });
+}
 
-        // Fill remaining cells
-        const totalCellsLast = firstDayOfWeek + monthData.days.length;
-        const remainingCells = (7 - (totalCellsLast % 7)) % 7;
-        for (let i = 0; i < remainingCells; i++) {
-            const emptyCell = document.createElement('div');
-            emptyCell.className = 'day-cell empty';
-            calendarGrid.appendChild(emptyCell);
-        }
+function generateBookingCalendar() {
+    const elements = getElements();
+    const container = elements.calendarContainer;
+    const today = getIndianDate();
+    const todayTime = today.getTime();
 
-        monthDiv.appendChild(calendarGrid);
-        fragment.appendChild(monthDiv);
-    });
+    // Set min date for travel input
+    const todayFormatted = today.getFullYear() + '-' +
+        String(today.getMonth() + 1).padStart(2, '0') + '-' +
+        String(today.getDate()).padStart(2, '0');
+    elements.travelDateInput.setAttribute('min', todayFormatted);
 
-    // Single DOM update
-    container.innerHTML = '';
-    container.appendChild(fragment);
+    // Update booking info card
+    const sixtyDaysLater = new Date(todayTime + (BOOKING_CONFIG.ADVANCE_DAYS * 86400000));
+    const day = sixtyDaysLater.getDate();
+    const month = sixtyDaysLater.toLocaleDateString('en-IN', { month: 'long', timeZone: 'Asia/Kolkata' });
+    const weekday = sixtyDaysLater.toLocaleDateString('en-IN', { weekday: 'long', timeZone: 'Asia/Kolkata' });
+    elements.bookingInfo.innerHTML = `You can book tickets for travel up to <span class="highlight">${day} ${month}</span> (${weekday})`;
+
+    // Months run from the current one to the last month the build published
+    const currentKey = todayFormatted.slice(0, 7);
+
+    fetchCalendarJson('index.json')
+        .then(index => {
+            const fragment = document.createDocumentFragment();
+            const monthDivs = index.months
+                .filter(key => key >= currentKey)
+                .map(key => {
+                    const [year, monthNumber] = key.split('-');
+                    const monthDiv = document.createElement('div');
+                    monthDiv.className = 'month-section loading';
+                    monthDiv.dataset.month = key;
+
+                    const monthHeader = document.createElement('h3');
+                    monthHeader.className = 'month-header';
+                    monthHeader.textContent = `${MONTH_NAMES[monthNumber - 1]} ${year}`;
+                    monthDiv.appendChild(monthHeader);
+                    fragment.appendChild(monthDiv);
+                    return monthDiv;
+                });
+
+            // Single DOM update
+            container.innerHTML = '';
+            container.appendChild(fragment);
+
+            if (!('IntersectionObserver' in window)) {
+                monthDivs.forEach(monthDiv => fillCalendarMonth(monthDiv, todayTime));
+                return;
+            }
+            const observer = new IntersectionObserver(entries => {
+                entries.forEach(entry => {
+                    if (!entry.isIntersecting) return;
+                    observer.unobserve(entry.target);
+                    fillCalendarMonth(entry.target, todayTime);
+                });
+            }, { rootMargin: '200px 0px' });
+            monthDivs.forEach(monthDiv => observer.observe(monthDiv));
+        })
+        .catch(error => {
+            console.log('[Calendar] Failed to load:', error);
+            container.innerHTML = '<p class="month-error">Could not load the booking calendar. Check your connection and reload.</p>';
+        });
 }
 
 // ==========================================
@@ -988,6 +996,272 @@ function getGoogleCalendarUrl(title, description, startDateTime, endDateTime) {
     return `https://calendar.google.com/calendar/render?${params.toString()}`;
 }
 
+// ==========================================
+// Train Number Lookup
+// Shards are written at build time by train_numbers.py, bucketed by the
+// first TRAIN_PREFIX_LENGTH characters of the number, so resolving a typed
+// number to its route page is one small fetch
+// ==========================================
+
+const TRAIN_DATA_URL = 'data/trains/';
+const TRAIN_PREFIX_LENGTH = 3;
+
+// Shard key -> Promise of {number: [[name, source, destination, route slug], ...]}
+const trainShardCache = new Map();
+
+// Mirrors normalize_number, shard_key and train_filename in train_numbers.py
+function normalizeTrainNumber(value) {
+    return value.replace(/\s+/g, '').toUpperCase();
+}
+
+function trainShardKey(number) {
+    return number.slice(0, TRAIN_PREFIX_LENGTH).replace(/[^0-9A-Z]/g, '_');
+}
+
+function trainPageUrl(number) {
+    return `pages/train-numbers/train-${number.toLowerCase().replace(/[^0-9a-z]+/g, '-').replace(/^-+|-+$/g, '')}.html`;
+}
+
+function routePageUrl(slug) {
+    return `pages/trains/train-between-${slug}.html`;
+}
+
+function loadTrainShard(key) {
+    if (!trainShardCache.has(key)) {
+        const request = fetch(`${TRAIN_DATA_URL}${key}.json`).then(response => {
+            // No shard means no train number starts with these characters
+            if (response.status === 404) return {};
+            if (!response.ok) {
+                throw new Error(`Train data ${key}: HTTP ${response.status}`);
+            }
+            return response.json();
+        });
+        request.catch(() => trainShardCache.delete(key));
+        trainShardCache.set(key, request);
+    }
+    return trainShardCache.get(key);
+}
+
+function renderTrainResult(result, number, entries) {
+    result.textContent = '';
+    if (!entries) {
+        result.textContent = `No train ${number} found. Check the number and try again.`;
+        return;
+    }
+    const list = document.createElement('ul');
+    list.className = 'train-finder-list';
+    entries.forEach(([name, source, destination, slug]) => {
+        const item = document.createElement('li');
+        const title = document.createElement('a');
+        title.href = trainPageUrl(number);
+        title.className = 'train-finder-name';
+        title.textContent = `${number} ${name}`;
+        const route = document.createElement('a');
+        route.href = routePageUrl(slug);
+        route.textContent = `${source} → ${destination}`;
+        item.append(title, route);
+        list.appendChild(item);
+    });
+    result.appendChild(list);
+}
+
+function initTrainLookup() {
+    const form = document.getElementById('train-number-form');
+    const input = document.getElementById('train-number-input');
+    const result = document.getElementById('train-number-result');
+    if (!form || !input || !result) return;
+
+    // The latest lookup wins; answers to earlier keystrokes are dropped
+    let lookupId = 0;
+
+    const lookup = () => {
+        const number = normalizeTrainNumber(input.value);
+        const id = ++lookupId;
+        if (number.length < TRAIN_PREFIX_LENGTH) {
+            result.textContent = '';
+            return Promise.resolve(null);
+        }
+        return loadTrainShard(trainShardKey(number))
+            .then(shard => {
+                if (id !== lookupId) return null;
+                const entries = shard[number] || null;
+                // Partial numbers only prefetch the shard; say nothing until one matches
+                if (entries || form.dataset.submitted) {
+                    renderTrainResult(result, number, entries);
+                } else {
+                    result.textContent = '';
+                }
+                return entries;
+            })
+            .catch(() => {
+                if (id === lookupId) result.textContent = 'Could not load train data. Please try again.';
+                return null;
+            });
+    };
+
+    input.addEventListener('input', () => {
+        delete form.dataset.submitted;
+        lookup();
+    });
+    form.addEventListener('submit', (e) => {
+        e.preventDefault();
+        form.dataset.submitted = 'true';
+        lookup().then(entries => {
+            // A number on a single route goes straight to its route page
+            if (entries && entries.length === 1) {
+                window.location.href = routePageUrl(entries[0][3]);
+            }
+        });
+    });
+}
+
+// ==========================================
+// Station Search
+// Written at build time by station_search.py: index.json lists the shard
+// keys (word prefixes), each shard the stations with a word under that
+// prefix, and each station file its routes. Typing fetches one small shard;
+// 'FROM to TO' narrows the picked station's routes
+// ==========================================
+
+const SEARCH_DATA_URL = 'data/search/';
+const SEARCH_RESULTS = 8;
+
+// Path -> Promise of parsed JSON, shared by repeat requests
+const searchCache = new Map();
+
+function fetchSearchJson(path) {
+    if (!searchCache.has(path)) {
+        const request = fetch(SEARCH_DATA_URL + path).then(response => {
+            if (!response.ok) {
+                throw new Error(`Search data ${path}: HTTP ${response.status}`);
+            }
+            return response.json();
+        });
+        request.catch(() => searchCache.delete(path));
+        searchCache.set(path, request);
+    }
+    return searchCache.get(path);
+}
+
+// Mirrors normalize_words in station_search.py
+function normalizeWords(text) {
+    return text.toLowerCase().replace(/[^0-9a-z]+/g, ' ').trim().split(' ').filter(Boolean);
+}
+
+// Every query word must start some word of the name, in any order
+function matchesWords(name, queryWords) {
+    const words = normalizeWords(name);
+    return queryWords.every(query => words.some(word => word.startsWith(query)));
+}
+
+function searchStations(text) {
+    const queryWords = normalizeWords(text);
+    if (!queryWords.length) return Promise.resolve([]);
+    return fetchSearchJson('index.json').then(index => {
+        const keys = new Set(index.keys);
+        const common = new Set(index.common);
+        // The longest indexed word picks the shard; common words are only matched
+        const lookup = queryWords
+            .filter(word => !common.has(word))
+            .sort((a, b) => b.length - a.length)[0];
+        if (!lookup) return [];
+        let key = null;
+        for (let length = lookup.length; length > 0 && !key; length--) {
+            if (keys.has(lookup.slice(0, length))) key = lookup.slice(0, length);
+        }
+        if (!key) return [];
+        return fetchSearchJson(`shards/${key}.json`).then(shard =>
+            shard.filter(([name]) => matchesWords(name, queryWords)).slice(0, SEARCH_RESULTS));
+    });
+}
+
+function searchRoutes(station, text) {
+    const queryWords = normalizeWords(text);
+    return fetchSearchJson(`stations/${station[1]}.json`).then(routes =>
+        routes.filter(([other]) => matchesWords(other, queryWords)).slice(0, SEARCH_RESULTS));
+}
+
+function renderSearchResults(list, items) {
+    list.textContent = '';
+    items.forEach(({ label, detail, href, onSelect }) => {
+        const item = document.createElement('li');
+        const link = document.createElement('a');
+        link.href = href || '#';
+        link.textContent = label;
+        if (onSelect) {
+            link.addEventListener('click', (e) => {
+                e.preventDefault();
+                onSelect();
+            });
+        }
+        const small = document.createElement('span');
+        small.textContent = detail;
+        link.appendChild(small);
+        item.appendChild(link);
+        list.appendChild(item);
+    });
+}
+
+function initStationSearch() {
+    const form = document.getElementById('station-search-form');
+    const input = document.getElementById('station-search-input');
+    const list = document.getElementById('station-search-results');
+    if (!form || !input || !list) return;
+
+    // The latest search wins; answers to earlier keystrokes are dropped
+    let searchId = 0;
+
+    const pickStation = (name) => {
+        input.value = `${name} to `;
+        input.focus();
+        search();
+    };
+
+    const search = () => {
+        const id = ++searchId;
+        const [fromText, toText] = input.value.split(/\s+to\s+/i);
+        return searchStations(fromText).then(stations => {
+            if (toText === undefined) {
+                return stations.map(station => ({
+                    label: station[0],
+                    detail: `${station[2]} routes`,
+                    onSelect: () => pickStation(station[0])
+                }));
+            }
+            // Prefer the station named exactly, else the busiest match
+            const wanted = normalizeWords(fromText).join(' ');
+            const station = stations.find(([name]) => normalizeWords(name).join(' ') === wanted) || stations[0];
+            if (!station) return [];
+            return searchRoutes(station, toText).then(routes => routes.map(([other, slug, trains]) => ({
+                label: `${station[0]} – ${other}`,
+                detail: `${trains} trains`,
+                href: routePageUrl(slug)
+            })));
+        }).then(items => {
+            if (id === searchId) renderSearchResults(list, items);
+            return items;
+        }).catch(() => {
+            if (id === searchId) list.textContent = '';
+            return [];
+        });
+    };
+
+    input.addEventListener('input', search);
+    // The index is a few KB; fetch it when the box is first used, not on page load
+    input.addEventListener('focus', () => fetchSearchJson('index.json').catch(() => { }), { once: true });
+    form.addEventListener('submit', (e) => {
+        e.preventDefault();
+        search().then(items => {
+            if (!items.length) return;
+            if (items[0].href) {
+                window.location.href = items[0].href;
+            } else {
+                items[0].onSelect();
+            }
+        });
+    });
+}
+
 // ==========================================
 // Toast Notifications (Lightweight)
 // ==========================================
@@ -1059,9 +1333,9 @@ function init() {
 
     // Non-critical - defer calendar generation
     if ('requestIdleCallback' in window) {
-        requestIdleCallback(() => generate2026Calendar(), { timeout: 100 });
+        requestIdleCallback(() => generateBookingCalendar(), { timeout: 100 });
     } else {
-        setTimeout(generate2026Calendar, 0);
+        setTimeout(generateBookingCalendar, 0);
     }
 
     // Travel date input
@@ -1120,6 +1394,10 @@ function init() {
         });
     }
 
+    // Train number lookup and station search
+    initTrainLookup();
+    initStationSearch();
+
     // Copy, Share, and Calendar buttons
     // The previous copy/share button event listeners were replaced by the new block above.
     // This block now only handles the calendar button and the share button's display logic.
@@ -1143,7 +1421,8 @@ function init() {
     // Register Service Worker (non-blocking)
     if ('serviceWorker' in navigator) {
         window.addEventListener('load', () => {
-            navigator.serviceWorker.register('./sw.js').catch(() => { });
+            // The precache manifest is an imported script, so skip the HTTP cache for it too
+            navigator.serviceWorker.register('./sw.js', { updateViaCache: 'none' }).catch(() => { });
         });
     }
 }
@@ -0,0 +1,152 @@
+import json
+import re
+
+# Whitespace and comment stripping for generated pages. Text runs collapse to one
+# space and disappear next to block-level tags, where browsers ignore them anyway.
+# <pre>/<textarea> contents are never touched; inline scripts are kept verbatim
+# in safe mode, since a regex cannot tell JavaScript code from string contents.
+
+TOKEN = re.compile(
+    r'<!--.*?-->'
+    r'|<(?P<raw>script|style|pre|textarea)\b[^>]*>.*?</(?P=raw)\s*>'
+    r'|<[^>]+>',
+    re.DOTALL | re.IGNORECASE)
+RAW_BLOCK = re.compile(r'(<[^>]+>)(.*)(</[^>]+>)$', re.DOTALL)
+TAG_NAME = re.compile(r'</?([a-zA-Z][\w-]*)')
+ATTRIBUTE = re.compile(r'''\s+([^\s=/>]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s>]+))?''')
+# Values that need no quotes; a trailing / would read as a self-closing tag
+UNQUOTED_VALUE = re.compile(r'^[^\s"\'=<>`]*[^\s"\'=<>`/]$')
+WHITESPACE = re.compile(r'\s+')
+LEADING_WHITESPACE = re.compile(r'^[ \t]+', re.MULTILINE)
+BLANK_LINES = re.compile(r'\n{2,}')
+
+CSS_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+CSS_STRING = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')''')
+CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+# Only the space after a colon: before one it can be a descendant combinator (a :hover)
+CSS_COLON = re.compile(r':\s+')
+
+BLOCK_TAGS = {
+    'html', 'head', 'body', 'title', 'meta', 'link', 'style', 'script', 'noscript', 'base',
+    'div', 'p', 'nav', 'header', 'footer', 'main', 'section', 'article', 'aside',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li', 'dl', 'dt', 'dd',
+    'table', 'thead', 'tbody', 'tfoot', 'tr', 'td', 'th', 'caption',
+    'form', 'fieldset', 'figure', 'figcaption', 'blockquote', 'br', 'hr', 'pre', 'textarea',
+}
+
+# Comments that carry meaning: partial markers are re-spliced by offset, and IE conditionals
+KEEP_COMMENTS = ('<!-- partial:', '<!-- /partial:', '<!--[if')
+
+
+def minify_css(css):
+    # Strings are kept as they are; whitespace elsewhere only matters as a separator
+    parts = CSS_STRING.split(CSS_COMMENT.sub('', css))
+    for i in range(0, len(parts), 2):
+        parts[i] = CSS_COLON.sub(':', CSS_PUNCTUATION.sub(r'\1', WHITESPACE.sub(' ', parts[i])))
+    return ''.join(parts).replace(';}', '}').strip()
+
+
+def minify_json_ld(text):
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text.strip()
+    # Keep </ escaped so the data cannot close its <script> element
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+
+def minify_tag(tag):
+    if tag.startswith(('<!', '<?', '</')):
+        return WHITESPACE.sub(' ', tag)
+    name = TAG_NAME.match(tag)
+    if name is None:
+        return tag
+    end = '/>' if tag.endswith('/>') else '>'
+    body = tag[name.end():len(tag) - len(end)]
+    parts = [f"<{name.group(1)}"]
+    for attr, value in ATTRIBUTE.findall(body):
+        if not value:
+            parts.append(f" {attr}")
+            continue
+        if value[0] in '"\'':
+            inner = value[1:-1]
+            if UNQUOTED_VALUE.match(inner):
+                value = inner
+        parts.append(f" {attr}={value}")
+    return ''.join(parts) + end
+
+
+def _minify_raw(block, name, safe):
+    match = RAW_BLOCK.match(block)
+    if match is None:
+        return block
+    open_tag, content, close_tag = match.groups()
+    if name == 'style':
+        content = minify_css(content)
+    elif name == 'script':
+        if 'application/ld+json' in open_tag:
+            content = minify_json_ld(content)
+        elif not safe:
+            content = BLANK_LINES.sub('\n', LEADING_WHITESPACE.sub('', content)).strip()
+    return minify_tag(open_tag) + content + close_tag
+
+
+def _tag_name(token):
+    match = TAG_NAME.match(token)
+    return match.group(1).lower() if match else None
+
+
+def minify_html(html, safe=True):
+    # Returns the document with comments dropped, whitespace collapsed, redundant
+    # attribute quotes removed and inline CSS / JSON-LD minified
+    out = []
+    # (text, kind) where kind is 'text', 'block' (bounds whitespace) or 'inline'
+    pieces = []
+
+    def add_text(text):
+        # Text on both sides of a dropped comment joins into one run
+        if pieces and pieces[-1][1] == 'text':
+            text = pieces.pop()[0] + text
+        pieces.append((WHITESPACE.sub(' ', text), 'text'))
+
+    pos = 0
+    for match in TOKEN.finditer(html):
+        if match.start() > pos:
+            add_text(html[pos:match.start()])
+        token = match.group(0)
+        pos = match.end()
+
+        if token.startswith('<!--'):
+            if token.startswith(KEEP_COMMENTS):
+                pieces.append((token, 'block'))
+            continue
+        raw = match.group('raw')
+        if raw:
+            pieces.append((_minify_raw(token, raw.lower(), safe), 'block'))
+            continue
+        name = _tag_name(token)
+        kind = 'block' if name in BLOCK_TAGS or token.startswith('<!') else 'inline'
+        pieces.append((minify_tag(token), kind))
+    if pos < len(html):
+        add_text(html[pos:])
+
+    for i, (text, kind) in enumerate(pieces):
+        if kind == 'text':
+            if i == 0 or pieces[i - 1][1] == 'block':
+                text = text.lstrip()
+            if i == len(pieces) - 1 or pieces[i + 1][1] == 'block':
+                text = text.rstrip()
+            if not text:
+                continue
+        out.append(text)
+    return ''.join(out)
+
+
+def minify_document(html, rel_path):
+    # Build stage / generator transform signature
+    return minify_html(html)
+
+
+def minify_document_scripts(html, rel_path):
+    # Also strips indentation inside inline scripts (not safe for multi-line strings)
+    return minify_html(html, safe=False)
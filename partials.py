@@ -0,0 +1,243 @@
+import functools
+import hashlib
+import json
+import posixpath
+import re
+
+# Site-wide blocks shared by the generated pages. Each rendered partial is wrapped
+# in <!-- partial:name --> markers so a later build can splice in a new version
+# at the byte offsets recorded when the page was written, without re-rendering it.
+
+# (target relative to the site root, header label, footer label)
+SITE_LINKS = [
+    ("index.html", "Calculator", "Calculator"),
+    ("pages/tatkal.html", "Tatkal Dates", "Tatkal Dates"),
+    ("pages/news.html", "Rail News", "Rail News"),
+    ("pages/faq.html", "FAQ", "FAQ"),
+    ("pages/ewallet.html", "eWallet", "eWallet"),
+    ("pages/helpline.html", "Helpline", "Helpline"),
+    ("pages/videos.html", "Train Videos", "Train Videos"),
+    ("pages/about-us.html", "About", "About Us"),
+    ("pages/privacy-policy.html", "Privacy", "Privacy Policy"),
+    ("pages/contact-us.html", "Contact", "Contact Us"),
+    ("pages/disclaimer.html", "Disclaimer", "Disclaimer"),
+]
+
+GTAG_ID = 'G-NL4NTX1D6V'
+
+# (script src, crossorigin, origin to preconnect to)
+ANALYTICS_TAGS = {
+    'gtag': (f"https://www.googletagmanager.com/gtag/js?id={GTAG_ID}", None, "https://www.googletagmanager.com"),
+    'adsense': ("https://pagead2.googlesyndication.com/pagead/js/adsbygoogle.js?client=ca-pub-5018644317959743",
+                "anonymous", "https://pagead2.googlesyndication.com"),
+}
+
+# How third-party tags load, per page type (output directory relative to the site root):
+#   'eager'       - async tags in <head>, competing with the page from the start
+#   'idle'        - after the load event, once the main thread is idle
+#   'interaction' - on the first scroll/tap/keypress, or ANALYTICS_FALLBACK_MS after load
+# (loading, tags)
+ANALYTICS_PAGES = {
+    '': ('idle', ('gtag',)),
+    'pages': ('idle', ('gtag', 'adsense')),
+    'pages/blogs': ('idle', ('gtag',)),
+    'pages/trains': ('interaction', ('gtag', 'adsense')),
+    'pages/connections': ('interaction', ('gtag', 'adsense')),
+    'pages/train-numbers': ('interaction', ('gtag', 'adsense')),
+}
+DEFAULT_ANALYTICS = ('idle', ('gtag', 'adsense'))
+# Visitors who never interact are still counted after this delay
+ANALYTICS_FALLBACK_MS = 5000
+
+GTAG_INIT = f"""        window.dataLayer = window.dataLayer || [];
+        function gtag() {{ dataLayer.push(arguments); }}
+        gtag('js', new Date());
+        gtag('config', '{GTAG_ID}');
+"""
+
+DEFERRED_LOADER = """        (function () {{
+            var loaded = false;
+            function load() {{
+                if (loaded) return;
+                loaded = true;
+                {tags}.forEach(function (tag) {{
+                    var script = document.createElement('script');
+                    script.async = true;
+                    script.src = tag[0];
+                    if (tag[1]) script.crossOrigin = tag[1];
+                    document.head.appendChild(script);
+                }});
+            }}
+{trigger}        }})();
+"""
+
+IDLE_TRIGGER = """            function idle() {
+                if ('requestIdleCallback' in window) requestIdleCallback(load, { timeout: 4000 });
+                else setTimeout(load, 2000);
+            }
+            if (document.readyState === 'complete') idle();
+            else window.addEventListener('load', idle);
+"""
+
+INTERACTION_TRIGGER = """            ['pointerdown', 'keydown', 'scroll', 'touchstart'].forEach(function (type) {{
+                window.addEventListener(type, load, {{ once: true, passive: true }});
+            }});
+            window.addEventListener('load', function () {{ setTimeout(load, {fallback_ms}); }});
+"""
+
+# The hand-written gtag block that pages carried before the analytics partial
+LEGACY_ANALYTICS = re.compile(
+    r'(?:[ \t]*<!-- (?:Google tag \(gtag\.js\)|Google Tag Manager) -->\n)*'
+    r'[ \t]*<script async src="https://www\.googletagmanager\.com/gtag/js\?id=[^"]+"></script>\s*'
+    r'<script>[^<]*?gtag\(\'config\'[^<]*</script>\n'
+    r'(?:[ \t]*<!-- End Google Tag Manager -->\n)?')
+# The hand-written AdSense loader, which some pages carry in <head> next to the partial
+LEGACY_ADSENSE = re.compile(
+    r'(?:[ \t]*<!-- Google Adsense -->\n)?'
+    r'[ \t]*<script async src="https://pagead2\.googlesyndication\.com/pagead/js/adsbygoogle\.js\?[^"]*"'
+    r'(?:\s+crossorigin="anonymous")?\s*></script>\n?')
+CHARSET_META = re.compile(r'<meta charset=[^>]*>\n?', re.IGNORECASE)
+
+
+def _href(target, page_dir):
+    return posixpath.relpath(target, page_dir)
+
+
+def _render_nav(page_dir):
+    links = ''.join(f'            <a href="{_href(target, page_dir)}">{label}</a>\n'
+                    for target, label, _ in SITE_LINKS)
+    return f'        <nav class="main-nav">\n{links}        </nav>\n'
+
+
+def _render_footer(page_dir):
+    links = ''.join(f'                <a href="{_href(target, page_dir)}">{label}</a>\n'
+                    for target, _, label in SITE_LINKS)
+    return ('        <footer class="site-footer">\n'
+            '            <p>&copy; 2026 RailBookingDate - Created by Ishwar Joshi</p>\n'
+            '            <nav class="site-footer-nav">\n'
+            f'{links}'
+            '            </nav>\n'
+            '        </footer>\n')
+
+
+def _render_analytics(page_dir):
+    loading, tags = ANALYTICS_PAGES.get(page_dir, DEFAULT_ANALYTICS)
+    if loading == 'eager':
+        out = []
+        for name in tags:
+            src, crossorigin, _ = ANALYTICS_TAGS[name]
+            attrs = f' crossorigin="{crossorigin}"' if crossorigin else ''
+            out.append(f'    <script async src="{src}"{attrs}></script>\n')
+            if name == 'gtag':
+                out.append(f'    <script>\n{GTAG_INIT}    </script>\n')
+        return ''.join(out)
+
+    out = []
+    for name in tags:
+        _, crossorigin, origin = ANALYTICS_TAGS[name]
+        out.append(f'    <link rel="preconnect" href="{origin}"{" crossorigin" if crossorigin else ""}>\n')
+    # gtag() calls queue in dataLayer until the library arrives, so the page view keeps its timestamp
+    init = GTAG_INIT if 'gtag' in tags else ''
+    if loading == 'interaction':
+        trigger = INTERACTION_TRIGGER.format(fallback_ms=ANALYTICS_FALLBACK_MS)
+    else:
+        trigger = IDLE_TRIGGER
+    sources = json.dumps([[ANALYTICS_TAGS[name][0], ANALYTICS_TAGS[name][1]] for name in tags])
+    out.append(f'    <script>\n{init}{DEFERRED_LOADER.format(tags=sources, trigger=trigger)}    </script>\n')
+    return ''.join(out)
+
+
+PARTIALS = {
+    'analytics': _render_analytics,
+    'nav': _render_nav,
+    'footer': _render_footer,
+}
+
+
+def open_marker(name):
+    return f"<!-- partial:{name} -->"
+
+
+def close_marker(name):
+    return f"<!-- /partial:{name} -->"
+
+
+@functools.lru_cache(maxsize=None)
+def render_partial(name, page_dir):
+    # page_dir is the output directory relative to the site root, e.g. 'pages/trains'
+    return f"{open_marker(name)}\n{PARTIALS[name](page_dir)}{close_marker(name)}"
+
+
+@functools.lru_cache(maxsize=None)
+def partials_digest(page_dir):
+    h = hashlib.sha1()
+    for name in sorted(PARTIALS):
+        h.update(render_partial(name, page_dir).encode('utf-8'))
+    return h.hexdigest()
+
+
+def find_partial_offsets(data):
+    # {name: [start, end]} byte offsets of every marked partial in an encoded page
+    offsets = {}
+    for name in PARTIALS:
+        start = data.find(open_marker(name).encode('utf-8'))
+        if start < 0:
+            continue
+        end_marker = close_marker(name).encode('utf-8')
+        end = data.find(end_marker, start)
+        if end < 0:
+            continue
+        offsets[name] = [start, end + len(end_marker)]
+    return offsets
+
+
+def _offsets_valid(data, offsets):
+    for name, (start, end) in offsets.items():
+        if not data.startswith(open_marker(name).encode('utf-8'), start):
+            return False
+        end_marker = close_marker(name).encode('utf-8')
+        if not data.startswith(end_marker, end - len(end_marker)):
+            return False
+    return True
+
+
+def apply_analytics_partial(html, rel_path):
+    # Hand-written pages: the legacy gtag block and AdSense loader become the analytics
+    # partial, placed after <meta charset> so the charset stays within the first 1024
+    # bytes. Pages that already carry partial markers get them re-spliced.
+    page_dir = posixpath.dirname(rel_path)
+    html, adsense = LEGACY_ADSENSE.subn('', html)
+    data = html.encode('utf-8')
+    if find_partial_offsets(data):
+        return splice_partials(data, {}, page_dir)[0].decode('utf-8')
+    if not LEGACY_ANALYTICS.search(html) and not adsense:
+        return html
+    html = LEGACY_ANALYTICS.sub('', html, count=1)
+    block = render_partial('analytics', page_dir) + '\n'
+    charset = CHARSET_META.search(html)
+    if charset:
+        return html[:charset.end()] + block + html[charset.end():]
+    head = html.find('<head>')
+    return html[:head + len('<head>')] + '\n' + block + html[head + len('<head>'):]
+
+
+def splice_partials(data, offsets, page_dir):
+    # Replaces each recorded partial with its current rendering. Returns (data, offsets).
+    # Offsets that no longer line up (page edited by hand) fall back to a marker search.
+    if not offsets or not _offsets_valid(data, offsets):
+        offsets = find_partial_offsets(data)
+
+    parts = []
+    new_offsets = {}
+    pos = 0
+    size = 0
+    for name, (start, end) in sorted(offsets.items(), key=lambda item: item[1][0]):
+        block = render_partial(name, page_dir).encode('utf-8')
+        parts.append(data[pos:start])
+        size += start - pos
+        parts.append(block)
+        new_offsets[name] = [size, size + len(block)]
+        size += len(block)
+        pos = end
+    parts.append(data[pos:])
+    return b''.join(parts), new_offsets
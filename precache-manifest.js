@@ -0,0 +1,69 @@
+// Generated by precache.py - do not edit
+self.__PRECACHE_MANIFEST = {
+ "files": {
+  "./": "78136defac21",
+  "./css/booking.b85dbcdf75.css": "b85dbcdf7550",
+  "./css/navigation.d3e0bc6cd3.css": "d3e0bc6cd31c",
+  "./css/styles.c2bd93a1dd.css": "c2bd93a1dd77",
+  "./data/calendar/2026-10.json": "e1790506f916",
+  "./data/calendar/2026-11.json": "b8b1afb0e5d4",
+  "./data/calendar/2026-12.json": "0fdbcc78b3bd",
+  "./data/calendar/2027-01.json": "2e074409582b",
+  "./data/calendar/2027-02.json": "055c978d9629",
+  "./data/calendar/2027-03.json": "f3f924f50792",
+  "./data/calendar/2027-04.json": "5f539bebe729",
+  "./data/calendar/2027-05.json": "9d388d6c510b",
+  "./data/calendar/2027-06.json": "36b7d5613fe7",
+  "./data/calendar/2027-07.json": "f929c1ed2a72",
+  "./data/calendar/2027-08.json": "2023539cb3af",
+  "./data/calendar/2027-09.json": "9eef52e073e7",
+  "./data/calendar/index.json": "1c119cdcdc96",
+  "./favicon-96x96.png": "a5c936e616d9",
+  "./favicon.ico": "4a63749945e7",
+  "./index.html": "78136defac21",
+  "./js/app.78737e171b.js": "78737e171ba9",
+  "./manifest.json": "32adc80b4a17",
+  "./pages/about-us.html": "4027d061dacd",
+  "./pages/contact-us.html": "fbd9eb11ad36",
+  "./pages/disclaimer.html": "03944531a266",
+  "./pages/ewallet.html": "eaff56d2fb6e",
+  "./pages/faq.html": "720ef27d4938",
+  "./pages/helpline.html": "23954123c085",
+  "./pages/indian-railway-blogs.html": "95fc65de4e79",
+  "./pages/live-status.html": "5a630ea9d76c",
+  "./pages/news.html": "ec4fb0c3f162",
+  "./pages/pnr-status.html": "e1a52f3d5991",
+  "./pages/privacy-policy.html": "838f7060597b",
+  "./pages/tatkal.html": "2641b1f71a6d",
+  "./pages/videos.html": "47a4bb823fe4",
+  "./web-app-manifest-192x192.png": "e1978c858e4c",
+  "./web-app-manifest-512x512.png": "70acad23dbb3"
+ },
+ "revision": "df6d2cfbcfbe"
+};
+self.__CACHE_POLICIES = [
+ {
+  "name": "routes",
+  "match": "^pages/(trains|bookingdate|connections|train-numbers)/",
+  "strategy": "stale-while-revalidate",
+  "maxEntries": 100,
+  "maxAgeSeconds": 2592000,
+  "fallback": "./index.html"
+ },
+ {
+  "name": "blogs",
+  "match": "^pages/blogs/",
+  "strategy": "network-first",
+  "maxEntries": 30,
+  "maxAgeSeconds": 2592000,
+  "fallback": "./pages/indian-railway-blogs.html"
+ },
+ {
+  "name": "runtime",
+  "match": "",
+  "strategy": "stale-while-revalidate",
+  "maxEntries": 50,
+  "maxAgeSeconds": 604800,
+  "fallback": null
+ }
+];
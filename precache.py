@@ -0,0 +1,120 @@
+import argparse
+import glob
+import json
+import os
+
+from fingerprint import FINGERPRINTED, fingerprinted_name, is_current
+from sitemap import content_digest, file_digest
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Loaded by sw.js with importScripts(); a change to any precached file changes
+# this script, which is what makes the browser install the new service worker.
+PRECACHE_MANIFEST_NAME = 'precache-manifest.js'
+
+# The app shell the service worker precaches, in order. Generated route pages and
+# blogs are cached on visit under CACHE_POLICIES instead of being downloaded on install.
+PRECACHE_PATTERNS = [
+    'index.html',
+    'manifest.json',
+    'favicon.ico',
+    'favicon-96x96.png',
+    'web-app-manifest-192x192.png',
+    'web-app-manifest-512x512.png',
+    'css/*.css',
+    'js/*.js',
+    'data/calendar/*.json',
+    'pages/*.html',
+]
+
+DAY = 86400
+
+# Runtime caching by route class, first match wins. 'match' is a regex against
+# the path relative to the site root. Each class gets its own cache, trimmed to
+# max_entries (least recently fetched first) and max_age seconds, so browsing
+# thousands of route pages can never push the app shell out of storage.
+# (name, match, strategy, max_entries, max_age, offline fallback)
+CACHE_POLICIES = [
+    ('routes', r'^pages/(trains|bookingdate|connections|train-numbers)/', 'stale-while-revalidate', 100, 30 * DAY, 'index.html'),
+    ('blogs', r'^pages/blogs/', 'network-first', 30, 30 * DAY, 'pages/indian-railway-blogs.html'),
+    ('runtime', r'', 'stale-while-revalidate', 50, 7 * DAY, None),
+]
+
+# Short hashes keep the manifest small; they only need to tell revisions apart
+REVISION_LENGTH = 12
+
+
+def _superseded(base_dir, rel_path):
+    # A css/js source whose hashed copy exists, as pages only link to the copy, or a
+    # hashed copy of an older version that fingerprint.py keeps for cached pages
+    if not rel_path.endswith(('.css', '.js')):
+        return False
+    if FINGERPRINTED.match(rel_path):
+        return not is_current(rel_path, base_dir)
+    return os.path.exists(os.path.join(base_dir, fingerprinted_name(rel_path, base_dir)))
+
+
+def iter_precache_files(base_dir, patterns=PRECACHE_PATTERNS):
+    seen = set()
+    for pattern in patterns:
+        for path in sorted(glob.glob(os.path.join(base_dir, pattern))):
+            rel_path = os.path.relpath(path, base_dir).replace(os.sep, '/')
+            if rel_path not in seen and not _superseded(base_dir, rel_path):
+                seen.add(rel_path)
+                yield rel_path
+
+
+def build_precache_manifest(base_dir, digests=None, patterns=PRECACHE_PATTERNS):
+    # {'revision': ..., 'files': {'./rel/path': revision}}. digests maps
+    # rel_path -> sha1 for files the caller already holds in memory.
+    digests = digests or {}
+    files = {}
+    for rel_path in iter_precache_files(base_dir, patterns):
+        digest = digests.get(rel_path) or file_digest(os.path.join(base_dir, rel_path))
+        files[f"./{rel_path}"] = digest[:REVISION_LENGTH]
+    if './index.html' in files:
+        # The start URL is requested as ./ as well as ./index.html
+        files['./'] = files['./index.html']
+
+    overall = ''.join(f"{url}={revision}\n" for url, revision in sorted(files.items()))
+    return {'revision': content_digest(overall.encode('utf-8'))[:REVISION_LENGTH], 'files': files}
+
+
+def cache_policies(policies=CACHE_POLICIES):
+    return [{
+        'name': name,
+        'match': match,
+        'strategy': strategy,
+        'maxEntries': max_entries,
+        'maxAgeSeconds': max_age,
+        'fallback': f"./{fallback}" if fallback else None,
+    } for name, match, strategy, max_entries, max_age, fallback in policies]
+
+
+def write_precache_manifest(base_dir=BASE_DIR, digests=None, changes=None):
+    # With changes (a build_diff.BuildDiff) the manifest is only compared, not written
+    manifest = build_precache_manifest(base_dir, digests)
+    path = os.path.join(base_dir, PRECACHE_MANIFEST_NAME)
+    text = ("// Generated by precache.py - do not edit\n"
+            f"self.__PRECACHE_MANIFEST = {json.dumps(manifest, indent=1, sort_keys=True)};\n"
+            f"self.__CACHE_POLICIES = {json.dumps(cache_policies(), indent=1)};\n")
+    if changes is not None:
+        changes.compare(PRECACHE_MANIFEST_NAME, path, text.encode('utf-8'))
+        return manifest
+
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == text:
+                print(f"Precache manifest unchanged ({len(manifest['files'])} files)")
+                return manifest
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    print(f"Wrote {path} ({len(manifest['files'])} files, revision {manifest['revision']})")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the service worker precache manifest with per-file content hashes")
+    parser.add_argument('--base-dir', default=BASE_DIR, help="Site root")
+    args = parser.parse_args()
+    write_precache_manifest(args.base_dir)
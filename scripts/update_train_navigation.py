@@ -1,11 +1,19 @@
+import argparse
 import os
 import re
+import sys
 
-def update_train_pages():
-    trains_dir = "/Users/ishwarjoshi/Ishwar Joshi/work/traindays/pages/trains"
-    
-    # New navigation HTML
-    main_nav = """        <nav class="main-nav">
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import build_report
+from build_report import phase
+from compress_assets import write_sidecars
+from generate_train_pages import MANIFEST_NAME, PAGE_DIR, load_manifest, resplice_pages, save_manifest
+from partials import find_partial_offsets, splice_partials
+
+# Navigation and footer for route pages written before partials existed
+MAIN_NAV = """        <nav class="main-nav">
             <a href="../../index.html">Calculator</a>
             <a href="../tatkal.html">Tatkal Dates</a>
             <a href="../news.html">Rail News</a>
@@ -19,8 +27,7 @@ def update_train_pages():
             <a href="../disclaimer.html">Disclaimer</a>
         </nav>"""
 
-    # New footer HTML
-    site_footer = """        <footer class="site-footer">
+SITE_FOOTER = """        <footer class="site-footer">
             <p>&copy; 2026 RailBookingDate - Created by Ishwar Joshi</p>
             <nav class="site-footer-nav">
                 <a href="../../index.html">Calculator</a>
@@ -37,31 +44,86 @@ def update_train_pages():
             </nav>
         </footer>"""
 
+# The existing nav is <nav class="nav-links"> ... </nav>
+NAV_PATTERN = re.compile(r'<nav class="nav-links">.*?</nav>', re.DOTALL)
+FOOTER_PATTERN = re.compile(r'<footer class="site-footer">.*?</footer>', re.DOTALL)
+
+
+def apply_train_navigation(content):
+    # 1. Add navigation.css to head
+    if 'navigation.css' not in content:
+        content = content.replace('</head>', '    <link rel="stylesheet" href="../../css/navigation.css">\n</head>')
+
+    # 2. Replace header nav
+    content = NAV_PATTERN.sub(MAIN_NAV.strip(), content)
+
+    # 3. Replace footer
+    content = FOOTER_PATTERN.sub(SITE_FOOTER.strip(), content)
+    return content
+
+
+def update_train_pages(base_dir=BASE_DIR, compress=None):
+    # Generated pages carry <!-- partial:... --> markers and their offsets are stored in
+    # the build manifest, so a nav/footer change is spliced in without re-rendering or
+    # regex-scanning the page body. Only pages from older builds fall back to the regexes.
+    # compress=None refreshes .gz/.br sidecars when the pages have them.
+    # Returns False without touching anything for pages written through build stages.
+    trains_dir = os.path.join(base_dir, 'pages', 'trains')
+    manifest_path = os.path.join(base_dir, '.build', MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    if manifest['transform']:
+        # The stages rewrote the partials too (minified, critical CSS, ...), so raw
+        # partials cannot be spliced in; build.py re-renders them when a partial changes
+        print(f"Error: route pages were built with stages '{manifest['transform']}'; "
+              f"run build.py --incremental to update their nav/footer instead")
+        return False
+
     files = [f for f in os.listdir(trains_dir) if f.endswith(".html")]
     print(f"Found {len(files)} files to update.")
+    if compress is None:
+        compress = any(os.path.exists(os.path.join(trains_dir, f + '.gz')) for f in files)
 
-    for filename in files:
-        filepath = os.path.join(trains_dir, filename)
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # 1. Add navigation.css to head
-        if 'navigation.css' not in content:
-            content = content.replace('</head>', '    <link rel="stylesheet" href="../../css/navigation.css">\n</head>')
+    tracked = {f: manifest['offsets'][f] for f in files if f in manifest['offsets']}
+    with phase('resplice'):
+        offsets = resplice_pages(trains_dir, tracked, compress)
 
-        # 2. Replace header nav
-        # The existing nav is <nav class="nav-links"> ... </nav>
-        nav_pattern = re.compile(r'<nav class="nav-links">.*?</nav>', re.DOTALL)
-        content = nav_pattern.sub(main_nav.strip(), content)
+    legacy = [f for f in files if f not in tracked]
+    rewritten = 0
+    with phase('legacy-rewrite'):
+        for filename in legacy:
+            filepath = os.path.join(trains_dir, filename)
+            with open(filepath, 'r', encoding='utf-8') as f:
+                content = f.read()
 
-        # 3. Replace footer
-        footer_pattern = re.compile(r'<footer class="site-footer">.*?</footer>', re.DOTALL)
-        content = footer_pattern.sub(site_footer.strip(), content)
+            if find_partial_offsets(content.encode('utf-8')):
+                # Marked page missing from the manifest: splice by marker search
+                data, offsets[filename] = splice_partials(content.encode('utf-8'), {}, PAGE_DIR)
+                new_content = data.decode('utf-8')
+            else:
+                new_content = apply_train_navigation(content)
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+            if new_content != content:
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    f.write(new_content)
+                if compress:
+                    write_sidecars(filepath, new_content.encode('utf-8'))
+                rewritten += 1
+    build_report.count('navigation-tracked', len(tracked))
+    build_report.count('navigation-legacy', len(legacy))
+    build_report.count('navigation-legacy-rewritten', rewritten)
 
-    print("Successfully updated all train pages.")
+    if manifest['routes']:
+        with phase('manifest'):
+            save_manifest(manifest_path, manifest['routes'], offsets, manifest['transform'] or '')
+    print(f"Successfully updated all train pages ({len(legacy)} without partial markers).")
+    return True
 
 if __name__ == "__main__":
-    update_train_pages()
+    parser = argparse.ArgumentParser(description="Splice the current nav/footer into existing train route pages")
+    parser.add_argument('--base-dir', default=BASE_DIR, help="Site root")
+    build_report.add_arguments(parser)
+    args = parser.parse_args()
+    with build_report.reporting(args.report, args.profile):
+        updated = update_train_pages(base_dir=args.base_dir)
+    if not updated:
+        sys.exit(1)
@@ -0,0 +1,300 @@
+import argparse
+import functools
+import gzip
+import mimetypes
+import os
+import posixpath
+import threading
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+import build
+import generate_train_pages
+from fingerprint import FINGERPRINTED, source_name
+from generate_booking_pages import FIRST_MONTH, LAST_MONTH, iter_months, month_filename, render_month_page
+from generate_booking_pages import PAGE_DIR as BOOKING_PAGE_DIR
+from sitemap import content_digest, file_digest
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Local preview server. Route and booking pages are rendered on request from
+# trains.csv and the generators, through the same build stages as build.py, and kept
+# in an LRU; nothing is written to disk. Everything else is served from the site
+# root with strong ETags, 304s and the .br/.gz sidecars, like .htaccess does.
+DEFAULT_PORT = 8000
+# Rendered pages kept in memory
+CACHE_PAGES = 512
+
+# Cache-Control mirroring .htaccess
+IMMUTABLE = "public, max-age=31536000, immutable"
+NO_CACHE = "no-cache"
+NO_CACHE_FILES = ('sw.js', 'precache-manifest.js')
+# (Accept-Encoding token, sidecar extension), in order of preference
+SIDECARS = [('br', '.br'), ('gzip', '.gz')]
+COMPRESSIBLE = ('.html', '.css', '.js', '.json', '.xml', '.svg', '.txt')
+
+
+class RenderedPage:
+    __slots__ = ('body', 'etag', 'gzipped')
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = f'"{content_digest(body)[:20]}"'
+        self.gzipped = None
+
+    def gzip_body(self):
+        # Compressed on first request that accepts it; level 6, as a server would do on the fly
+        if self.gzipped is None:
+            self.gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self.gzipped
+
+
+class PageCache:
+    # LRU of rendered pages, dropped whole when trains.csv changes
+    def __init__(self, max_pages=CACHE_PAGES):
+        self.max_pages = max_pages
+        self.pages = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            page = self.pages.get(key)
+            if page is None:
+                self.misses += 1
+                return None
+            self.pages.move_to_end(key)
+            self.hits += 1
+            return page
+
+    def put(self, key, page):
+        with self.lock:
+            self.pages[key] = page
+            self.pages.move_to_end(key)
+            while len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.pages.clear()
+
+
+class Site:
+    # What the server renders: route groups from trains.csv, booking months, the stage transform
+    def __init__(self, base_dir, stages, cache_pages):
+        self.base_dir = base_dir
+        self.transform, _, _ = build.stage_transforms(stages, base_dir)
+        self.cache = PageCache(cache_pages)
+        self.lock = threading.Lock()
+        self.csv_key = None
+        self.routes = {}
+        self.months = {month_filename(year, month): (year, month) for year, month in iter_months(FIRST_MONTH, LAST_MONTH)}
+
+    def route_index(self):
+        # {filename: (s1, s2, trains)}, re-read when trains.csv changes
+        csv_file = os.path.join(self.base_dir, 'trains.csv')
+        try:
+            stat = os.stat(csv_file)
+            key = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            key = None
+        with self.lock:
+            if key != self.csv_key:
+                start = time.perf_counter()
+                routes = {}
+                if key is not None:
+                    for s1, s2, trains in generate_train_pages.iter_route_groups(csv_file):
+                        routes[generate_train_pages.route_filename(s1, s2)] = (s1, s2, trains)
+                self.routes = routes
+                self.csv_key = key
+                self.cache.clear()
+                print(f"Indexed {len(routes)} routes in {time.perf_counter() - start:.2f}s")
+            return self.routes
+
+    def render(self, rel_path):
+        # RenderedPage for a generated page, or None if rel_path is not one
+        page_dir, filename = posixpath.split(rel_path)
+        if page_dir == generate_train_pages.PAGE_DIR:
+            route = self.route_index().get(filename)
+            if route is None:
+                return None
+            cached = self.cache.get(rel_path)
+            if cached is not None:
+                return cached
+            s1, s2, trains = route
+            html = generate_train_pages.generate_html(s1, s2, trains, base_dir=self.base_dir)
+        elif page_dir == BOOKING_PAGE_DIR and filename in self.months:
+            cached = self.cache.get(rel_path)
+            if cached is not None:
+                return cached
+            _, html = render_month_page(*self.months[filename], self.base_dir)
+        else:
+            return None
+        page = RenderedPage(self.transform(html, rel_path).encode('utf-8'))
+        self.cache.put(rel_path, page)
+        return page
+
+
+@functools.lru_cache(maxsize=4096)
+def _file_etag(path, mtime_ns, size):
+    return f'"{file_digest(path)[:20]}"'
+
+
+def file_etag(path):
+    stat = os.stat(path)
+    return _file_etag(path, stat.st_mtime_ns, stat.st_size)
+
+
+def cache_control(rel_path):
+    name = posixpath.basename(rel_path)
+    if FINGERPRINTED.match(rel_path):
+        return IMMUTABLE
+    if name in NO_CACHE_FILES:
+        return NO_CACHE
+    return NO_CACHE if name.endswith('.html') else "public, max-age=3600"
+
+
+def accepted_encodings(header):
+    return {token.split(';')[0].strip() for token in (header or '').split(',')}
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    site = None
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.respond(head=False)
+
+    def do_HEAD(self):
+        self.respond(head=True)
+
+    def respond(self, head):
+        rel_path = self.resolve(urlsplit(self.path).path)
+        encodings = accepted_encodings(self.headers.get('Accept-Encoding'))
+
+        page = self.site.render(rel_path)
+        if page is not None:
+            if 'gzip' in encodings:
+                return self.send_body(head, rel_path, page.gzip_body(), page.etag[:-1] + '-gz"', 'gzip')
+            return self.send_body(head, rel_path, page.body, page.etag, None)
+
+        path = os.path.join(self.site.base_dir, rel_path)
+        if not os.path.isfile(path):
+            # Hashed names resolve to their source until fingerprint.py has written the copy
+            path = os.path.join(self.site.base_dir, source_name(rel_path))
+            if not os.path.isfile(path):
+                return self.send_status(HTTPStatus.NOT_FOUND)
+
+        if path.endswith(COMPRESSIBLE):
+            for token, ext in SIDECARS:
+                sidecar = path + ext
+                # A sidecar older than its source is stale, as in compress_assets.is_fresh
+                if token in encodings and os.path.isfile(sidecar) and os.path.getmtime(sidecar) >= os.path.getmtime(path):
+                    return self.send_file(head, rel_path, sidecar, token)
+        return self.send_file(head, rel_path, path, None)
+
+    def resolve(self, url_path):
+        # Site-relative path for a URL; normalising it under / keeps '..' inside the site root
+        rel_path = posixpath.normpath('/' + unquote(url_path)).lstrip('/')
+        if not rel_path or os.path.isdir(os.path.join(self.site.base_dir, rel_path)):
+            return posixpath.join(rel_path, 'index.html')
+        return rel_path
+
+    def not_modified(self, etag):
+        # Weak comparison for If-None-Match, as RFC 9110 asks
+        header = self.headers.get('If-None-Match')
+        if not header:
+            return False
+        tags = [tag.strip() for tag in header.split(',')]
+        return '*' in tags or etag in tags or f"W/{etag}" in tags
+
+    def send_file(self, head, rel_path, path, encoding):
+        etag = file_etag(path)
+        if self.not_modified(etag):
+            return self.send_not_modified(rel_path, etag, encoding)
+        with open(path, 'rb') as f:
+            body = f.read()
+        self.send_ok(head, rel_path, body, etag, encoding)
+
+    def send_body(self, head, rel_path, body, etag, encoding):
+        if self.not_modified(etag):
+            return self.send_not_modified(rel_path, etag, encoding)
+        self.send_ok(head, rel_path, body, etag, encoding)
+
+    def send_ok(self, head, rel_path, body, etag, encoding):
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', self.content_type(rel_path))
+        self.send_header('Content-Length', str(len(body)))
+        self.send_common_headers(rel_path, etag, encoding)
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def send_not_modified(self, rel_path, etag, encoding):
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_common_headers(rel_path, etag, encoding)
+        self.end_headers()
+
+    def send_common_headers(self, rel_path, etag, encoding):
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', cache_control(rel_path))
+        if rel_path.endswith(COMPRESSIBLE):
+            self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+
+    def send_status(self, status):
+        body = f"{status.value} {status.phrase}\n".encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    @staticmethod
+    def content_type(rel_path):
+        content_type = mimetypes.guess_type(rel_path)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+            content_type += '; charset=utf-8'
+        return content_type
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def serve(base_dir=BASE_DIR, host='127.0.0.1', port=DEFAULT_PORT, stages=build.DEFAULT_STAGES,
+          cache_pages=CACHE_PAGES, quiet=False):
+    PreviewHandler.site = Site(base_dir, stages, cache_pages)
+    PreviewHandler.site.route_index()
+    server = ThreadingHTTPServer((host, port), PreviewHandler)
+    server.quiet = quiet
+    print(f"Previewing {base_dir} at http://{host}:{server.server_address[1]}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        cache = PreviewHandler.site.cache
+        print(f"Page cache: {cache.hits} hits, {cache.misses} misses")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the site locally, rendering route and booking pages in memory")
+    parser.add_argument('--base-dir', default=BASE_DIR, help="Site root containing trains.csv")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to bind")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port to listen on (0 picks a free one)")
+    parser.add_argument('--stages', default=','.join(name for name in build.DEFAULT_STAGES if name in build.STAGES),
+                        help="Comma separated document stages applied to rendered pages, as for build.py")
+    parser.add_argument('--cache-pages', type=int, default=CACHE_PAGES, help="Rendered pages kept in memory")
+    parser.add_argument('--quiet', action='store_true', help="Do not log each request")
+    args = parser.parse_args()
+    serve(base_dir=args.base_dir, host=args.host, port=args.port,
+          stages=[s.strip() for s in args.stages.split(',') if s.strip()],
+          cache_pages=args.cache_pages, quiet=args.quiet)
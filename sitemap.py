@@ -0,0 +1,198 @@
+import datetime
+import glob
+import gzip
+import hashlib
+import io
+import json
+import os
+from xml.sax.saxutils import escape
+
+SITE_URL = "https://railbookingdate.com"
+
+# Sitemap protocol limit is 50,000 URLs (and 50 MB uncompressed) per file
+MAX_URLS_PER_SITEMAP = 50000
+# {loc: [digest, lastmod]} from the previous build. It lives at the site root and is
+# committed with each build (see README), unlike .build/, so a fresh checkout keeps every
+# page's lastmod instead of stamping them all with today; digests are shortened to keep
+# the file small.
+LASTMOD_HISTORY_NAME = 'sitemap-lastmod.json'
+HISTORY_DIGEST_LENGTH = 12
+
+STATIC_PAGES = [
+    ("index.html", "1.0", "daily"),
+    ("pages/tatkal.html", "0.8", "weekly"),
+    ("pages/news.html", "0.8", "daily"),
+    ("pages/pnr-status.html", "0.8", "daily"),
+    ("pages/live-status.html", "0.8", "daily"),
+    ("pages/indian-railway-blogs.html", "0.8", "daily"),
+    ("pages/faq.html", "0.7", "monthly"),
+    ("pages/ewallet.html", "0.7", "monthly"),
+    ("pages/helpline.html", "0.7", "monthly"),
+    ("pages/videos.html", "0.6", "weekly"),
+    ("pages/disclaimer.html", "0.5", "monthly"),
+    ("pages/privacy-policy.html", "0.5", "monthly"),
+    ("pages/about-us.html", "0.5", "monthly"),
+    ("pages/contact-us.html", "0.5", "monthly"),
+]
+
+# Directories whose pages are picked up automatically, in sitemap order
+PAGE_DIRS = [
+    ("pages/bookingdate", "0.8", "monthly"),
+    ("pages/blogs", "0.7", "monthly"),
+    ("pages/connections", "0.5", "weekly"),
+    ("pages/train-numbers", "0.5", "weekly"),
+]
+
+
+def page_url(rel_path):
+    rel_path = rel_path.replace(os.sep, '/')
+    if rel_path == 'index.html':
+        return SITE_URL + "/"
+    return f"{SITE_URL}/{rel_path}"
+
+
+def content_digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def file_digest(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def iter_site_pages(base_dir, digests=None):
+    # Yields (loc, priority, changefreq, digest) for hand-written, booking-date and blog pages.
+    # digests maps rel_path -> digest for pages the caller already holds in memory.
+    digests = digests or {}
+
+    def digest_for(rel_path):
+        rel_path = rel_path.replace(os.sep, '/')
+        if rel_path in digests:
+            return digests[rel_path]
+        return file_digest(os.path.join(base_dir, rel_path))
+
+    for rel_path, priority, freq in STATIC_PAGES:
+        if os.path.exists(os.path.join(base_dir, rel_path)):
+            yield page_url(rel_path), priority, freq, digest_for(rel_path)
+
+    for rel_dir, priority, freq in PAGE_DIRS:
+        for path in sorted(glob.glob(os.path.join(base_dir, rel_dir, '*.html'))):
+            rel_path = os.path.relpath(path, base_dir)
+            yield page_url(rel_path), priority, freq, digest_for(rel_path)
+
+
+def load_lastmod_history(history_path):
+    if not os.path.exists(history_path):
+        return {}
+    with open(history_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def lastmod_history(base_dir):
+    # Falls back to the copy older builds kept under .build/
+    for path in (os.path.join(base_dir, LASTMOD_HISTORY_NAME), os.path.join(base_dir, '.build', LASTMOD_HISTORY_NAME)):
+        if os.path.exists(path):
+            return load_lastmod_history(path)
+    return {}
+
+
+def _open_shard(index, compress):
+    # Shards are assembled in memory (at most MAX_URLS_PER_SITEMAP entries) so an
+    # unchanged one is not rewritten and only the shard holding an edited page moves
+    filename = f"sitemap-{index}.xml.gz" if compress else f"sitemap-{index}.xml"
+    f = io.BytesIO()
+    f.write(b'<?xml version="1.0" encoding="UTF-8"?>\n')
+    f.write(b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+    return filename, f
+
+
+def _close_shard(base_dir, filename, f, compress):
+    # Returns True if the shard file was written
+    f.write(b'</urlset>')
+    data = f.getvalue()
+    if compress:
+        # mtime=0 keeps the gzip bytes identical while the content is unchanged
+        data = gzip.compress(data, compresslevel=9, mtime=0)
+    return write_if_changed(os.path.join(base_dir, filename), data)
+
+
+def write_if_changed(path, data):
+    if os.path.exists(path) and os.path.getsize(path) == len(data):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+
+def write_sitemaps(base_dir, entries, max_urls=MAX_URLS_PER_SITEMAP, compress=True, today=None):
+    # Streams (loc, priority, changefreq, digest) entries into sitemap-N.xml(.gz)
+    # shards and writes sitemap.xml as the index. lastmod only moves forward
+    # when a page's digest differs from the one recorded on a previous build.
+    today = today or datetime.date.today().isoformat()
+    history_path = os.path.join(base_dir, LASTMOD_HISTORY_NAME)
+    previous = lastmod_history(base_dir)
+    history = {}
+
+    shards = []
+    written = 0
+    f = None
+    shard_lastmod = None
+    count = 0
+    for loc, priority, freq, digest in entries:
+        if f is None or count >= max_urls:
+            if f is not None:
+                written += _close_shard(base_dir, filename, f, compress)
+                shards.append((filename, shard_lastmod))
+            filename, f = _open_shard(len(shards) + 1, compress)
+            shard_lastmod = None
+            count = 0
+
+        digest = digest[:HISTORY_DIGEST_LENGTH]
+        seen = previous.get(loc)
+        lastmod = seen[1] if seen and seen[0][:HISTORY_DIGEST_LENGTH] == digest else today
+        history[loc] = [digest, lastmod]
+        shard_lastmod = max(shard_lastmod or lastmod, lastmod)
+
+        f.write((
+            f'    <url>\n'
+            f'        <loc>{escape(loc)}</loc>\n'
+            f'        <lastmod>{lastmod}</lastmod>\n'
+            f'        <changefreq>{freq}</changefreq>\n'
+            f'        <priority>{priority}</priority>\n'
+            f'    </url>\n'
+        ).encode('utf-8'))
+        count += 1
+
+    if f is not None:
+        written += _close_shard(base_dir, filename, f, compress)
+        shards.append((filename, shard_lastmod))
+
+    # Drop shards left over from a previous, larger or differently compressed build
+    current = {filename for filename, _ in shards}
+    for path in glob.glob(os.path.join(base_dir, 'sitemap-*.xml*')):
+        if os.path.basename(path) not in current:
+            os.remove(path)
+
+    index_path = os.path.join(base_dir, 'sitemap.xml')
+    print(f"Generating sitemap index at: {index_path} ({len(shards)} shards, {written} rewritten, {len(history)} URLs)")
+    out = io.StringIO()
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    out.write('<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+    for filename, lastmod in shards:
+        out.write(f'    <sitemap>\n')
+        out.write(f'        <loc>{SITE_URL}/{filename}</loc>\n')
+        out.write(f'        <lastmod>{lastmod}</lastmod>\n')
+        out.write(f'    </sitemap>\n')
+    out.write('</sitemapindex>')
+    write_if_changed(index_path, out.getvalue().encode('utf-8'))
+
+    # One URL per line keeps the committed file's diffs down to the pages that moved
+    lines = ',\n'.join(f"{json.dumps(loc)}:{json.dumps(history[loc], separators=(',', ':'))}" for loc in sorted(history))
+    data = f"{{\n{lines}\n}}\n".encode('utf-8')
+    write_if_changed(history_path, data)
+    return [filename for filename, _ in shards]
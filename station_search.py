@@ -0,0 +1,165 @@
+import argparse
+import json
+import os
+import re
+
+import build_report
+from build_report import phase
+from generate_train_pages import iter_route_groups, route_filename
+from sitemap import write_if_changed
+from train_numbers import ROUTE_PREFIX
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Station search for the home page. Station names are normalized to lowercase words,
+# and every word is filed under a short prefix; a prefix holding too many stations is
+# split one character further, so each shard stays small however skewed the names are.
+# The browser fetches index.json (the shard keys) once, then only the shard for the
+# word being typed, and a station's route list once one is picked. js/app.js mirrors
+# normalize_words and the key lookup.
+DATA_DIR = 'data/search'
+SHARDS_DIR = 'data/search/shards'
+STATIONS_DIR = 'data/search/stations'
+INDEX_NAME = 'index.json'
+
+MIN_PREFIX = 2
+# Stations per shard before its prefix is split. A word found in more stations than
+# this ('jn', 'road', ...) cannot fit in one shard and says little about the station,
+# so it is listed as common instead of indexed; the other words find those stations.
+MAX_SHARD_STATIONS = 64
+
+
+def normalize_words(name):
+    return re.sub(r'[^0-9a-z]+', ' ', name.lower()).split()
+
+
+def station_slug(name):
+    return re.sub(r'[^0-9a-z]+', '-', name.lower()).strip('-') or 'station'
+
+
+def split_shards(word_stations, words, prefix, shards):
+    # Files the stations of words (all starting with prefix) under prefix, or under
+    # longer prefixes while the shard would hold more than MAX_SHARD_STATIONS
+    stations = set().union(*(word_stations[word] for word in words))
+    if len(stations) <= MAX_SHARD_STATIONS:
+        shards[prefix] = stations
+        return
+    # Words no longer than the prefix cannot be split further and stay under it
+    exact = [word for word in words if len(word) <= len(prefix)]
+    if exact:
+        shards[prefix] = set().union(*(word_stations[word] for word in exact))
+    longer = {}
+    for word in words:
+        if len(word) > len(prefix):
+            longer.setdefault(word[:len(prefix) + 1], []).append(word)
+    for child, child_words in longer.items():
+        split_shards(word_stations, child_words, child, shards)
+
+
+class StationSearchIndex:
+    # Route group observer for generate_train_pages.main, like connections.ConnectionIndex.
+    # finish() writes data/search/index.json, the prefix shards of
+    # [[name, station file, routes]] and one route list of [[other, route slug, trains]]
+    # per station.
+    def __init__(self, base_dir=BASE_DIR, changes=None):
+        self.base_dir = base_dir
+        self.changes = changes
+        self.routes = {}    # station name -> [(other station, route slug, trains)]
+
+    def add_route(self, s1, s2, filename, trains):
+        slug = filename[len(ROUTE_PREFIX):-len('.html')]
+        self.routes.setdefault(s1, []).append((s2, slug, len(trains)))
+        if s2 != s1:
+            self.routes.setdefault(s2, []).append((s1, slug, len(trains)))
+
+    def finish(self):
+        with phase('search-index'):
+            stations = sorted(self.routes)
+            # Station route files by slug; names that slug alike get a numbered suffix
+            files = {}
+            taken = set()
+            for name in stations:
+                slug = base = station_slug(name)
+                n = 2
+                while slug in taken:
+                    slug = f"{base}-{n}"
+                    n += 1
+                taken.add(slug)
+                files[name] = slug
+
+            word_stations = {}
+            for name in stations:
+                for word in set(normalize_words(name)):
+                    word_stations.setdefault(word, set()).add(name)
+            common = sorted(word for word, names in word_stations.items() if len(names) > MAX_SHARD_STATIONS)
+            groups = {}
+            common_words = set(common)
+            for word in word_stations:
+                if word not in common_words:
+                    groups.setdefault(word[:MIN_PREFIX], []).append(word)
+            shards = {}
+            for prefix, words in groups.items():
+                split_shards(word_stations, words, prefix, shards)
+
+        outputs = {f"{DATA_DIR}/{INDEX_NAME}": {'keys': sorted(shards), 'common': common}}
+        for key, names in shards.items():
+            # Busiest stations first, so the browser can show the first few matches as they are
+            outputs[f"{SHARDS_DIR}/{key}.json"] = [
+                [name, files[name], len(self.routes[name])]
+                for name in sorted(names, key=lambda name: (-len(self.routes[name]), name))]
+        for name in stations:
+            outputs[f"{STATIONS_DIR}/{files[name]}.json"] = [
+                [other, slug, trains]
+                for other, slug, trains in sorted(self.routes[name], key=lambda route: (-route[2], route[0]))]
+
+        with phase('search-data'):
+            written = self.write_outputs(outputs)
+        build_report.count('search-shards', len(shards))
+        largest = max((len(names) for names in shards.values()), default=0)
+        print(f"Station search: {len(stations)} stations, {len(shards)} shards (largest {largest} stations), "
+              f"{len(common)} common words, {written} files {'would change' if self.changes is not None else 'written'}")
+
+    def write_outputs(self, outputs):
+        written = 0
+        if self.changes is None:
+            for rel_dir in (SHARDS_DIR, STATIONS_DIR):
+                os.makedirs(os.path.join(self.base_dir, rel_dir), exist_ok=True)
+        for rel_path, value in outputs.items():
+            path = os.path.join(self.base_dir, rel_path)
+            data = json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            if self.changes is not None:
+                written += self.changes.compare(rel_path, path, data) != 'unchanged'
+            else:
+                written += write_if_changed(path, data)
+
+        # Shards and stations that are no longer produced
+        for rel_dir in (DATA_DIR, SHARDS_DIR, STATIONS_DIR):
+            output_dir = os.path.join(self.base_dir, rel_dir)
+            if not os.path.isdir(output_dir):
+                continue
+            for filename in sorted(os.listdir(output_dir)):
+                rel_path = f"{rel_dir}/{filename}"
+                if filename.endswith('.json') and rel_path not in outputs:
+                    path = os.path.join(output_dir, filename)
+                    if self.changes is not None:
+                        self.changes.removed(rel_path, path)
+                    else:
+                        os.remove(path)
+        return written
+
+
+def main(base_dir=BASE_DIR):
+    # Standalone run: reads the route groups itself instead of riding along a route build
+    index = StationSearchIndex(base_dir)
+    for s1, s2, trains in iter_route_groups(os.path.join(base_dir, 'trains.csv')):
+        index.add_route(s1, s2, route_filename(s1, s2), trains)
+    index.finish()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the sharded station search index from trains.csv")
+    parser.add_argument('--base-dir', default=BASE_DIR, help="Site root containing trains.csv")
+    build_report.add_arguments(parser)
+    args = parser.parse_args()
+    with build_report.reporting(args.report, args.profile):
+        main(base_dir=args.base_dir)
@@ -1,60 +1,84 @@
 // ==========================================
 // RailBookingDate - Service Worker
-// Stale-While-Revalidate Strategy
+// Revisioned precache + bounded runtime caches
 // ==========================================
 
-const CACHE_NAME = 'railbookingdate-v7';
-const STATIC_ASSETS = [
-    './',
-    './index.html',
-    './css/styles.css',
-    './js/app.js',
-    './favicon.png',
-    './icon-192.png',
-    './icon-512.png',
-    './manifest.json',
-    './pages/ewallet.html',
-    './pages/faq.html',
-    './pages/helpline.html',
-    './pages/news.html',
-    './pages/tatkal.html',
-    './pages/videos.html',
-    './pages/disclaimer.html',
-    './pages/indian-railway-blogs.html',
-    './pages/blogs/konkan-railway-engineering-marvel.html',
-    './pages/blogs/sakleshpur-ghat-green-route.html',
-    './pages/blogs/evolution-of-railways-history.html',
-    './pages/blogs/fastest-longest-trains-world.html',
-    './pages/blogs/railway-safety-systems-kavach.html'
-];
-
-// Install event - cache static assets
+// Generated by precache.py at build time: the precache manifest
+// { revision, files: { url: contentHash } } and the runtime cache policies.
+// Any content change alters that script, which triggers a service worker update.
+importScripts('./precache-manifest.js');
+
+const PRECACHE_MANIFEST = self.__PRECACHE_MANIFEST || { revision: '', files: {} };
+// [{ name, match, strategy, maxEntries, maxAgeSeconds, fallback }], also from precache.py
+const CACHE_POLICIES = self.__CACHE_POLICIES || [];
+const PRECACHE_NAME = 'railbookingdate-precache';
+const CACHED_AT_HEADER = 'sw-cached-at';
+// Revisions of the cached copies, stored alongside them in the precache
+const REVISIONS_KEY = './__precache-revisions';
+
+function readCachedRevisions(cache) {
+    return cache.match(REVISIONS_KEY)
+        .then(response => (response ? response.json() : {}))
+        .catch(() => ({}));
+}
+
+// Install event - download only the files whose content hash changed
 self.addEventListener('install', event => {
     event.waitUntil(
-        caches.open(CACHE_NAME)
-            .then(cache => {
-                console.log('[SW] Caching static assets');
-                return cache.addAll(STATIC_ASSETS);
-            })
-            .then(() => {
-                // Skip waiting to activate immediately
-                return self.skipWaiting();
-            })
+        caches.open(PRECACHE_NAME).then(cache => {
+            return readCachedRevisions(cache).then(cached => {
+                const changed = Object.keys(PRECACHE_MANIFEST.files)
+                    .filter(url => cached[url] !== PRECACHE_MANIFEST.files[url]);
+                console.log(`[SW] Precaching ${changed.length} changed files (revision ${PRECACHE_MANIFEST.revision})`);
+
+                // no-cache so a stale HTTP cache copy is never stored under a new revision
+                return Promise.all(changed.map(url => {
+                    return fetch(new Request(url, { cache: 'no-cache' })).then(response => {
+                        if (!response.ok) {
+                            throw new Error(`[SW] Precache of ${url} failed: HTTP ${response.status}`);
+                        }
+                        return cache.put(url, response);
+                    });
+                })).then(() => {
+                    // Record revisions only once every changed file is stored, so a
+                    // failed install is retried in full on the next update check
+                    const revisions = Object.assign({}, cached);
+                    changed.forEach(url => { revisions[url] = PRECACHE_MANIFEST.files[url]; });
+                    return cache.put(REVISIONS_KEY, new Response(JSON.stringify(revisions), {
+                        headers: { 'Content-Type': 'application/json' }
+                    }));
+                });
+            });
+        }).then(() => {
+            // Skip waiting to activate immediately
+            return self.skipWaiting();
+        })
     );
 });
 
-// Activate event - clean up old caches
+// Activate event - drop old caches and files no longer in the manifest
 self.addEventListener('activate', event => {
     event.waitUntil(
         caches.keys().then(cacheNames => {
+            const current = [PRECACHE_NAME].concat(CACHE_POLICIES.map(cacheNameFor));
             return Promise.all(
                 cacheNames
-                    .filter(cacheName => cacheName !== CACHE_NAME)
+                    .filter(cacheName => !current.includes(cacheName))
                     .map(cacheName => {
                         console.log('[SW] Deleting old cache:', cacheName);
                         return caches.delete(cacheName);
                     })
             );
+        }).then(() => caches.open(PRECACHE_NAME)).then(cache => {
+            return readCachedRevisions(cache).then(cached => {
+                const removed = Object.keys(cached).filter(url => !(url in PRECACHE_MANIFEST.files));
+                removed.forEach(url => { delete cached[url]; });
+                return Promise.all(removed.map(url => cache.delete(url))).then(() => {
+                    return cache.put(REVISIONS_KEY, new Response(JSON.stringify(cached), {
+                        headers: { 'Content-Type': 'application/json' }
+                    }));
+                });
+            });
         }).then(() => {
             // Take control of all clients immediately
             return self.clients.claim();
@@ -62,7 +86,117 @@ self.addEventListener('activate', event => {
     );
 });
 
-// Fetch event - Stale-While-Revalidate strategy
+// Runtime caches by route class, bounded by entry count and age
+function cacheNameFor(policy) {
+    return `railbookingdate-${policy.name}`;
+}
+
+function policyFor(path) {
+    return CACHE_POLICIES.find(policy => new RegExp(policy.match).test(path));
+}
+
+// Cached copies carry the time they were stored so max-age can be enforced
+function stampResponse(response) {
+    const headers = new Headers(response.headers);
+    headers.set(CACHED_AT_HEADER, String(Date.now()));
+    return response.blob().then(body => new Response(body, {
+        status: response.status,
+        statusText: response.statusText,
+        headers: headers
+    }));
+}
+
+function isExpired(response, policy) {
+    const cachedAt = Number(response.headers.get(CACHED_AT_HEADER) || 0);
+    return Date.now() - cachedAt > policy.maxAgeSeconds * 1000;
+}
+
+// Cache keys come back in insertion order and a put moves an entry to the end,
+// so the first keys are the least recently fetched
+function trimCache(cache, policy) {
+    return cache.keys().then(keys => {
+        const excess = keys.length - policy.maxEntries;
+        if (excess <= 0) {
+            return;
+        }
+        return Promise.all(keys.slice(0, excess).map(key => cache.delete(key)));
+    });
+}
+
+function storeResponse(cache, policy, request, networkResponse) {
+    // Only cache successful responses
+    if (!networkResponse || networkResponse.status !== 200) {
+        return Promise.resolve();
+    }
+    return stampResponse(networkResponse.clone())
+        .then(stamped => cache.put(request, stamped))
+        .then(() => trimCache(cache, policy));
+}
+
+function matchFresh(cache, policy, request) {
+    return cache.match(request).then(cachedResponse => {
+        if (cachedResponse && isExpired(cachedResponse, policy)) {
+            return cache.delete(request).then(() => undefined);
+        }
+        return cachedResponse;
+    });
+}
+
+function offlineFallback(policy) {
+    if (!policy.fallback) {
+        return Promise.resolve(Response.error());
+    }
+    return caches.open(PRECACHE_NAME)
+        .then(cache => cache.match(policy.fallback))
+        .then(response => response || Response.error());
+}
+
+// Stores the network response once it arrives; registered before the response is
+// handed to the page, so the clone is taken before its body is read. waitUntil is
+// called while respondWith is still pending, keeping the worker alive for the put.
+function storeInBackground(event, cache, policy, networkPromise) {
+    event.waitUntil(networkPromise
+        .then(networkResponse => storeResponse(cache, policy, event.request, networkResponse))
+        .catch(() => { }));
+}
+
+function staleWhileRevalidate(event, policy) {
+    return caches.open(cacheNameFor(policy)).then(cache => {
+        return matchFresh(cache, policy, event.request).then(cachedResponse => {
+            // Fetch from network in background
+            const networkPromise = fetch(event.request);
+            storeInBackground(event, cache, policy, networkPromise);
+            const fetchPromise = networkPromise.catch(error => {
+                console.log('[SW] Fetch failed:', error);
+                // Return cached response if network fails
+                return cachedResponse || offlineFallback(policy);
+            });
+
+            // Return cached response immediately, or wait for network
+            return cachedResponse || fetchPromise;
+        });
+    });
+}
+
+function networkFirst(event, policy) {
+    return caches.open(cacheNameFor(policy)).then(cache => {
+        const networkPromise = fetch(event.request);
+        storeInBackground(event, cache, policy, networkPromise);
+        return networkPromise.catch(error => {
+            console.log('[SW] Fetch failed, trying cache:', error);
+            return matchFresh(cache, policy, event.request)
+                .then(cachedResponse => cachedResponse || offlineFallback(policy));
+        });
+    });
+}
+
+const STRATEGIES = {
+    'stale-while-revalidate': staleWhileRevalidate,
+    'network-first': networkFirst
+};
+
+// Fetch event - the app shell is served cache-first from the precache, everything
+// else by the policy of its route class
 self.addEventListener('fetch', event => {
     // Only handle GET requests
     if (event.request.method !== 'GET') {
@@ -74,29 +208,27 @@ self.addEventListener('fetch', event => {
         return;
     }
 
-    event.respondWith(
-        caches.open(CACHE_NAME).then(cache => {
-            return cache.match(event.request).then(cachedResponse => {
-                // Fetch from network in background
-                const fetchPromise = fetch(event.request)
-                    .then(networkResponse => {
-                        // Only cache successful responses
-                        if (networkResponse && networkResponse.status === 200) {
-                            cache.put(event.request, networkResponse.clone());
-                        }
-                        return networkResponse;
-                    })
-                    .catch(error => {
-                        console.log('[SW] Fetch failed:', error);
-                        // Return cached response if network fails
-                        return cachedResponse;
-                    });
+    const url = new URL(event.request.url);
+    const scope = new URL(self.registration.scope);
+    const path = url.pathname.slice(scope.pathname.length);
+    const key = './' + path;
+    const policy = policyFor(path);
 
-                // Return cached response immediately, or wait for network
-                return cachedResponse || fetchPromise;
-            });
-        })
-    );
+    if (url.search === '' && key in PRECACHE_MANIFEST.files) {
+        event.respondWith(
+            caches.open(PRECACHE_NAME)
+                .then(cache => cache.match(key))
+                .then(cachedResponse => {
+                    if (cachedResponse) return cachedResponse;
+                    return policy ? STRATEGIES[policy.strategy](event, policy) : fetch(event.request);
+                })
+        );
+        return;
+    }
+
+    if (policy) {
+        event.respondWith(STRATEGIES[policy.strategy](event, policy));
+    }
 });
 
 // Handle messages from main thread
@@ -0,0 +1,43 @@
+from add_canonical import apply_canonical
+from minify_html import minify_document
+
+PAGE = """<!DOCTYPE html>
+<html lang="en-IN">
+<head>
+    <title>Trains between A and B</title>
+    <link rel="stylesheet" href="../../css/navigation.css">
+</head>
+<body><p>Trains</p></body>
+</html>
+"""
+REL_PATH = 'pages/trains/train-between-a-b.html'
+URL = 'https://railbookingdate.com/pages/trains/train-between-a-b.html'
+
+
+def canonical_count(html):
+    return html.count('canonical')
+
+
+def test_minified_canonical_is_recognised():
+    html, action = apply_canonical(PAGE, REL_PATH)
+    assert action == 'added'
+    minified = minify_document(html, REL_PATH)
+    assert 'rel=canonical' in minified
+
+    again, action = apply_canonical(minified, REL_PATH)
+    assert action == 'unchanged'
+    assert again == minified
+    assert canonical_count(again) == 1
+
+
+def test_stale_unquoted_canonical_is_replaced():
+    html = PAGE.replace('</title>', "</title><link rel=canonical href=https://railbookingdate.com/old.html>")
+    updated, action = apply_canonical(html, REL_PATH)
+    assert action == 'updated'
+    assert canonical_count(updated) == 1
+    assert f'<link rel="canonical" href="{URL}">' in updated
+
+
+def test_single_quoted_canonical_is_recognised():
+    html = PAGE.replace('</title>', f"</title><link rel='canonical' href='{URL}'>")
+    assert apply_canonical(html, REL_PATH) == (html, 'unchanged')
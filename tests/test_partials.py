@@ -0,0 +1,38 @@
+import os
+
+from partials import LEGACY_ADSENSE, apply_analytics_partial, find_partial_offsets
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The loader pages/about-us.html carried in <head> before AdSense went through the partial
+ADSENSE_LOADER = """    <!-- Google Adsense -->
+    <script async src="https://pagead2.googlesyndication.com/pagead/js/adsbygoogle.js?client=ca-pub-5018644317959743"
+        crossorigin="anonymous"></script>
+"""
+
+
+def read_page(rel_path):
+    with open(os.path.join(BASE_DIR, rel_path), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def test_hand_written_adsense_loader_is_deferred():
+    html = read_page('pages/about-us.html').replace('</head>', ADSENSE_LOADER + '</head>', 1)
+    assert LEGACY_ADSENSE.search(html)
+
+    result = apply_analytics_partial(html, 'pages/about-us.html')
+    assert 'adsbygoogle.js' in result
+    assert not LEGACY_ADSENSE.search(result)
+    assert '<script async src="https://pagead2' not in result
+    # AdSense now only loads through the deferred partial
+    start, end = find_partial_offsets(result.encode('utf-8'))['analytics']
+    assert result.count('adsbygoogle.js') == result.encode('utf-8')[start:end].decode('utf-8').count('adsbygoogle.js')
+    assert apply_analytics_partial(result, 'pages/about-us.html') == result
+
+
+def test_adsense_only_page_gets_the_partial():
+    html = ('<!DOCTYPE html>\n<html>\n<head>\n    <meta charset="UTF-8">\n    <title>About</title>\n'
+            + ADSENSE_LOADER + '</head>\n<body></body>\n</html>\n')
+    result = apply_analytics_partial(html, 'pages/about-us.html')
+    assert not LEGACY_ADSENSE.search(result)
+    assert 'analytics' in find_partial_offsets(result.encode('utf-8'))
@@ -0,0 +1,432 @@
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+import time
+from html import escape
+
+import build_report
+from build_diff import compare_output
+from build_report import phase, record_page, timed
+from compress_assets import is_fresh, write_sidecars
+from fingerprint import asset_href, write_fingerprinted_assets
+from generate_train_pages import PAGE_DIR as ROUTE_PAGE_DIR
+from generate_train_pages import iter_route_groups, route_filename, run_render_jobs
+from partials import partials_digest, render_partial
+from sitemap import write_if_changed
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Lookup by train number. Every train seen in the route stream gets a page, and the
+# numbers are written to small JSON shards bucketed by their first PREFIX_LENGTH
+# characters, so the home page resolves a typed number with one fetch of a few KB
+# instead of downloading every train. js/app.js mirrors PREFIX_LENGTH and shard_key.
+PAGE_DIR = 'pages/train-numbers'
+DATA_DIR = 'data/trains'
+PREFIX_LENGTH = 3
+MANIFEST_NAME = 'train-number-pages-manifest.json'
+
+# Bump whenever generate_train_number_html output changes
+TEMPLATE_VERSION = '1'
+
+ROUTE_PREFIX = 'train-between-'
+
+
+def normalize_number(number):
+    return re.sub(r'\s+', '', number).upper()
+
+
+def shard_key(number):
+    # Shard file stem for a normalized number; anything outside [0-9A-Z] maps to '_'
+    return re.sub(r'[^0-9A-Z]', '_', number[:PREFIX_LENGTH])
+
+
+def train_filename(number):
+    return f"train-{re.sub(r'[^0-9a-z]+', '-', number.lower()).strip('-')}.html"
+
+
+def page_hash(number, entries, variant):
+    h = hashlib.sha1()
+    h.update(f"{TEMPLATE_VERSION}\x1f{variant}\x1f{number}".encode('utf-8'))
+    for name, source, destination, route in entries:
+        h.update(f"\x1e{name}\x1f{source}\x1f{destination}\x1f{route}".encode('utf-8'))
+    return h.hexdigest()
+
+
+def load_manifest(manifest_path):
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('template_version') != TEMPLATE_VERSION:
+        return {}
+    return manifest.get('pages', {})
+
+
+def save_manifest(manifest_path, pages):
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'template_version': TEMPLATE_VERSION, 'pages': pages}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+class TrainNumberIndex:
+    # Route group observer for generate_train_pages.main, like connections.ConnectionIndex.
+    # Keeps (name, source, destination, route filename) per train number, and finish()
+    # writes the per-train pages and the lookup shards. Pages are only re-rendered when
+    # their hash (entries, stages, stylesheet and partials) moved since the last build.
+    def __init__(self, base_dir=BASE_DIR, transform=None, transform_key='', compress=False, digests=None,
+                 changes=None, workers=None):
+        self.base_dir = base_dir
+        self.transform = transform
+        self.transform_key = transform_key
+        self.compress = compress
+        self.digests = digests if digests is not None else {}
+        self.changes = changes
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.trains = {}    # normalized number -> [(name, source, destination, route filename)]
+
+    def add_route(self, s1, s2, filename, trains):
+        for train in trains:
+            number = normalize_number(train.number)
+            if number:
+                self.trains.setdefault(number, []).append((train.name, train.source, train.destination, filename))
+
+    def finish(self):
+        build_report.count('train-numbers', len(self.trains))
+        self.write_pages()
+        with phase('train-number-data'):
+            self.write_shards()
+
+    def write_pages(self):
+        output_dir = os.path.join(self.base_dir, PAGE_DIR)
+        manifest_path = os.path.join(self.base_dir, '.build', MANIFEST_NAME)
+        previous = load_manifest(manifest_path)
+        if self.changes is None:
+            os.makedirs(output_dir, exist_ok=True)
+        variant = (f"transform={self.transform_key};assets={asset_href('css/navigation.css', PAGE_DIR, self.base_dir)};"
+                   f"partials={partials_digest(PAGE_DIR)}")
+
+        pages = {}
+        options = {'transform': self.transform, 'compress': self.compress, 'dry_run': self.changes is not None,
+                   'base_dir': self.base_dir}
+
+        def pending_jobs():
+            for number in sorted(self.trains):
+                entries = self.trains[number]
+                filename = train_filename(number)
+                rel_path = f"{PAGE_DIR}/{filename}"
+                path = os.path.join(output_dir, filename)
+                digest = pages[filename] = page_hash(number, entries, variant)
+                # Like route pages, the input hash doubles as the sitemap digest
+                self.digests[rel_path] = digest
+                if previous.get(filename) == digest and os.path.exists(path):
+                    if self.changes is not None:
+                        size = os.path.getsize(path)
+                        self.changes.add(rel_path, 'unchanged', size, size)
+                    continue
+                yield (output_dir, number, entries, options)
+
+        rendered = 0
+        written = 0
+        # Rendered in the route page worker pool; with workers this is the time spent waiting on them
+        results = run_render_jobs(pending_jobs(), self.workers, render=render_train_number)
+        for filename, (size, render_seconds, write_seconds), change in timed('train-number-pages', results):
+            rel_path = f"{PAGE_DIR}/{filename}"
+            if self.changes is not None:
+                self.changes.add(rel_path, change[0], change[1], size)
+                written += change[0] != 'unchanged'
+            else:
+                written += change
+            record_page('train-number', rel_path, size, render_seconds, write_seconds)
+            rendered += 1
+
+        if os.path.isdir(output_dir):
+            for filename in sorted(os.listdir(output_dir)):
+                if filename.endswith('.html') and filename not in pages:
+                    path = os.path.join(output_dir, filename)
+                    if self.changes is not None:
+                        self.changes.removed(f"{PAGE_DIR}/{filename}", path)
+                        continue
+                    os.remove(path)
+                    for sidecar in (path + '.gz', path + '.br'):
+                        if os.path.exists(sidecar):
+                            os.remove(sidecar)
+        if self.changes is None:
+            save_manifest(manifest_path, pages)
+        print(f"Train numbers: {len(pages)} pages, {rendered} rendered, {written} "
+              f"{'would change' if self.changes is not None else 'written'}")
+
+    def write_shards(self):
+        # {number: [[name, source, destination, route slug], ...]} per shard; the slug is the
+        # route filename without 'train-between-' and '.html', rebuilt by the front end
+        shards = {}
+        for number in sorted(self.trains):
+            shards.setdefault(shard_key(number), {})[number] = [
+                [name, source, destination, route[len(ROUTE_PREFIX):-len('.html')]]
+                for name, source, destination, route in self.trains[number]]
+
+        output_dir = os.path.join(self.base_dir, DATA_DIR)
+        if self.changes is None:
+            os.makedirs(output_dir, exist_ok=True)
+        written = 0
+        for key, shard in shards.items():
+            rel_path = f"{DATA_DIR}/{key}.json"
+            path = os.path.join(self.base_dir, rel_path)
+            data = json.dumps(shard, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            if self.changes is not None:
+                self.changes.compare(rel_path, path, data)
+            else:
+                written += write_if_changed(path, data)
+        if os.path.isdir(output_dir):
+            for filename in sorted(os.listdir(output_dir)):
+                if filename.endswith('.json') and filename[:-len('.json')] not in shards:
+                    path = os.path.join(output_dir, filename)
+                    if self.changes is not None:
+                        self.changes.removed(f"{DATA_DIR}/{filename}", path)
+                    else:
+                        os.remove(path)
+        largest = max((len(shard) for shard in shards.values()), default=0)
+        print(f"Train number lookup: {len(shards)} shards (largest {largest} numbers), {written} written")
+
+
+def render_train_number(job):
+    # Worker side of TrainNumberIndex.write_pages, like connections.render_connection.
+    # Returns (filename, (bytes, render seconds, write seconds), change): change is
+    # whether the page was written, or for a dry run (status, bytes on disk).
+    output_dir, number, entries, options = job
+    filename = train_filename(number)
+    path = os.path.join(output_dir, filename)
+    start = time.perf_counter()
+    html = generate_train_number_html(number, entries, options['base_dir'])
+    if options['transform'] is not None:
+        html = options['transform'](html, f"{PAGE_DIR}/{filename}")
+    data = html.encode('utf-8')
+    rendered = time.perf_counter()
+    if options['dry_run']:
+        change = compare_output(path, data)
+    else:
+        change = write_if_changed(path, data)
+        if options['compress'] and (change or not is_fresh(path, path + '.gz')):
+            write_sidecars(path, data)
+    return filename, (len(data), rendered - start, time.perf_counter() - rendered), change
+
+
+def generate_train_number_html(number, entries, base_dir=BASE_DIR):
+    # entries: [(name, source, destination, route filename)], usually a single one
+    name = entries[0][0]
+    title = f"{number} {name} | Train {number} route and booking date"
+    description = f"Train {number} {name} runs from {entries[0][1]} to {entries[0][2]}. See the route and other trains on it, and calculate the IRCTC booking date for your journey."
+    keywords = f"{number}, {number} train, {name}, train {number} route, IRCTC booking date calculator"
+
+    rows = ''.join(f"""                    <tr>
+                        <td>{escape(train_name)}</td>
+                        <td>{escape(source)}</td>
+                        <td>{escape(destination)}</td>
+                        <td><a href="{posixpath.relpath(f'{ROUTE_PAGE_DIR}/{route}', PAGE_DIR)}">All trains on this route</a></td>
+                    </tr>
+""" for train_name, source, destination, route in entries)
+
+    number, name = escape(number), escape(name)
+    title, description, keywords = escape(title), escape(description), escape(keywords)
+
+    return f"""<!DOCTYPE html>
+<html lang="en-IN">
+
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+{render_partial('analytics', PAGE_DIR)}
+    <title>{title}</title>
+    <meta name="description" content="{description}">
+    <meta name="keywords" content="{keywords}">
+
+    <link rel="icon" type="image/png" sizes="96x96" href="../../favicon-96x96.png">
+    <link rel="icon" type="image/x-icon" sizes="any" href="../../favicon.ico">
+    <link rel="apple-touch-icon" href="../../apple-touch-icon.png">
+
+    <meta name="theme-color" content="#ff6b00">
+
+    <link rel="stylesheet" href="{asset_href('css/navigation.css', PAGE_DIR, base_dir)}">
+
+    <style>
+        :root {{
+            --bg-app: #fef7ed;
+            --bg-card: #ffffff;
+            --text-primary: #1a365d;
+            --text-tertiary: #718096;
+            --primary: #ff6b00;
+            --primary-light: #fff3e6;
+            --border-light: #fed7aa;
+            --font-heading: 'DM Sans', system-ui, -apple-system, sans-serif;
+            --font-body: 'Plus Jakarta Sans', system-ui, -apple-system, sans-serif;
+        }}
+
+        [data-theme="dark"] {{
+            --bg-app: #0f1729;
+            --bg-card: #1a2744;
+            --text-primary: #f7fafc;
+            --text-tertiary: #a0aec0;
+            --primary: #ff8533;
+            --primary-light: #2d1f0f;
+            --border-light: #3d4f6f;
+        }}
+
+        body {{
+            background-color: var(--bg-app);
+            color: var(--text-primary);
+            font-family: var(--font-body);
+            line-height: 1.6;
+            margin: 0;
+        }}
+
+        .app-container {{
+            max-width: 800px;
+            margin: 0 auto;
+            padding: 2rem 1rem;
+        }}
+
+        .app-header {{
+            text-align: center;
+            margin-bottom: 2rem;
+        }}
+
+        .app-header h1 {{
+            font-family: var(--font-heading);
+            font-size: 2rem;
+            margin-bottom: 0.5rem;
+        }}
+
+        .train-list-section {{
+            background: var(--bg-card);
+            border-radius: 16px;
+            padding: 1.5rem;
+            border: 1px solid var(--border-light);
+            box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
+            margin-bottom: 2rem;
+            overflow-x: auto;
+        }}
+
+        table {{
+            width: 100%;
+            border-collapse: collapse;
+            text-align: left;
+        }}
+
+        th, td {{
+            padding: 12px;
+            border-bottom: 1px solid var(--border-light);
+        }}
+
+        th {{
+            color: var(--primary);
+            font-family: var(--font-heading);
+        }}
+
+        td a {{
+            color: var(--primary);
+            font-weight: 600;
+        }}
+
+        .cta-box {{
+            text-align: center;
+            background: var(--primary-light);
+            padding: 1.5rem;
+            border-radius: 16px;
+            border: 1px dashed var(--primary);
+            margin-bottom: 2rem;
+        }}
+
+        .cta-button {{
+            color: white;
+            background: var(--primary);
+            font-weight: 700;
+            text-decoration: none;
+            padding: 0.75rem 1.5rem;
+            border-radius: 99px;
+            display: inline-block;
+        }}
+
+        .disclaimer {{
+            font-size: 0.85rem;
+            color: var(--text-tertiary);
+            text-align: center;
+        }}
+
+        @media (max-width: 600px) {{
+            .app-header h1 {{ font-size: 1.5rem; }}
+        }}
+    </style>
+    <script>
+        (function () {{ var t = localStorage.getItem('theme'); if (t === 'dark') document.documentElement.setAttribute('data-theme', 'dark') }})();
+    </script>
+</head>
+
+<body>
+    <div class="app-container">
+{render_partial('nav', PAGE_DIR)}
+
+        <header class="app-header">
+            <h1>{number} {name}</h1>
+            <p>Route of train <strong>{number}</strong> and the other trains running between the same stations.</p>
+        </header>
+
+        <main class="train-list-section">
+            <table>
+                <thead>
+                    <tr>
+                        <th>Train Name</th>
+                        <th>Starting Station</th>
+                        <th>Ending Station</th>
+                        <th>Route</th>
+                    </tr>
+                </thead>
+                <tbody>
+{rows}                </tbody>
+            </table>
+        </main>
+
+        <div class="cta-box">
+            <h3>When does booking open for {number}?</h3>
+            <p>Indian Railways allows booking up to 60 days in advance. Pick your travel date to find the exact opening date.</p>
+            <a href="../../index.html" class="cta-button">Open IRCTC Booking Calculator</a>
+        </div>
+
+        <p class="disclaimer">Note: Train schedules and availability are subject to change. Please verify on the official Indian Railways / IRCTC portal before planning your trip.</p>
+
+{render_partial('footer', PAGE_DIR)}
+    </div>
+</body>
+</html>
+"""
+
+
+def main(base_dir=BASE_DIR, workers=None, transform=None, transform_key='', compress=False):
+    # Standalone run: reads the route groups itself instead of riding along a route build
+    index = TrainNumberIndex(base_dir, transform, transform_key, compress, workers=workers)
+    for s1, s2, trains in iter_route_groups(os.path.join(base_dir, 'trains.csv')):
+        index.add_route(s1, s2, route_filename(s1, s2), trains)
+    index.finish()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate per-train pages and the train number lookup shards from trains.csv")
+    parser.add_argument('--base-dir', default=BASE_DIR, help="Site root containing trains.csv")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes used to render pages (default: number of CPU cores)")
+    # Imported here: build builds on this module
+    import build
+    build.add_stage_argument(parser)
+    build_report.add_arguments(parser)
+    args = parser.parse_args()
+    try:
+        transform, transform_key, compress = build.standalone_stages(args.stages, args.base_dir)
+    except ValueError as e:
+        parser.error(str(e))
+    with build_report.reporting(args.report, args.profile):
+        write_fingerprinted_assets(args.base_dir)
+        main(base_dir=args.base_dir, workers=args.workers,
+             transform=transform, transform_key=transform_key, compress=compress)
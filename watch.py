@@ -0,0 +1,216 @@
+import argparse
+import fnmatch
+import glob
+import os
+import subprocess
+import sys
+import time
+
+import build
+import generate_train_pages
+from connections import ConnectionIndex
+from fingerprint import FINGERPRINTED, write_fingerprinted_assets
+from precache import write_precache_manifest
+from sitemap import file_digest
+from station_search import StationSearchIndex
+from train_numbers import TrainNumberIndex
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Long-running rebuild loop: inputs are polled (mtime and size, then a content hash
+# to ignore touches), and a change rebuilds only the targets that depend on it.
+# Runs as a small supervisor plus a child that does the work; the child exits when
+# a Python module changes and the supervisor starts a fresh one, so new code is
+# loaded and a syntax error waits for the next edit instead of ending the watch.
+POLL_SECONDS = 0.3
+# Child exit status asking the supervisor for a restart
+RESTART_EXIT = 3
+
+# Modules that shape every rendered page through the build stages
+STAGE_MODULES = ['build.py', 'partials.py', 'add_canonical.py', 'critical_css.py', 'minify_html.py', 'fingerprint.py']
+
+# Build targets in the order they run, and the inputs each depends on: globs relative to
+# the site root, except Python modules, which are looked up next to this script. A
+# changed input rebuilds every target that lists it; the precache manifest is
+# refreshed after any rebuild.
+TARGETS = [
+    ('assets', ['css/*.css', 'js/*.js', 'fingerprint.py']),
+    # Hashed asset links and critical CSS come from the stylesheets and scripts
+    ('static', build.STATIC_DOCUMENTS + ['css/*.css', 'js/*.js'] + STAGE_MODULES),
+    ('booking', ['generate_booking_pages.py', 'booking_rules.py', 'css/navigation.css', 'css/booking.css']
+     + STAGE_MODULES),
+    # CSV rows, partials and the stylesheet link are part of the route hashes, so the
+    # incremental build works out which station-pair pages (and sitemap shard) changed
+    ('routes', ['trains.csv', 'partials.py', 'sitemap.py', 'css/navigation.css']),
+    # Template or stage code changes every route page; connection and per-train pages and
+    # the search data are rebuilt from the route stream on every routes run
+    ('routes-all', ['generate_train_pages.py', 'connections.py', 'train_numbers.py', 'station_search.py']
+     + [name for name in STAGE_MODULES if name != 'partials.py']),
+]
+CODE_PATTERNS = ['*.py']
+
+
+def input_path(base_dir, rel_path):
+    return os.path.join(BASE_DIR if rel_path.endswith('.py') else base_dir, rel_path)
+
+
+def iter_inputs(base_dir, patterns):
+    for pattern in patterns:
+        root = BASE_DIR if pattern.endswith('.py') else base_dir
+        for path in glob.glob(os.path.join(root, pattern)):
+            rel_path = os.path.relpath(path, root).replace(os.sep, '/')
+            # Hashed copies are build output, not inputs
+            if not FINGERPRINTED.match(rel_path):
+                yield rel_path
+
+
+def input_patterns():
+    patterns = list(CODE_PATTERNS)
+    for _, inputs in TARGETS:
+        patterns.extend(p for p in inputs if p not in patterns)
+    return patterns
+
+
+def poll(base_dir, patterns, state):
+    # Updates state ({rel_path: ((mtime_ns, size), digest)}) and returns the inputs
+    # whose content changed, appeared or disappeared since the previous call
+    changed = []
+    seen = set()
+    for rel_path in iter_inputs(base_dir, patterns):
+        seen.add(rel_path)
+        path = input_path(base_dir, rel_path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        key = (stat.st_mtime_ns, stat.st_size)
+        previous = state.get(rel_path)
+        if previous and previous[0] == key:
+            continue
+        digest = file_digest(path)
+        state[rel_path] = (key, digest)
+        if previous is None or previous[1] != digest:
+            changed.append(rel_path)
+    for rel_path in set(state) - seen:
+        del state[rel_path]
+        changed.append(rel_path)
+    return changed
+
+
+def targets_for(changed):
+    targets = []
+    for name, inputs in TARGETS:
+        if any(rel_path == pattern or fnmatch.fnmatch(rel_path, pattern)
+               for rel_path in changed for pattern in inputs):
+            targets.append(name)
+    if 'routes-all' in targets and 'routes' in targets:
+        targets.remove('routes')
+    return targets
+
+
+def rebuild(base_dir, targets, changed, stages, workers):
+    start = time.perf_counter()
+    transform, static_transform, transform_key = build.stage_transforms(stages, base_dir)
+    compress = 'compress' in stages
+    digests = {}
+
+    if 'assets' in targets and 'fingerprint' in stages:
+        write_fingerprinted_assets(base_dir)
+        if compress:
+            build.compress_assets(base_dir)
+    if 'static' in targets:
+        docs = [rel_path for rel_path in changed if rel_path.endswith('.html')]
+        # Only the edited pages, unless something they all depend on changed
+        only_docs = len(docs) == len(changed)
+        rel_paths = [d for d in docs if os.path.exists(os.path.join(base_dir, d))] if only_docs else None
+        build.build_static_documents(base_dir, static_transform, compress, digests, rel_paths=rel_paths)
+    if 'booking' in targets:
+        build.build_booking_pages(base_dir, transform, compress, digests)
+    if 'routes' in targets or 'routes-all' in targets:
+        # A handful of changed routes renders faster in-process than through a worker pool
+        full = 'routes-all' in targets
+        route_workers = workers if full else 1
+        generate_train_pages.main(base_dir=base_dir, incremental=not full, workers=route_workers,
+                                  transform=transform, transform_key=transform_key, compress=compress,
+                                  page_digests=digests,
+                                  indexes=[ConnectionIndex(base_dir, transform, transform_key, compress, digests,
+                                                           workers=route_workers),
+                                           TrainNumberIndex(base_dir, transform, transform_key, compress, digests,
+                                                            workers=route_workers),
+                                           StationSearchIndex(base_dir)])
+    if 'precache' in stages:
+        write_precache_manifest(base_dir, digests)
+    print(f"Rebuilt {', '.join(targets)} in {time.perf_counter() - start:.2f}s")
+
+
+def run_child(base_dir, stages, workers, interval, changed_code):
+    patterns = input_patterns()
+    state = {}
+    poll(base_dir, patterns, state)
+    if changed_code:
+        targets = targets_for(changed_code)
+        if targets:
+            print(f"Code changed: {', '.join(changed_code)}")
+            rebuild(base_dir, targets, changed_code, stages, workers)
+            poll(base_dir, patterns, state)
+
+    print(f"Watching {len(state)} inputs in {base_dir} (Ctrl+C to stop)")
+    while True:
+        time.sleep(interval)
+        changed = poll(base_dir, patterns, state)
+        if not changed:
+            continue
+        if any(rel_path.endswith('.py') for rel_path in changed):
+            # New code needs a fresh interpreter; the supervisor works out what changed
+            sys.exit(RESTART_EXIT)
+        targets = targets_for(changed)
+        if not targets:
+            continue
+        print(f"Changed: {', '.join(changed)}")
+        try:
+            rebuild(base_dir, targets, changed, stages, workers)
+        except Exception as e:
+            print(f"Rebuild failed: {e!r}")
+        # Rebuilt static pages are inputs too; take in our own writes without reacting to them
+        poll(base_dir, patterns, state)
+
+
+def supervise(base_dir, argv, interval):
+    code_state = {}
+    poll(base_dir, CODE_PATTERNS, code_state)
+    changed = []
+    while True:
+        command = [sys.executable, os.path.abspath(__file__)] + argv + ['--child']
+        if changed:
+            command += ['--changed', ','.join(changed)]
+        result = subprocess.run(command)
+        changed = poll(base_dir, CODE_PATTERNS, code_state)
+        if result.returncode != RESTART_EXIT:
+            print(f"Watcher exited with status {result.returncode}; waiting for a code change to restart")
+        while not changed:
+            time.sleep(interval)
+            changed = poll(base_dir, CODE_PATTERNS, code_state)
+        print(f"Restarting for {', '.join(changed)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch the site inputs and rebuild only the affected outputs")
+    parser.add_argument('--base-dir', default=BASE_DIR, help="Site root containing trains.csv")
+    parser.add_argument('--stages', default=','.join(build.DEFAULT_STAGES),
+                        help="Comma separated build stages, as for build.py")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes for full route re-renders (default: number of CPU cores)")
+    parser.add_argument('--interval', type=float, default=POLL_SECONDS, help="Seconds between polls")
+    # Internal: set by the supervisor for the process doing the work
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--changed', default='', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    try:
+        if args.child:
+            run_child(args.base_dir, [s.strip() for s in args.stages.split(',') if s.strip()], args.workers,
+                      args.interval, [c for c in args.changed.split(',') if c])
+        else:
+            supervise(args.base_dir, sys.argv[1:], args.interval)
+    except KeyboardInterrupt:
+        pass